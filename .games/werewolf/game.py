@@ -1,9 +1,8 @@
 from dataclasses import dataclass, field
 from enum import Enum
+import asyncio
 import json
-import time
-import random
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from pathlib import Path
 import sys
 
@@ -12,7 +11,7 @@ BASE = Path(__file__).resolve().parent.parent.parent
 if str(BASE) not in sys.path:
     sys.path.append(str(BASE))
 
-from src.Game import Game, GameAction, GamePhase, GameStep, ActionContext
+from src.Game import Game, GameAction, ActionContext
 from src.Player import Player
 from src.Logger import (
     GameLogger,
@@ -32,6 +31,11 @@ class Role(Enum):
     GUARD = "guard"
 
 
+class Team(Enum):
+    WEREWOLF = "werewolf"
+    VILLAGER = "villager"
+
+
 class DeathReason(Enum):
     KILLED_BY_WEREWOLF = "在夜晚被杀害"
     POISONED_BY_WITCH = "被女巫毒杀"
@@ -48,11 +52,11 @@ class NightStartAction(GameAction):
     def description(self) -> str:
         return "入夜初始化"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         game.day_number += 1
         game.announce(
-            game.prompts["phases"]["night"]["start"].format(game.day_number),
+            context.prompts["start"].format(game.day_number),
             game.all_player_names,
             "#@",
         )
@@ -65,19 +69,19 @@ class DayStartAction(GameAction):
     def description(self) -> str:
         return "天亮初始化"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         game.announce(
-            game.prompts["phases"]["day"]["start"].format(game.day_number),
+            context.prompts["start"].format(game.day_number),
             game.all_player_names,
             "#:",
         )
 
         if game.killed_player:
-            game.handle_death(game.killed_player, DeathReason.KILLED_BY_WEREWOLF)
+            await game.handle_death(game.killed_player, DeathReason.KILLED_BY_WEREWOLF)
         else:
             game.announce(
-                game.prompts["phases"]["day"]["safe_night"],
+                context.prompts["safe_night"],
                 game.all_player_names,
                 "#@",
             )
@@ -87,15 +91,15 @@ class GuardAction(GameAction):
     def description(self) -> str:
         return "守卫守护"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         guard = game.get_player_by_role(Role.GUARD)
         if not guard:
             return
 
-        prompt = game.prompts["roles"]["guard"]["choose"]
+        prompt = context.prompts["choose"]
         game.announce(
-            game.prompts["roles"]["guard"]["wake"],
+            context.prompts["wake"],
             [guard.name],
             "#@",
         )
@@ -103,18 +107,19 @@ class GuardAction(GameAction):
         alive_players = game.get_alive_players()
         valid_targets = [p for p in alive_players if p != game.last_guarded]
 
-        target = guard.choose(prompt, valid_targets)
+        target = await guard.choose(prompt, valid_targets)
 
         game.players[target].is_guarded = True
         game.last_guarded = target
 
         game.announce(
-            game.prompts["roles"]["guard"]["action_done"].format(target),
+            context.prompts["action_done"].format(target),
             [guard.name],
             "#@",
+            guard.name,
         )
         game.announce(
-            game.prompts["roles"]["guard"]["sleep"],
+            context.prompts["sleep"],
             game.all_player_names,
             "#@",
         )
@@ -124,69 +129,74 @@ class WerewolfNightAction(GameAction):
     def description(self) -> str:
         return "狼人夜间行动"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
+        prompts = context.prompts
         werewolves = game.get_alive_players([Role.WEREWOLF])
         if not werewolves:
             return
 
         game.announce(
-            game.prompts["roles"]["werewolf"]["wake"].format(", ".join(werewolves)),
+            prompts["wake"].format(", ".join(werewolves)),
             werewolves,
             "#@",
         )
 
         if len(werewolves) == 1:
             game.announce(
-                game.prompts["roles"]["werewolf"]["lone_wolf"],
+                prompts["lone_wolf"],
                 werewolves,
                 "#@",
             )
         else:
-            self._handle_discussion(game, werewolves)
+            await self._handle_discussion(context, werewolves)
 
-        self._handle_voting(game, werewolves)
+        await self._handle_voting(context, werewolves)
 
         if game.killed_player:
             game.announce(
-                game.prompts["roles"]["werewolf"]["kill_success"].format(
-                    game.killed_player
-                ),
+                prompts["kill_success"].format(game.killed_player),
                 werewolves,
                 "#@",
             )
         game.announce(
-            game.prompts["roles"]["werewolf"]["sleep"],
+            prompts["sleep"],
             game.all_player_names,
             "#@",
         )
 
-    def _handle_discussion(self, game, werewolves):
+    async def _handle_discussion(self, context: ActionContext, werewolves):
+        game: "WerewolfGame" = context.game
+        role_prompts = context.prompts
         prompts = {
-            "start": game.prompts["roles"]["werewolf"]["discuss_start"],
-            "prompt": game.prompts["roles"]["werewolf"]["discuss_prompt"],
-            "speech": game.prompts["roles"]["werewolf"]["discuss_channel"],
-            "ready_msg": game.prompts["roles"]["werewolf"]["discuss_ready"],
-            "timeout": game.prompts["roles"]["werewolf"]["discuss_timeout"],
+            "start": role_prompts["discuss_start"],
+            "prompt": role_prompts["discuss_prompt"],
+            "speech": role_prompts["discuss_channel"],
+            "ready_msg": role_prompts["discuss_ready"],
+            "timeout": role_prompts["discuss_timeout"],
+            "limit": game.prompts["game"]["speech_limit"],
         }
-        game.process_discussion(
+        await game.process_discussion(
             participants=werewolves,
             prompts=prompts,
-            max_rounds=5,
+            max_rounds=context.extra_data.get("max_rounds", 5),
             enable_ready_check=True,
             visibility=werewolves,
             prefix="#:",
+            max_speech_chars=context.extra_data.get("max_speech_chars"),
         )
 
-    def _handle_voting(self, game, werewolves):
+    async def _handle_voting(self, context: ActionContext, werewolves):
+        game: "WerewolfGame" = context.game
+        role_prompts = context.prompts
         alive_players = game.get_alive_players()
         prompts = {
-            "start": game.prompts["roles"]["werewolf"]["vote_start"],
-            "prompt": game.prompts["roles"]["werewolf"]["vote_prompt"],
-            "result_out": game.prompts["roles"]["werewolf"]["vote_result"],
-            "result_tie": game.prompts["roles"]["werewolf"]["vote_tie"],
+            "start": role_prompts["vote_start"],
+            "prompt": role_prompts["vote_prompt"],
+            "result_out": role_prompts["vote_result"],
+            "result_tie": role_prompts["vote_tie"],
         }
-        winner = game.process_vote(
+        winner = await game.process_vote(
             voters=werewolves,
             candidates=alive_players,
             prompts=prompts,
@@ -202,32 +212,33 @@ class SeerAction(GameAction):
     def description(self) -> str:
         return "预言家查验"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         seer = game.get_player_by_role(Role.SEER)
         if not seer:
             return
 
-        prompt = game.prompts["roles"]["seer"]["choose"]
+        prompt = context.prompts["choose"]
         game.announce(
-            game.prompts["roles"]["seer"]["wake"],
+            context.prompts["wake"],
             [seer.name],
             "#@",
         )
 
         alive_players = game.get_alive_players()
-        target = seer.choose(prompt, alive_players)
+        target = await seer.choose(prompt, alive_players)
 
         role = game.players[target].role
         identity = "狼人" if role == Role.WEREWOLF.value else "好人"
         game.announce(
-            game.prompts["roles"]["seer"]["result"].format(target, identity),
+            context.prompts["result"].format(target, identity),
             [seer.name],
             "#@",
+            seer.name,
         )
 
         game.announce(
-            game.prompts["roles"]["seer"]["sleep"],
+            context.prompts["sleep"],
             game.all_player_names,
             "#@",
         )
@@ -237,14 +248,14 @@ class WitchAction(GameAction):
     def description(self) -> str:
         return "女巫毒药与解药"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         witch = game.get_player_by_role(Role.WITCH)
         if not witch:
             return
 
         game.announce(
-            game.prompts["roles"]["witch"]["wake"],
+            context.prompts["wake"],
             [witch.name],
             "#@",
         )
@@ -256,17 +267,13 @@ class WitchAction(GameAction):
         if game.killed_player:
             if game.players[game.killed_player].is_guarded:
                 game.announce(
-                    game.prompts["roles"]["witch"]["night_safe"].format(
-                        game.killed_player
-                    ),
+                    context.prompts["night_safe"].format(game.killed_player),
                     game.all_player_names,
                     "#@",
                 )
             else:
                 game.announce(
-                    game.prompts["roles"]["witch"]["night_kill"].format(
-                        game.killed_player
-                    ),
+                    context.prompts["night_kill"].format(game.killed_player),
                     [witch.name],
                     "#@",
                 )
@@ -274,42 +281,42 @@ class WitchAction(GameAction):
 
         # 解药
         if not game.witch_save_used and actual_killed:
-            prompt = game.prompts["roles"]["witch"]["save_prompt"]
-            if witch.choose(prompt, ["y", "n"]) == "y":
+            prompt = context.prompts["save_prompt"]
+            if await witch.choose(prompt, ["y", "n"]) == "y":
                 actual_killed = None
                 game.witch_save_used = True
                 game.announce(
-                    game.prompts["roles"]["witch"]["save_action"].format(
-                        game.killed_player
-                    ),
+                    context.prompts["save_action"].format(game.killed_player),
                     [witch.name],
                     "#@",
+                    witch.name,
                 )
                 game.announce(
-                    game.prompts["roles"]["witch"]["save_broadcast"],
+                    context.prompts["save_broadcast"],
                     game.all_player_names,
                     "#@",
                 )
 
         # 毒药
         if not game.witch_poison_used:
-            prompt = game.prompts["roles"]["witch"]["poison_prompt"]
-            if witch.choose(prompt, ["y", "n"]) == "y":
-                poison_prompt = game.prompts["roles"]["witch"]["poison_target_prompt"]
-                target = witch.choose(poison_prompt, alive_players)
+            prompt = context.prompts["poison_prompt"]
+            if await witch.choose(prompt, ["y", "n"]) == "y":
+                poison_prompt = context.prompts["poison_target_prompt"]
+                target = await witch.choose(poison_prompt, alive_players)
                 if actual_killed is None:
                     actual_killed = target
                 else:
-                    game.handle_death(target, DeathReason.POISONED_BY_WITCH)
+                    await game.handle_death(target, DeathReason.POISONED_BY_WITCH)
 
                 game.witch_poison_used = True
                 game.announce(
-                    game.prompts["roles"]["witch"]["poison_action"].format(target),
+                    context.prompts["poison_action"].format(target),
                     [witch.name],
                     "#@",
+                    witch.name,
                 )
                 game.announce(
-                    game.prompts["roles"]["witch"]["poison_broadcast"],
+                    context.prompts["poison_broadcast"],
                     game.all_player_names,
                     "#@",
                 )
@@ -318,7 +325,7 @@ class WitchAction(GameAction):
         game.killed_player = actual_killed
 
         game.announce(
-            game.prompts["roles"]["witch"]["sleep"],
+            context.prompts["sleep"],
             game.all_player_names,
             "#@",
         )
@@ -328,23 +335,24 @@ class DayDiscussionAction(GameAction):
     def description(self) -> str:
         return "白天讨论"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         alive_players = game.get_alive_players()
 
         prompts = {
-            "alive_players": game.prompts["phases"]["day"]["discussion"][
-                "alive_players"
-            ],
-            "prompt": game.prompts["phases"]["day"]["discussion"]["speak_prompt"],
-            "speech": game.prompts["phases"]["day"]["discussion"]["speech"],
+            "alive_players": context.prompts["alive_players"],
+            "prompt": context.prompts["speak_prompt"],
+            "speech": context.prompts["speech"],
+            "out_of_time": context.prompts["out_of_time"],
+            "limit": game.prompts["game"]["speech_limit"],
         }
-        game.process_discussion(
+        await game.process_discussion(
             participants=alive_players,
             prompts=prompts,
-            max_rounds=1,
+            max_rounds=context.extra_data.get("max_rounds", 1),
             enable_ready_check=False,
             prefix="#:",
+            max_speech_chars=context.extra_data.get("max_speech_chars"),
         )
 
 
@@ -352,18 +360,18 @@ class DayVoteAction(GameAction):
     def description(self) -> str:
         return "白天投票"
 
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         game: "WerewolfGame" = context.game
         alive_players = game.get_alive_players()
         prompts = {
-            "start": game.prompts["phases"]["day"]["vote"]["start"],
-            "prompt": game.prompts["phases"]["day"]["vote"]["prompt"],
-            "action": game.prompts["phases"]["day"]["vote"]["action"],
-            "result_out": game.prompts["phases"]["day"]["vote"]["result_out"],
-            "result_tie": game.prompts["phases"]["day"]["vote"]["result_tie"],
+            "start": context.prompts["start"],
+            "prompt": context.prompts["prompt"],
+            "action": context.prompts["action"],
+            "result_out": context.prompts["result_out"],
+            "result_tie": context.prompts["result_tie"],
         }
 
-        voted_out_player = game.process_vote(
+        voted_out_player = await game.process_vote(
             voters=alive_players,
             candidates=alive_players,
             prompts=prompts,
@@ -372,7 +380,7 @@ class DayVoteAction(GameAction):
         )
 
         if voted_out_player:
-            game.handle_death(voted_out_player, DeathReason.VOTED_OUT)
+            await game.handle_death(voted_out_player, DeathReason.VOTED_OUT)
 
 
 # -----------------------------------------------------------------------------
@@ -380,42 +388,55 @@ class DayVoteAction(GameAction):
 # -----------------------------------------------------------------------------
 
 
+# definition.json 中 action 字段引用的动作
+ACTIONS = {
+    "NightStart": NightStartAction,
+    "DayStart": DayStartAction,
+    "Guard": GuardAction,
+    "Werewolf": WerewolfNightAction,
+    "Seer": SeerAction,
+    "Witch": WitchAction,
+    "DayDiscussion": DayDiscussionAction,
+    "DayVote": DayVoteAction,
+}
+
+
 class WerewolfGame(Game):
+    game_dir = Path(__file__).resolve().parent
+    actions = ACTIONS
+
     def __init__(
         self,
         players: List[Dict[str, str]],
         event_emitter=None,
         input_handler=None,
+        resume_from=None,
+        seed=None,
+        console=True,
+        persist=True,
     ):
-        super().__init__("werewolf", players, event_emitter, input_handler)
+        super().__init__(
+            "werewolf",
+            players,
+            event_emitter,
+            input_handler,
+            resume_from,
+            seed,
+            console,
+            persist,
+        )
         self.roles: Dict[str, int] = {}
         self.killed_player: Optional[str] = None
         self.last_guarded: Optional[str] = None
         self.witch_save_used = False
         self.witch_poison_used = False
-        self.prompts: Dict[str, str] = {}
+        self.prompts: Mapping[str, Any] = {}
         # self._players_data is available from base
 
-    def _init_phases(self):
-        # 夜晚阶段
-        night = GamePhase("Night")
-        night.add_step(GameStep("NightStart", [], NightStartAction()))
-        night.add_step(GameStep("Guard", [Role.GUARD], GuardAction()))
-        night.add_step(GameStep("Werewolf", [Role.WEREWOLF], WerewolfNightAction()))
-        night.add_step(GameStep("Seer", [Role.SEER], SeerAction()))
-        night.add_step(GameStep("Witch", [Role.WITCH], WitchAction()))
-        self.phases.append(night)
-
-        # 白天阶段
-        day = GamePhase("Day")
-        day.add_step(GameStep("DayStart", [], DayStartAction()))
-        day.add_step(GameStep("Discussion", [], DayDiscussionAction()))
-        day.add_step(GameStep("Vote", [], DayVoteAction()))
-        self.phases.append(day)
-
     def _cancel(self):
-        self.announce(game.prompts["game"]["cancel"], self.all_player_names, "#!")
+        self.announce(self.prompts["game"]["cancel"], self.all_player_names, "#!")
         self.players.clear()
+        self._rebuild_index()
         self.roles.clear()
         self.all_player_names.clear()
         self.killed_player = None
@@ -423,33 +444,40 @@ class WerewolfGame(Game):
         self.witch_save_used = False
         self.witch_poison_used = False
         self.day_number = 0
+        self.deaths.clear()
 
-    def setup_game(self):
-        game_dir = Path(__file__).resolve().parent
-        config, prompts, player_config_map = self.load_basic_config(game_dir)
+    def _load_game_data(self) -> Dict[str, Dict]:
+        """加载配置, 提示词与游戏定义, 返回按玩家名称索引的配置映射."""
+        config, prompts, player_config_map = self.load_basic_config(self.game_dir)
         self.prompts = prompts
+        self.definition = self.load_definition()
+        return player_config_map
+
+    def _create_player(self, name: str, role: str, p_config: Dict) -> Player:
+        player = Player(
+            name,
+            role,
+            p_config,
+            self.prompts,
+            self.logger,
+            self.input_handler,
+            self.notify,
+            self.rng,
+            history_limit=self.history_limit,
+            think_delay=self.config.get("think_delay"),
+            input_policy=self.config.get("human_input"),
+        )
+        self.register_player(player)
+        return player
+
+    async def setup_game(self):
+        player_config_map = self._load_game_data()
 
         # 注意：self.all_player_names 和 self._players_data 由 load_basic_config 更新
 
         player_count = len(self.all_player_names)
 
-        if player_count == 6:
-            self.roles = {
-                Role.WEREWOLF.value: 2,
-                Role.VILLAGER.value: 2,
-                Role.SEER.value: 1,
-                Role.WITCH.value: 1,
-            }
-
-        else:
-            self.roles = {
-                Role.WEREWOLF.value: max(1, player_count // 4),
-                Role.SEER.value: 1,
-                Role.WITCH.value: 1,
-                Role.HUNTER.value: 1,
-                Role.GUARD.value: 1,
-            }
-            self.roles[Role.VILLAGER.value] = player_count - sum(self.roles.values())
+        self.roles = self.definition.roles_for(player_count)
 
         role_config = []
         for role, count in self.roles.items():
@@ -473,26 +501,18 @@ class WerewolfGame(Game):
         for role, count in self.roles.items():
             for _ in range(count):
                 role_list.append(role)
-        random.shuffle(role_list)
+        self.rng.shuffle(role_list)
 
         for name, role in zip(self.all_player_names, role_list):
-            p_config = player_config_map.get(name, {})
-            player = Player(
-                name,
-                role,
-                p_config,
-                prompts,
-                self.logger,
-                self.input_handler,
-                self.event_emitter,
-            )
-            self.players[name] = player
+            self._create_player(name, role, player_config_map.get(name, {}))
 
         werewolves = self.get_alive_players([Role.WEREWOLF])
 
         self.announce(self.prompts["game"]["assigning"], self.all_player_names, "#@")
         for name, player in self.players.items():
-            time.sleep(0.3)
+            # 逐个发牌营造节奏感; 大厅模式下人数多, 直接发出
+            if not self.large_lobby:
+                await asyncio.sleep(0.3)
             self.announce(
                 self.prompts["game"]["identity"].format(name, player.role.capitalize()),
                 [player.name],
@@ -516,9 +536,48 @@ class WerewolfGame(Game):
 
         self.announce(self.prompts["game"]["start"], self.all_player_names, "#:")
 
-    def handle_death(self, player_name: str, reason: DeathReason):
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], **options) -> "WerewolfGame":
+        return cls(state["players_data"], **options)
+
+    def get_state(self) -> Dict[str, Any]:
+        state = super().get_state()
+        state.update(
+            {
+                "roles": self.roles,
+                "killed_player": self.killed_player,
+                "last_guarded": self.last_guarded,
+                "witch_save_used": self.witch_save_used,
+                "witch_poison_used": self.witch_poison_used,
+            }
+        )
+        return state
+
+    def set_state(self, state: Dict[str, Any]):
+        super().set_state(state)
+        self.roles = state["roles"]
+        self.killed_player = state["killed_player"]
+        self.last_guarded = state["last_guarded"]
+        self.witch_save_used = state["witch_save_used"]
+        self.witch_poison_used = state["witch_poison_used"]
+
+    def restore_game(self, state: Dict[str, Any]):
+        player_config_map = self._load_game_data()
+        for p_state in state["players"]:
+            name = p_state["name"]
+            self._create_player(name, p_state["role"], player_config_map.get(name, {}))
+        super().restore_game(state)
+
+        self.announce(
+            self.prompts["game"]["resumed"].format(self.day_number),
+            self.all_player_names,
+            "#@",
+        )
+
+    async def handle_death(self, player_name: str, reason: DeathReason):
         if player_name and self.players[player_name].is_alive:
-            self.players[player_name].is_alive = False
+            self.set_alive(player_name, False)
+            self.record_death(player_name, reason.name.lower())
             self.announce(
                 self.prompts["game"]["death"].format(player_name, reason.value),
                 self.all_player_names,
@@ -537,7 +596,7 @@ class WerewolfGame(Game):
             if can_have_last_words:
                 player = self.players[player_name]
                 prompt = self.prompts["game"]["last_words_prompt"].format(player_name)
-                last_words = player.speak(prompt)
+                last_words = await player.speak(prompt)
                 if last_words:
                     self.announce(
                         self.prompts["game"]["last_words_content"].format(
@@ -545,18 +604,20 @@ class WerewolfGame(Game):
                         ),
                         self.all_player_names,
                         "#:",
+                        player_name,
                     )
                 else:
                     self.announce(
                         self.prompts["game"]["last_words_silence"].format(player_name),
                         self.all_player_names,
                         "#@",
+                        player_name,
                     )
 
             if self.players[player_name].role == Role.HUNTER.value:
-                self.handle_hunter_shot(player_name)
+                await self.handle_hunter_shot(player_name)
 
-    def handle_hunter_shot(self, hunter_name: str):
+    async def handle_hunter_shot(self, hunter_name: str):
         self.announce(
             self.prompts["roles"]["hunter"]["death_trigger"].format(hunter_name),
             self.all_player_names,
@@ -568,37 +629,48 @@ class WerewolfGame(Game):
                 alive_players_for_shot.append(p)
         hunter_player = self.players[hunter_name]
         prompt = self.prompts["roles"]["hunter"]["shoot_prompt"].format(hunter_name)
-        target = hunter_player.choose(prompt, alive_players_for_shot, allow_skip=True)
+        target = await hunter_player.choose(
+            prompt, alive_players_for_shot, allow_skip=True
+        )
 
         if target == "skip":
             self.announce(
-                self.prompts["roles"]["hunter"]["skip"], self.all_player_names, "#@"
+                self.prompts["roles"]["hunter"]["skip"],
+                self.all_player_names,
+                "#@",
+                hunter_name,
             )
         else:
             self.announce(
                 self.prompts["roles"]["hunter"]["shot"].format(hunter_name, target),
                 self.all_player_names,
                 "#@",
+                hunter_name,
             )
-            self.handle_death(target, DeathReason.SHOT_BY_HUNTER)
+            await self.handle_death(target, DeathReason.SHOT_BY_HUNTER)
 
-    def check_game_over(self):
-        alive_werewolves = self.get_alive_players([Role.WEREWOLF])
-        alive_villagers = self.get_alive_players(
-            [Role.VILLAGER, Role.SEER, Role.WITCH, Role.HUNTER, Role.GUARD]
-        )
+    def role_team(self, role: str) -> str:
+        if role == Role.WEREWOLF.value:
+            return Team.WEREWOLF.value
+        return Team.VILLAGER.value
+
+    def evaluate_winner(self) -> Optional[str]:
+        alive_werewolves = self.count_alive(team=Team.WEREWOLF.value)
+        alive_villagers = self.count_alive(team=Team.VILLAGER.value)
 
         if not alive_werewolves:
-            self.announce(
-                self.prompts["game"]["over_villager_win"], self.all_player_names, "#!"
-            )
-            return True
-        elif len(alive_werewolves) >= len(alive_villagers):
-            self.announce(
-                self.prompts["game"]["over_werewolf_win"], self.all_player_names, "#!"
-            )
-            return True
-        return False
+            return Team.VILLAGER.value
+        elif alive_werewolves >= alive_villagers:
+            return Team.WEREWOLF.value
+        return None
+
+    def on_game_over(self, winner: str):
+        super().on_game_over(winner)
+        if winner == Team.VILLAGER.value:
+            message = self.prompts["game"]["over_villager_win"]
+        else:
+            message = self.prompts["game"]["over_werewolf_win"]
+        self.announce(message, self.all_player_names, "#!")
 
 
 if __name__ == "__main__":
@@ -625,6 +697,6 @@ if __name__ == "__main__":
         init_players = []
 
     game = WerewolfGame(init_players)
-    game.run_game()
+    game.run_blocking()
 
 Game = WerewolfGame
@@ -7,7 +7,8 @@ import time
 import webbrowser
 
 from src.Config import load_config
-from src.Logger import get_logger
+from src.Logger import configure_logging, get_logger
+from src.Retention import start_retention
 from src.Server import app, socketio
 
 log = get_logger("APP")
@@ -139,13 +140,23 @@ def wait_for_server(host, port, timeout=10):
 
 
 def main():
-    config = load_config()
+    config = load_config() or {}
     log.info(f"配置加载完成: {config}")
 
     DEBUG_APP = os.getenv("DEBUG_APP", "0") == "1"
     MODE = os.getenv("MODE", "desktop")
     log.info(f"DEBUG_APP 模式: {DEBUG_APP}, 运行模式: {MODE}")
 
+    # 调试模式下 Flask 重载器的父子进程会同时写同一个日志文件, 需要跨进程文件锁
+    if DEBUG_APP and MODE != "desktop":
+        config.setdefault("logging", {}).setdefault("multiprocess", True)
+    configure_logging(config)
+    # 后台压缩已结束对局的日志, 并按保留策略清理;
+    # 启用重载器时只在实际提供服务的子进程中运行, 父进程只负责监视文件变化
+    reloader = DEBUG_APP and MODE != "desktop"
+    if not reloader or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_retention(config)
+
     override_index_zoom()
 
     host = "127.0.0.1"
@@ -0,0 +1,134 @@
+"""
+大厅模式基准: 在 20/50/100 名玩家下运行若干天狼人杀, 统计每天耗时, 内存峰值与平均上下文长度.
+
+模型调用被替换为本地应答 (随机选择选项, 发言固定为 400 字), 思考延迟设为 0,
+默认测得的是引擎自身的开销; 可用 --latency 为每次模型调用加上固定延迟.
+
+用法: python bench/large_lobby.py [天数] [--off] [--latency=秒]
+    --off  关闭大厅模式作为对照
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.pop("DEBUG_GAME", None)
+
+import src.Logger as Logger  # noqa: E402
+import src.Player as Player  # noqa: E402
+
+SIZES = (20, 50, 100)
+CHOICES_MARK = "请从以下选项中选择: "
+
+context_chars = []
+model_latency = 0.0
+_fake_rng = random.Random(0)
+
+
+async def fake_acompletion(model, messages, **kwargs):
+    """代替模型调用: 记录上下文长度, 随机选择一个选项或返回固定长度的发言."""
+    context_chars.append(sum(len(m["content"]) for m in messages))
+    await asyncio.sleep(model_latency)
+    prompt = messages[-1]["content"]
+    if CHOICES_MARK in prompt:
+        options = prompt.split(CHOICES_MARK, 1)[1].split(", ")
+        content = _fake_rng.choice(options)
+    else:
+        content = "发言" * 200
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def load_werewolf(large_lobby: bool):
+    path = ROOT / ".games" / "werewolf" / "game.py"
+    spec = importlib.util.spec_from_file_location("bench_werewolf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    class BenchGame(module.Game):
+        def _load_game_data(self):
+            player_config_map = super()._load_game_data()
+            self.config = {
+                **self.config,
+                "think_delay": {"choose": (0, 0), "speak": (0, 0)},
+            }
+            if not large_lobby:
+                self.config["large_lobby"] = {"threshold": 10**9}
+            self.configure_lobby(len(self.all_player_names))
+            return player_config_map
+
+    return BenchGame
+
+
+async def play(game, days):
+    """运行游戏直到超过指定天数, 返回第一天开始的时间 (不计发牌阶段)."""
+    task = asyncio.create_task(game.run_game())
+    first_day = None
+    while not task.done():
+        if first_day is None and game.day_number >= 1:
+            first_day = time.perf_counter()
+        if game.day_number > days:
+            game.stop_game()
+        await asyncio.sleep(0.01)
+    await task
+    return first_day
+
+
+def run(game_class, size, days, log_root):
+    Logger.GAMES_LOG_DIR = log_root / str(size)
+    players = [{"player_name": f"P{i:03d}", "human": False} for i in range(size)]
+    context_chars.clear()
+
+    tracemalloc.start()
+    game = game_class(players, seed=size)
+    started = asyncio.run(play(game, days))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    game.logger.close()
+
+    played = max(min(game.day_number, days), 1)
+    average = sum(context_chars) / max(len(context_chars), 1)
+    return elapsed / played, peak, average
+
+
+def main():
+    global model_latency
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    days = int(args[0]) if args else 2
+    large_lobby = "--off" not in sys.argv
+    for arg in sys.argv[1:]:
+        if arg.startswith("--latency="):
+            model_latency = float(arg.split("=", 1)[1])
+    Player.acompletion = fake_acompletion
+    game_class = load_werewolf(large_lobby)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, open(
+        os.devnull, "w"
+    ) as null, contextlib.redirect_stdout(null):
+        for size in SIZES:
+            results.append((size, *run(game_class, size, days, Path(tmp))))
+
+    mode = "on" if large_lobby else "off"
+    print(f"large_lobby={mode} days={days} latency={model_latency}s")
+    for size, per_day, peak, average in results:
+        print(
+            f"players={size:3d} sec/day={per_day:6.2f} peak={peak / 2**20:6.1f} MiB"
+            f" avg_context={average:8.0f} chars"
+        )
+
+
+if __name__ == "__main__":
+    main()
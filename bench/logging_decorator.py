@@ -0,0 +1,157 @@
+"""
+日志装饰器基准: 比较旧实现 (每次调用都解析签名, 绑定参数并格式化) 与 DecoratorFactory
+在每次调用上的额外开销.
+
+1. 直接调用: 无字段 / 有字段的模板, 日志级别开启 / 关闭, 与未装饰的函数对比.
+2. 请求负载: 多个线程通过 Flask 测试客户端并发请求被装饰的路由.
+
+记录器只挂 NullHandler, 测得的是装饰器本身的开销, 不含写日志的 I/O.
+
+用法: python bench/logging_decorator.py [调用次数] [--threads=线程数]
+"""
+
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.Logger import DecoratorFactory  # noqa: E402
+
+TEMPLATES = (("constant", "唤起玩家添加函数"), ("fields", "参数 a={a}, b={b}"))
+
+
+def legacy_decorator(logger, level, message_template):
+    """改动前的实现, 作为对照."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound_args = inspect.signature(func).bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            all_args = bound_args.arguments
+            format_dict = {
+                **all_args,
+                "func_name": func.__name__,
+                "args": args,
+                "kwargs": kwargs,
+            }
+            logger.log(level, message_template.format(*args, **format_dict))
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def make_logger(name, level):
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+def target(a, b=2):
+    return a
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i, b=3)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bench_calls(calls):
+    baseline = per_call(target, calls)
+    rows = []
+    for enabled in (True, False):
+        logger = make_logger(
+            "bench.decorator", logging.DEBUG if enabled else logging.WARNING
+        )
+        factory = DecoratorFactory(logger)
+        for label, template in TEMPLATES:
+            old = legacy_decorator(logger, logging.INFO, template)(target)
+            new = factory.info(template)(target)
+            rows.append(
+                (
+                    "on" if enabled else "off",
+                    label,
+                    per_call(old, calls) - baseline,
+                    per_call(new, calls) - baseline,
+                )
+            )
+    return baseline, rows
+
+
+def bench_requests(calls, threads):
+    from flask import Flask
+
+    logger = make_logger("bench.requests", logging.DEBUG)
+    factory = DecoratorFactory(logger)
+    app = Flask(__name__)
+
+    def api_players_add(pid="0"):
+        return {"ok": True, "pid": pid}
+
+    app.add_url_rule("/plain/<pid>", "plain", api_players_add)
+    app.add_url_rule(
+        "/old/<pid>",
+        "old",
+        legacy_decorator(logger, logging.INFO, "唤起玩家添加函数 {pid}")(
+            api_players_add
+        ),
+    )
+    app.add_url_rule(
+        "/new/<pid>", "new", factory.info("唤起玩家添加函数 {pid}")(api_players_add)
+    )
+
+    def load(path):
+        def worker():
+            client = app.test_client()
+            for i in range(calls):
+                client.get(f"/{path}/{i}")
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        return (time.perf_counter() - start) / (calls * threads) * 1e6
+
+    return {path: load(path) for path in ("plain", "old", "new")}
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    calls = int(args[0]) if args else 100000
+    threads = 8
+    for arg in sys.argv[1:]:
+        if arg.startswith("--threads="):
+            threads = int(arg.split("=", 1)[1])
+
+    baseline, rows = bench_calls(calls)
+    print(f"calls={calls} undecorated={baseline:.2f} us/call")
+    print("level template  old(us)  new(us)   (额外开销, 已减去未装饰的调用)")
+    for enabled, label, old, new in rows:
+        print(f"{enabled:5s} {label:8s} {old:8.2f} {new:8.2f}")
+
+    requests = max(calls // 100, 100)
+    result = bench_requests(requests, threads)
+    print(f"requests={requests}x{threads} threads (平均每个请求, us)")
+    print(
+        f"plain={result['plain']:.1f} old={result['old']:.1f} new={result['new']:.1f}"
+        f" -> 装饰器开销 old={result['old'] - result['plain']:.1f}"
+        f" new={result['new'] - result['plain']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
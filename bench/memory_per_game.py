@@ -0,0 +1,82 @@
+"""
+测量每局游戏常驻内存的基准脚本.
+
+构造 N 局狼人杀游戏并完成 setup_game (建立玩家, 日志与索引),
+同时为每个步骤保留一个 ActionContext, 模拟批次执行中的上下文,
+用 tracemalloc 统计平均每局的内存占用.
+
+用法: python bench/memory_per_game.py [局数]
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import src.Logger as Logger  # noqa: E402
+
+
+def load_werewolf():
+    path = ROOT / ".games" / "werewolf" / "game.py"
+    spec = importlib.util.spec_from_file_location("bench_werewolf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Game
+
+
+async def build_games(game_class, count, log_root):
+    # 日志写入临时目录; 每局的目录名含会话编号, 同一秒内创建的游戏也不会冲突
+    Logger.GAMES_LOG_DIR = log_root
+    games = []
+    for i in range(count):
+        games.append(game_class([], seed=i))
+    await asyncio.gather(*(g.setup_game() for g in games))
+    contexts = []
+    for g in games:
+        g._init_phases()
+        contexts.append(
+            [g._step_context(step) for phase in g.phases for step in phase.steps]
+        )
+    return games, contexts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    game_class = load_werewolf()
+
+    # 控制台公告写入 devnull, 不计入测量
+    with tempfile.TemporaryDirectory() as tmp, open(
+        os.devnull, "w"
+    ) as null, contextlib.redirect_stdout(null):
+        # 预热: 编译游戏定义并加载提示词, 这些是进程级共享开销
+        asyncio.run(build_games(game_class, 1, Path(tmp) / "warmup"))
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        games, contexts = asyncio.run(build_games(game_class, count, Path(tmp)))
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = after.compare_to(before, "lineno")
+        total = sum(s.size_diff for s in stats)
+        if os.getenv("BENCH_TOP"):
+            for s in stats[: int(os.environ["BENCH_TOP"])]:
+                print(s, file=sys.stderr)
+        for g in games:
+            g.logger.close()
+
+    players = sum(len(g.players) for g in games)
+    print(f"games={count} players={players}")
+    print(f"total={total / 1024:.1f} KiB per_game={total / count / 1024:.2f} KiB")
+
+
+if __name__ == "__main__":
+    main()
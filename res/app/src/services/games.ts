@@ -24,12 +24,31 @@ export interface GameNotification {
     content: string;
 }
 
+// 等待人类玩家输入的请求, 回复时需附带 request_id; deadline 为截止时间 (Unix 秒), null 表示不限时
+export interface InputRequest {
+    request_id: string;
+    player_name: string;
+    type: "choice" | "speech";
+    prompt: string;
+    choices: string[];
+    allow_skip: boolean;
+    deadline: number | null;
+}
+
+// 输入请求已超时或被取消, 游戏已按默认动作处理
+export interface InputTimeout {
+    request_id: string;
+    player_name: string;
+}
+
 // 游戏回调函数接口
 export interface GameCallbacks {
     onInfo: (data: GameInfo) => void;
     onPlayers: (data: Player[]) => void;
     onMessage: (data: ChatMessage) => void;
     onNotification: (data: GameNotification) => void;
+    onInputRequest: (data: InputRequest) => void;
+    onInputTimeout: (data: InputTimeout) => void;
 }
 
 /**
@@ -57,6 +76,8 @@ export function joinGame(socket: Socket, callbacks: GameCallbacks) {
     socket.on("game:players", callbacks.onPlayers);
     socket.on("game:message", callbacks.onMessage);
     socket.on("game:notification", callbacks.onNotification);
+    socket.on("game:input_request", callbacks.onInputRequest);
+    socket.on("game:input_timeout", callbacks.onInputTimeout);
 }
 
 export function leaveGame(socket: Socket) {
@@ -65,6 +86,8 @@ export function leaveGame(socket: Socket) {
     socket.off("game:players");
     socket.off("game:message");
     socket.off("game:notification");
+    socket.off("game:input_request");
+    socket.off("game:input_timeout");
 }
 
 /**
@@ -73,7 +96,19 @@ export function leaveGame(socket: Socket) {
  * @param {Player} sender - 发送者玩家对象
  * @param {string} content - 聊天内容
  * @param {string} [sessionId] - 会话ID（可选）
+ * @param {string} [requestId] - 回复的输入请求ID（可选, 不带时消息只作为聊天）
  */
-export function sendChatMessage(socket: Socket, sender: Player, content: string, sessionId?: string) {
-    socket.emit("game:chat", { "sender": sender, "content": content, "sessionId": sessionId });
+export function sendChatMessage(
+    socket: Socket,
+    sender: Player,
+    content: string,
+    sessionId?: string,
+    requestId?: string
+) {
+    socket.emit("game:chat", {
+        "sender": sender,
+        "content": content,
+        "sessionId": sessionId,
+        "requestId": requestId,
+    });
 }
@@ -0,0 +1,240 @@
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+GAMES_DIR = BASE / ".games"
+ANALYTICS_DB = GAMES_DIR / "analytics.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    game_name TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    winner TEXT,
+    days INTEGER,
+    duration REAL,
+    tokens INTEGER,
+    seed INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_games_time ON games (game_name, finished_at);
+CREATE INDEX IF NOT EXISTS idx_games_count ON games (game_name, player_count, finished_at);
+
+CREATE TABLE IF NOT EXISTS seats (
+    game_id TEXT NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    seat INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    model TEXT,
+    human INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    team TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    alive INTEGER NOT NULL,
+    death_day INTEGER,
+    death_reason TEXT,
+    tokens INTEGER,
+    decisions INTEGER,
+    decision_time REAL,
+    PRIMARY KEY (game_id, seat)
+);
+CREATE INDEX IF NOT EXISTS idx_seats_model ON seats (model, role);
+CREATE INDEX IF NOT EXISTS idx_seats_role ON seats (role, won);
+CREATE INDEX IF NOT EXISTS idx_seats_death ON seats (death_day, death_reason);
+"""
+
+SEAT_COLUMNS = (
+    "seat",
+    "name",
+    "model",
+    "human",
+    "role",
+    "team",
+    "won",
+    "alive",
+    "death_day",
+    "death_reason",
+    "tokens",
+    "decisions",
+    "decision_time",
+)
+
+
+class AnalyticsStore:
+    """
+    对局结果的 SQLite 存储: 每局一行 (games), 每个座位一行 (seats).
+    每次操作使用独立的连接, 可以在事件总线的订阅者线程和 Web 请求线程中同时使用.
+    查询参数 since/until 为 ISO 格式的时间字符串 (例如 "2026-10-01"), 按结束时间过滤.
+    """
+
+    def __init__(self, path: Path = ANALYTICS_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            # WAL 模式下读写互不阻塞, 统计查询不会卡住正在结束的对局
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def record(self, result: Dict[str, Any]):
+        """写入一局的结果 (Game.result_record 的返回值), 同一局重复写入时覆盖."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM games WHERE id = ?", (result["id"],))
+            conn.execute(
+                "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result["id"],
+                    result["game_name"],
+                    result["finished_at"],
+                    result["player_count"],
+                    result["winner"],
+                    result["days"],
+                    result["duration"],
+                    result["tokens"],
+                    result["seed"],
+                ),
+            )
+            conn.executemany(
+                f"INSERT INTO seats (game_id, {', '.join(SEAT_COLUMNS)})"
+                f" VALUES (?{', ?' * len(SEAT_COLUMNS)})",
+                [
+                    (result["id"], *(seat[c] for c in SEAT_COLUMNS))
+                    for seat in result["seats"]
+                ],
+            )
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def _filters(
+        game_name: Optional[str] = None,
+        player_count: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Tuple[str, Tuple]:
+        """构造针对 games 表 (别名 g) 的 WHERE 子句."""
+        clauses, params = [], []
+        if game_name is not None:
+            clauses.append("g.game_name = ?")
+            params.append(game_name)
+        if player_count is not None:
+            clauses.append("g.player_count = ?")
+            params.append(player_count)
+        if since is not None:
+            clauses.append("g.finished_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("g.finished_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def win_rates(self, **filters) -> Dict[str, Any]:
+        """各阵营的胜场与胜率."""
+        where, params = self._filters(**filters)
+        rows = self._query(
+            f"SELECT g.winner AS winner, COUNT(*) AS wins FROM games g {where}"
+            " GROUP BY g.winner",
+            params,
+        )
+        total = sum(row["wins"] for row in rows)
+        return {
+            "games": total,
+            "wins": {row["winner"]: row["wins"] for row in rows},
+            "win_rates": {row["winner"]: row["wins"] / total for row in rows},
+        }
+
+    def model_stats(self, role: Optional[str] = None, **filters) -> List[Dict[str, Any]]:
+        """按模型 (以及角色) 汇总的胜率, 平均 token 用量和平均决策延迟. 人类玩家不计入."""
+        where, params = self._filters(**filters)
+        where = f"{where} AND" if where else "WHERE"
+        where += " s.model IS NOT NULL"
+        if role is not None:
+            where += " AND s.role = ?"
+            params += (role,)
+        return self._query(
+            "SELECT s.model AS model, s.role AS role, COUNT(*) AS games,"
+            " SUM(s.won) AS wins, AVG(s.won) AS win_rate, AVG(s.tokens) AS avg_tokens,"
+            " SUM(s.decision_time) / NULLIF(SUM(s.decisions), 0) AS avg_latency"
+            f" FROM seats s JOIN games g ON g.id = s.game_id {where}"
+            " GROUP BY s.model, s.role ORDER BY s.model, s.role",
+            params,
+        )
+
+    def death_stats(self, **filters) -> List[Dict[str, Any]]:
+        """按天数和原因统计死亡人数."""
+        where, params = self._filters(**filters)
+        where = f"{where} AND" if where else "WHERE"
+        return self._query(
+            "SELECT s.death_day AS day, s.death_reason AS reason, COUNT(*) AS deaths"
+            f" FROM seats s JOIN games g ON g.id = s.game_id {where}"
+            " s.death_day IS NOT NULL"
+            " GROUP BY s.death_day, s.death_reason ORDER BY s.death_day, deaths DESC",
+            params,
+        )
+
+    def recent_games(
+        self, limit: int = 20, offset: int = 0, **filters
+    ) -> List[Dict[str, Any]]:
+        """最近结束的对局, 按结束时间倒序分页."""
+        where, params = self._filters(**filters)
+        return self._query(
+            f"SELECT g.* FROM games g {where}"
+            " ORDER BY g.finished_at DESC LIMIT ? OFFSET ?",
+            params + (limit, offset),
+        )
+
+    def game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """单局结果及其全部座位."""
+        rows = self._query("SELECT * FROM games WHERE id = ?", (game_id,))
+        if not rows:
+            return None
+        result = rows[0]
+        result["seats"] = self._query(
+            "SELECT * FROM seats WHERE game_id = ? ORDER BY seat", (game_id,)
+        )
+        return result
+
+
+_store: Optional[AnalyticsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> AnalyticsStore:
+    """返回默认的结果存储 (.games/analytics.db), 首次调用时建表."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AnalyticsStore()
+    return _store
+
+
+if __name__ == "__main__":
+    # 用法: python -m src.Analytics [游戏名] [起始日期]
+    game_name = sys.argv[1] if len(sys.argv) > 1 else None
+    since = sys.argv[2] if len(sys.argv) > 2 else None
+
+    store = get_store()
+    rates = store.win_rates(game_name=game_name, since=since)
+    print(f"对局数: {rates['games']}")
+    for winner, rate in rates["win_rates"].items():
+        print(f"  {winner}: {rate:.1%} ({rates['wins'][winner]} 局)")
+    for row in store.model_stats(game_name=game_name, since=since):
+        latency = row["avg_latency"]
+        print(
+            f"  {row['model']:40s} {row['role']:10s} 胜率 {row['win_rate']:.1%}"
+            f" ({row['games']} 局) 平均延迟 {'-' if latency is None else f'{latency:.2f}s'}"
+        )
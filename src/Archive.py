@@ -0,0 +1,295 @@
+import bisect
+import json
+import os
+import sys
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Logger import EVENTS_FILE, GAMES_LOG_DIR, GAMES_LOG_FORMATTER, RESULT_FILE
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+# 索引中每隔多少条事件记录一个文件位置, 随机读取时最多多读这么多行
+INDEX_STRIDE = 200
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 压缩归档后的对局 (见 src/Retention.py): 日志目录中的单个 <对局编号>.zip,
+# 事件文件按索引检查点切分成块, 每块以其在原事件文件中的起始位置命名
+PACKED_SUFFIX = ".zip"
+EVENT_CHUNK = "events/{}.jsonl"
+
+
+def is_packed(path: Path) -> bool:
+    """是否为压缩归档后的对局文件 (而不是日志目录)."""
+    return path.suffix == PACKED_SUFFIX
+
+
+def game_id_of(path: Path) -> str:
+    """日志目录或归档文件对应的对局编号."""
+    return path.stem if is_packed(path) else path.name
+
+
+def game_dir(game_id: str, log_root: Path = GAMES_LOG_DIR) -> Path:
+    """
+    对局编号对应的日志目录, 已压缩归档时为归档文件.
+    编号不合法或对局不存在时抛出 FileNotFoundError.
+    """
+    path = (log_root / game_id).resolve()
+    if path.parent == log_root.resolve():
+        # 压缩后没能删除的残余目录可能与归档文件并存, 以归档文件为准
+        packed = path.with_name(path.name + PACKED_SUFFIX)
+        if packed.is_file():
+            return packed
+        if (path / EVENTS_FILE).exists():
+            return path
+    raise FileNotFoundError(f"未找到对局: {game_id}")
+
+
+def has_member(path: Path, name: str) -> bool:
+    """对局 (目录或归档文件) 中是否有某个文件."""
+    if not is_packed(path):
+        return (path / name).exists()
+    with zipfile.ZipFile(path) as zf:
+        return name in zf.NameToInfo
+
+
+@contextmanager
+def open_member(path: Path, name: str) -> Iterator[IO[bytes]]:
+    """以二进制方式打开对局中的文件, 不存在时抛出 FileNotFoundError (归档文件中为 KeyError)."""
+    if not is_packed(path):
+        with open(path / name, "rb") as f:
+            yield f
+        return
+    with zipfile.ZipFile(path) as zf, zf.open(name) as f:
+        yield f
+
+
+def load_result(path: Path) -> Optional[Dict[str, Any]]:
+    """读取对局结果 (result.json), 未结束的对局返回 None."""
+    try:
+        with open_member(path, RESULT_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def chunk_starts(index: Dict[str, Any]) -> List[int]:
+    """归档文件中各事件块在原事件文件中的起始位置: 文件开头及除第一个以外的各检查点."""
+    return [0] + [offset for _, offset in index["checkpoints"][1:]]
+
+
+def _event_lines(
+    path: Path, offset: int, index: Dict[str, Any]
+) -> Iterator[bytes]:
+    """从原事件文件的 offset 处开始逐行产出记录; 归档文件只解压 offset 所在及之后的块."""
+    if not is_packed(path):
+        with open(path / EVENTS_FILE, "rb") as f:
+            f.seek(offset)
+            yield from f
+        return
+
+    starts = chunk_starts(index)
+    first = max(bisect.bisect_right(starts, offset) - 1, 0)
+    with zipfile.ZipFile(path) as zf:
+        for start in starts[first:]:
+            with zf.open(EVENT_CHUNK.format(start)) as f:
+                if start < offset:
+                    f.read(offset - start)
+                yield from f
+
+
+def build_index(directory: Path, save: bool = False) -> Dict[str, Any]:
+    """
+    扫描一次事件文件, 建立偏移索引: 座位掩码位, 各阶段 (天数, 阶段名) 的起始事件和文件位置,
+    以及每 INDEX_STRIDE 条事件的检查点. save=True 时写入 index.json.
+    """
+    events_path = Path(directory) / EVENTS_FILE
+    seats: Dict[str, int] = {}
+    phases: List[Dict[str, Any]] = []
+    checkpoints: List[List[int]] = []
+    count = 0
+    offset = 0
+    with open(events_path, "rb") as f:
+        for line in f:
+            record = json.loads(line)
+            if "seat" in record:
+                seats[record["seat"]] = record["bit"]
+            elif "mark" in record:
+                phases.append(
+                    {
+                        "day": record["day"],
+                        "phase": record["mark"],
+                        "seq": record["seq"],
+                        "offset": record["offset"],
+                    }
+                )
+            else:
+                if count % INDEX_STRIDE == 0:
+                    checkpoints.append([count, offset])
+                count += 1
+            offset += len(line)
+
+    index = {
+        "version": INDEX_VERSION,
+        "size": offset,
+        "events": count,
+        "seats": seats,
+        # 阶段标记在阶段结束时写入, 按起始位置排序
+        "phases": sorted(phases, key=lambda p: p["seq"]),
+        "checkpoints": checkpoints,
+    }
+    if save:
+        path = Path(directory) / INDEX_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    return index
+
+
+def load_index(directory: Path) -> Dict[str, Any]:
+    """
+    读取对局的偏移索引. 索引不存在或已过期 (事件文件大小变化, 例如对局仍在进行)
+    时重新建立; 已结束的对局会把新索引写回文件. 归档文件中的索引不会过期.
+    """
+    directory = Path(directory)
+    if is_packed(directory):
+        with open_member(directory, INDEX_FILE) as f:
+            return json.load(f)
+    size = (directory / EVENTS_FILE).stat().st_size
+    try:
+        with open(directory / INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index["size"] == size:
+            return index
+    except (OSError, ValueError):
+        pass
+    return build_index(directory, save=(directory / RESULT_FILE).exists())
+
+
+def phase_range(
+    index: Dict[str, Any], day: int, phase: Optional[str] = None
+) -> Optional[Dict[str, int]]:
+    """某天 (某阶段) 的事件范围 {start, end, offset}, 找不到时返回 None."""
+    phases = index["phases"]
+    for i, p in enumerate(phases):
+        if p["day"] == day and (phase is None or p["phase"] == phase):
+            end = index["events"]
+            for q in phases[i + 1 :]:
+                if phase is not None or q["day"] != day:
+                    end = q["seq"]
+                    break
+            return {"start": p["seq"], "end": end, "offset": p["offset"]}
+    return None
+
+
+def read_events(
+    directory: Path,
+    start: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    index: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    读取从第 start 条 (从 0 开始) 起的至多 limit 条事件. 先按索引定位到不超过 start
+    的最近位置 (检查点或阶段起点), 再顺序读取, 不需要读取整个文件.
+    每条事件附带可见玩家名单, 执行者 (旧记录中没有时为 None), 以及所属的天数和阶段.
+    """
+    index = index or load_index(directory)
+    limit = max(0, min(limit, MAX_PAGE_SIZE))
+    if start >= index["events"] or not limit:
+        return []
+
+    positions = [tuple(c) for c in index["checkpoints"]]
+    positions += [(p["seq"], p["offset"]) for p in index["phases"]]
+    positions.sort()
+    i = bisect.bisect_right(positions, (start, float("inf"))) - 1
+    offset = positions[i][1] if i >= 0 else 0
+
+    names = {bit: name for name, bit in index["seats"].items()}
+    phases = index["phases"]
+    phase_starts = [p["seq"] for p in phases]
+    events = []
+    for line in _event_lines(Path(directory), offset, index):
+        record = json.loads(line)
+        if "seq" not in record or "m" not in record:
+            continue
+        seq = record["seq"] - 1
+        if seq < start:
+            continue
+        mask = record["v"]
+        visible_to = None
+        if mask is not None:
+            visible_to = [n for bit, n in names.items() if mask & (1 << bit)]
+        i = bisect.bisect_right(phase_starts, seq) - 1
+        phase = phases[i] if i >= 0 else None
+        events.append(
+            {
+                "seq": seq,
+                "time": record["t"],
+                "message": record["m"],
+                "visible_to": visible_to,
+                "actor": record.get("a"),
+                "day": phase["day"] if phase else 0,
+                "phase": phase["phase"] if phase else None,
+            }
+        )
+        if len(events) >= limit:
+            break
+    return events
+
+
+def iter_events(directory: Path, start: int = 0, page_size: int = DEFAULT_PAGE_SIZE):
+    """按页依次产出从 start 开始的全部事件, 每次只在内存中保留一页."""
+    index = load_index(directory)
+    while True:
+        page = read_events(directory, start, page_size, index)
+        if not page:
+            return
+        yield from page
+        start = page[-1]["seq"] + 1
+
+
+def event_gap(previous: str, current: str) -> float:
+    """两条事件记录时间之间的秒数 (记录时间不含年份, 跨年时按 0 处理)."""
+    fmt = GAMES_LOG_FORMATTER.datefmt
+    try:
+        gap = (
+            datetime.strptime(current, fmt) - datetime.strptime(previous, fmt)
+        ).total_seconds()
+    except ValueError:
+        return 0.0
+    return max(gap, 0.0)
+
+
+def list_games(
+    offset: int = 0, limit: int = 20, log_root: Path = GAMES_LOG_DIR
+) -> Dict[str, Any]:
+    """
+    已结束的对局 (有结果文件的目录, 以及归档文件), 按时间倒序分页;
+    只读取当前页的结果文件, 归档文件按名称即可判断, 不需要逐个检查.
+    """
+    # 对局编号 -> 路径; 目录和归档文件并存时 (压缩过程中) 以归档文件为准
+    found: Dict[str, Path] = {}
+    if log_root.exists():
+        with os.scandir(log_root) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                if is_packed(path):
+                    found[game_id_of(path)] = path
+                elif os.path.exists(os.path.join(entry.path, RESULT_FILE)):
+                    found.setdefault(path.name, path)
+    paths = [found[game_id] for game_id in sorted(found, reverse=True)]
+    items = []
+    for path in paths[offset : offset + limit]:
+        # 被停止的对局压缩后没有结果文件, 只列出编号
+        result = load_result(path) or {"id": game_id_of(path), "winner": None}
+        items.append({key: value for key, value in result.items() if key != "seats"})
+    return {"total": len(paths), "items": items}
@@ -0,0 +1,301 @@
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 角色编码; 定义中未知的角色按没有技能的好人处理
+VILLAGER, WEREWOLF, SEER, WITCH, HUNTER, GUARD = range(6)
+ROLE_CODES = {
+    "villager": VILLAGER,
+    "werewolf": WEREWOLF,
+    "seer": SEER,
+    "witch": WITCH,
+    "hunter": HUNTER,
+    "guard": GUARD,
+}
+
+# 胜负编码
+NO_WINNER, VILLAGER_WIN, WEREWOLF_WIN = range(3)
+
+
+@dataclass
+class BotPolicy:
+    """
+    模拟使用的简单机器人策略参数 (均为概率).
+    所有选择在候选人中均匀随机, 这些参数只控制是否采取行动.
+    """
+
+    # 女巫在看到刀口时使用解药的概率
+    witch_save: float = 0.9
+    # 女巫每晚使用毒药 (随机毒一名其他玩家) 的概率
+    witch_poison: float = 0.2
+    # 猎人死亡时开枪的概率
+    hunter_shoot: float = 0.8
+    # 预言家查到狼人后, 其他好人跟随其投票的概率
+    seer_trust: float = 0.6
+
+
+@dataclass
+class BalanceReport:
+    """某个人数和角色配置下的模拟结果."""
+
+    player_count: int
+    roles: Dict[str, int]
+    games: int
+    villager_win_rate: float = 0.0
+    werewolf_win_rate: float = 0.0
+    # 达到天数上限仍未分出胜负的比例
+    unfinished_rate: float = 0.0
+    average_days: float = 0.0
+    elapsed: float = 0.0
+    policy: Dict[str, float] = field(default_factory=dict)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("平衡分析需要 numpy, 请先安装: pip install numpy")
+
+
+def _pick(rng, mask):
+    """
+    在每行为 True 的位置中均匀随机选一个.
+    返回 (索引, 是否有可选位置), 两者形状均为 (B,).
+    """
+    keys = np.where(mask, rng.random(mask.shape), -1.0)
+    return keys.argmax(axis=1), mask.any(axis=1)
+
+
+class _Batch:
+    """一批同配置对局的数组表示: 每行一局, 每列一个座位."""
+
+    def __init__(self, rng, role_vector, size: int, policy: BotPolicy):
+        self.rng = rng
+        self.policy = policy
+        players = len(role_vector)
+        # 每局独立随机排列角色
+        order = rng.random((size, players)).argsort(axis=1)
+        self.roles = np.asarray(role_vector, dtype=np.int8)[order]
+        self.alive = np.ones((size, players), dtype=bool)
+        self.wolf = self.roles == WEREWOLF
+        self.rows = np.arange(size)
+        self.cols = np.arange(players)
+
+        self.ongoing = np.ones(size, dtype=bool)
+        self.winner = np.zeros(size, dtype=np.int8)
+        self.days = np.zeros(size, dtype=np.int32)
+        self.last_guarded = np.full(size, -1)
+        self.save_used = np.zeros(size, dtype=bool)
+        self.poison_used = np.zeros(size, dtype=bool)
+        # 预言家查验过的座位, 以及其中的狼人
+        self.checked = np.zeros((size, players), dtype=bool)
+
+    def seat_of(self, role: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """每局中该角色所在的座位, 以及该角色是否存在且存活."""
+        mask = self.roles == role
+        seat = mask.argmax(axis=1)
+        return seat, mask.any(axis=1) & self.alive[self.rows, seat]
+
+    def check_winner(self):
+        wolves = (self.alive & self.wolf).sum(axis=1)
+        goods = self.alive.sum(axis=1) - wolves
+        villager = self.ongoing & (wolves == 0)
+        werewolf = self.ongoing & ~villager & (wolves >= goods)
+        self.winner[villager] = VILLAGER_WIN
+        self.winner[werewolf] = WEREWOLF_WIN
+        self.ongoing &= ~(villager | werewolf)
+
+    def kill(self, rows, seats):
+        """处死 rows 中各局的指定座位, 死者为猎人时按策略开枪带走一名存活玩家."""
+        rows = np.nonzero(rows)[0]
+        if not len(rows):
+            return
+        seats = seats[rows]
+        self.alive[rows, seats] = False
+
+        hunters = rows[self.roles[rows, seats] == HUNTER]
+        hunters = hunters[self.rng.random(len(hunters)) < self.policy.hunter_shoot]
+        if len(hunters):
+            target, valid = _pick(self.rng, self.alive[hunters])
+            self.alive[hunters[valid], target[valid]] = False
+
+    def night(self):
+        active = self.ongoing.copy()
+        self.days[active] += 1
+
+        # 守卫: 守护一名存活玩家, 不能连续两晚守同一人
+        guard, guard_alive = self.seat_of(GUARD)
+        can_guard = self.alive & (self.cols != self.last_guarded[:, None])
+        guarded, valid = _pick(self.rng, can_guard)
+        guarding = active & guard_alive & valid
+        self.last_guarded = np.where(guarding, guarded, -1)
+
+        # 狼人: 刀一名存活的好人
+        victim, has_victim = _pick(self.rng, self.alive & ~self.wolf)
+        killed = active & has_victim & ~(guarding & (guarded == victim))
+
+        # 预言家: 查验一名未查验过的存活玩家
+        seer, seer_alive = self.seat_of(SEER)
+        unchecked = self.alive & ~self.checked & (self.cols != seer[:, None])
+        target, valid = _pick(self.rng, unchecked)
+        checking = active & seer_alive & valid
+        self.checked[self.rows[checking], target[checking]] = True
+
+        # 女巫: 看到刀口时按概率救人, 之后按概率毒一名其他存活玩家
+        witch, witch_alive = self.seat_of(WITCH)
+        witching = active & witch_alive
+        save = (
+            witching
+            & killed
+            & ~self.save_used
+            & (self.rng.random(len(killed)) < self.policy.witch_save)
+        )
+        self.save_used |= save
+        killed &= ~save
+
+        others = self.alive & (self.cols != witch[:, None])
+        poisoned, valid = _pick(self.rng, others)
+        poison = (
+            witching
+            & ~self.poison_used
+            & valid
+            & (self.rng.random(len(valid)) < self.policy.witch_poison)
+        )
+        self.poison_used |= poison
+
+        # 天亮结算夜间死亡
+        self.kill(killed, victim)
+        self.kill(poison & self.alive[self.rows, poisoned], poisoned)
+        self.check_winner()
+
+    def day(self):
+        active = self.ongoing.copy()
+        size, players = self.alive.shape
+
+        # 预言家存活并查到过存活的狼人时, 公开报出查验结果
+        seer, seer_alive = self.seat_of(SEER)
+        found = self.checked & self.wolf & self.alive
+        accused, has_accused = found.argmax(axis=1), found.any(axis=1)
+        has_accused &= seer_alive
+
+        votes = np.zeros((size, players), dtype=np.int32)
+        for voter in range(players):
+            voting = active & self.alive[:, voter]
+            is_wolf = self.wolf[:, voter]
+            # 狼人投好人, 好人投除自己以外的任意存活玩家
+            candidates = self.alive & (self.cols != voter)
+            candidates &= ~(is_wolf[:, None] & self.wolf)
+            choice, valid = _pick(self.rng, candidates)
+
+            follow = (
+                has_accused
+                & ~is_wolf
+                & ((seer == voter) | (self.rng.random(size) < self.policy.seer_trust))
+            )
+            choice = np.where(follow, accused, choice)
+            voting &= valid | follow
+            votes[self.rows[voting], choice[voting]] += 1
+
+        # 得票唯一最多者出局; 与 DayVote (retry_on_tie=False) 一致, 平票时无人出局
+        top = votes.max(axis=1)
+        out = votes.argmax(axis=1)
+        unique = (votes == top[:, None]).sum(axis=1) == 1
+        self.kill(active & (top > 0) & unique, out)
+        self.check_winner()
+
+
+def role_vector(roles: Dict[str, int]) -> List[int]:
+    vector = []
+    for role, count in roles.items():
+        vector.extend([ROLE_CODES.get(role, VILLAGER)] * count)
+    return vector
+
+
+def analyze(
+    roles: Dict[str, int],
+    games: int = 100_000,
+    policy: Optional[BotPolicy] = None,
+    seed: int = 0,
+    batch_size: int = 50_000,
+    max_days: int = 50,
+) -> BalanceReport:
+    """对一种角色配置进行蒙特卡洛模拟, 返回胜率和平均对局天数."""
+    _require_numpy()
+    policy = policy or BotPolicy()
+    vector = role_vector(roles)
+    rng = np.random.default_rng(seed)
+
+    started = time.perf_counter()
+    wins = np.zeros(3, dtype=np.int64)
+    total_days = 0
+    remaining = games
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        remaining -= size
+        batch = _Batch(rng, vector, size, policy)
+        batch.check_winner()
+        for _ in range(max_days):
+            if not batch.ongoing.any():
+                break
+            batch.night()
+            if not batch.ongoing.any():
+                break
+            batch.day()
+        wins += np.bincount(batch.winner, minlength=3)
+        total_days += int(batch.days.sum())
+
+    return BalanceReport(
+        player_count=len(vector),
+        roles=dict(roles),
+        games=games,
+        villager_win_rate=wins[VILLAGER_WIN] / games,
+        werewolf_win_rate=wins[WEREWOLF_WIN] / games,
+        unfinished_rate=wins[NO_WINNER] / games,
+        average_days=total_days / games,
+        elapsed=time.perf_counter() - started,
+        policy=asdict(policy),
+    )
+
+
+def analyze_table(
+    definition,
+    player_counts,
+    games: int = 100_000,
+    policy: Optional[BotPolicy] = None,
+    seed: int = 0,
+) -> List[BalanceReport]:
+    """按游戏定义 (GameDefinition.roles_for) 分析各人数下的角色配置."""
+    return [
+        analyze(definition.roles_for(count), games, policy, seed + count)
+        for count in player_counts
+    ]
+
+
+if __name__ == "__main__":
+    # 用法: python -m src.Balance [游戏名] [最少人数] [最多人数] [每种配置局数]
+    from src.Simulation import load_game_class
+
+    game_name = sys.argv[1] if len(sys.argv) > 1 else "werewolf"
+    low = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    high = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    games = int(sys.argv[4]) if len(sys.argv) > 4 else 100_000
+
+    definition = load_game_class(game_name).load_definition()
+    started = time.perf_counter()
+    for report in analyze_table(definition, range(low, high + 1), games):
+        roles = ", ".join(f"{r} {n}" for r, n in report.roles.items() if n)
+        print(
+            f"{report.player_count:3d} 人 [{roles}] 好人 {report.villager_win_rate:.1%}"
+            f" 狼人 {report.werewolf_win_rate:.1%} 未分胜负 {report.unfinished_rate:.1%}"
+            f" 平均 {report.average_days:.2f} 天 ({report.elapsed:.1f}s)"
+        )
+    print(f"总用时 {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Type
+
+# 订阅者队列的默认容量
+DEFAULT_QUEUE_SIZE = 1024
+# 所有事件总线共享的工作线程数
+DEFAULT_WORKERS = 4
+# 订阅者每次占用工作线程时最多处理的事件数
+DRAIN_BATCH = 64
+
+
+@dataclass(slots=True)
+class GameEvent:
+    """事件总线上传递的事件基类."""
+
+    game_name: str
+    # 发布时刻 (time.monotonic), 用于统计订阅者的处理延迟
+    created: float = field(default_factory=time.monotonic, kw_only=True)
+
+
+@dataclass(slots=True)
+class Announcement(GameEvent):
+    """一条游戏公告. visible_to 为 None 表示公开."""
+
+    message: str
+    visible_to: Optional[List[str]] = None
+    prefix: str = "#:"
+
+
+@dataclass(slots=True)
+class Notice(GameEvent):
+    """临时的状态提示 (例如 "某人正在思考..."), 只推送给客户端和控制台, 不写入事件文件."""
+
+    message: str
+    visible_to: Optional[List[str]] = None
+
+
+@dataclass(slots=True)
+class SnapshotSaved(GameEvent):
+    """存档内容已更新. 日志订阅者先写入此前的事件, 再写入存档文件."""
+
+
+@dataclass(slots=True)
+class GameEnded(GameEvent):
+    """游戏结束 (包括被停止). winner 为 None 表示没有决出胜负."""
+
+    winner: Optional[str] = None
+
+
+class Subscriber:
+    """
+    事件订阅者, 使用有界队列, 由所有总线共享的工作线程池消费.
+    同一订阅者同时只有一个工作线程在处理, 事件按发布顺序处理.
+    publish 从不阻塞. 队列满时按 overflow 处理:
+    "wait" 不丢弃事件 (队列暂时超出容量), 由发布方在安全点通过 EventBus.throttle
+    等待积压降下来, 适用于不能丢失内容的订阅者 (落盘, 推送, 控制台);
+    "drop" 丢弃新事件并计数, 适用于统计类订阅者. GameEnded 总会被处理.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[GameEvent], None],
+        event_types: Tuple[Type[GameEvent], ...] = (GameEvent,),
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = "drop",
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        if overflow not in ("drop", "wait"):
+            raise ValueError(f"未知的队列溢出策略: {overflow}")
+        self.name = name
+        self.handler = handler
+        self.event_types = event_types
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.on_error = on_error
+        self.queue: Deque[GameEvent] = deque()
+        self.handled = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+        # _scheduled: 是否已有工作线程在处理 (或已提交处理任务)
+        self._scheduled = False
+        self._idle = threading.Condition()
+
+    def offer(self, event: GameEvent):
+        if not isinstance(event, self.event_types):
+            return
+        with self._idle:
+            if (
+                self.overflow == "drop"
+                and len(self.queue) >= self.maxsize
+                and not isinstance(event, GameEnded)
+            ):
+                self.dropped += 1
+                return
+            self.queue.append(event)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        get_executor().submit(self._drain)
+
+    def _drain(self):
+        # 每次最多处理 DRAIN_BATCH 条后重新排队, 繁忙的订阅者不会长期占用工作线程
+        for _ in range(DRAIN_BATCH):
+            with self._idle:
+                if not self.queue:
+                    self._scheduled = False
+                    self._idle.notify_all()
+                    return
+                event = self.queue.popleft()
+                if len(self.queue) < self.maxsize:
+                    # 唤醒等待积压降低的发布方 (见 wait_below)
+                    self._idle.notify_all()
+            try:
+                self.max_lag = max(self.max_lag, time.monotonic() - event.created)
+                self.handler(event)
+                self.handled += 1
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(self.name, e)
+        get_executor().submit(self._drain)
+
+    def wait(self):
+        """等待队列中的事件全部处理完."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._scheduled)
+
+    def backlogged(self) -> bool:
+        """积压是否已达到容量 (只对 overflow="wait" 的订阅者有意义)."""
+        return self.overflow == "wait" and len(self.queue) >= self.maxsize
+
+    def wait_below(self, size: int):
+        """等待队列长度降到 size 以下 (会阻塞, 在事件循环中应通过 EventBus.throttle 调用)."""
+        with self._idle:
+            self._idle.wait_for(lambda: len(self.queue) < size)
+
+
+class EventBus:
+    """
+    进程内事件总线. publish 只把事件放入各订阅者的队列, 从不阻塞;
+    写文件, 推送网络消息, 打印控制台等 I/O 都在共享的工作线程池中完成,
+    多局游戏不会各自占用线程. 同一订阅者按发布顺序处理事件.
+    不能丢失事件的订阅者积压过多时, 发布方通过 await throttle() 等待 (反压).
+    """
+
+    def __init__(self, on_error: Optional[Callable[[str, Exception], None]] = None):
+        self.subscribers: List[Subscriber] = []
+        self.on_error = on_error
+        self.published = 0
+        self._closed = False
+
+    def subscribe(
+        self,
+        name: str,
+        handler: Callable[[GameEvent], None],
+        event_types: Tuple[Type[GameEvent], ...] = (GameEvent,),
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = "drop",
+    ) -> Subscriber:
+        subscriber = Subscriber(
+            name, handler, event_types, maxsize, overflow, self.on_error
+        )
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def publish(self, event: GameEvent):
+        if self._closed:
+            return
+        self.published += 1
+        for subscriber in self.subscribers:
+            subscriber.offer(event)
+
+    def flush(self):
+        """等待所有订阅者处理完已发布的事件 (会阻塞, 不要在事件循环中调用)."""
+        for subscriber in self.subscribers:
+            subscriber.wait()
+
+    async def throttle(self):
+        """
+        反压: 发布方 (游戏协程) 在步骤边界调用. 有 overflow="wait" 的订阅者积压达到容量时,
+        在线程中等待其处理到容量的一半以下, 不阻塞事件循环上的其他对局.
+        """
+        for subscriber in self.subscribers:
+            if subscriber.backlogged():
+                await asyncio.to_thread(
+                    subscriber.wait_below, max(1, subscriber.maxsize // 2)
+                )
+
+    def close(self):
+        """
+        等待所有订阅者处理完剩余事件. 关闭后发布的事件被忽略.
+        会阻塞到处理完为止, 在事件循环中应通过 asyncio.to_thread 调用.
+        """
+        self._closed = True
+        self.flush()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            s.name: {
+                "handled": s.handled,
+                "dropped": s.dropped,
+                "pending": len(s.queue),
+                "max_lag": s.max_lag,
+            }
+            for s in self.subscribers
+        }
+
+
+class EventMetrics:
+    """统计订阅者: 按事件类型和公告前缀计数."""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.prefixes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: GameEvent):
+        with self._lock:
+            kind = type(event).__name__
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            if isinstance(event, Announcement):
+                self.prefixes[event.prefix] = self.prefixes.get(event.prefix, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {"events": dict(self.counts), "prefixes": dict(self.prefixes)}
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """返回所有事件总线共享的工作线程池, 首次调用时创建."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_WORKERS, thread_name_prefix="EventBus"
+            )
+    return _executor
+
+
+def _reset_executor():
+    # fork 出的子进程 (例如 src/Simulation.py 的工作进程) 继承了线程池对象, 却没有其中的线程;
+    # 线程池认为线程数已满, 不会再创建线程, 订阅者永远得不到处理. 子进程改用新的线程池
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
@@ -0,0 +1,232 @@
+import argparse
+import bisect
+import gzip
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Archive import (
+    game_id_of,
+    has_member,
+    is_packed,
+    iter_events,
+    load_index,
+    load_result,
+    open_member,
+)
+from src.Logger import DECISIONS_FILE, GAMES_LOG_DIR, decision_messages, history_line
+
+# 每累积多少条记录写出一次; 内存中只保留当前这一批
+DEFAULT_CHUNK_SIZE = 1000
+# 没有结果文件 (未结束或被停止) 的对局中, 决策记录的 outcome
+UNFINISHED = "unfinished"
+
+
+def game_dirs(log_root: Path = GAMES_LOG_DIR) -> Iterator[Path]:
+    """按对局编号 (时间戳) 顺序列出有决策记录的对局目录和归档文件."""
+    if not log_root.exists():
+        return
+    # 目录和归档文件并存时 (压缩过程中) 以归档文件为准
+    found: Dict[str, Path] = {}
+    for path in log_root.iterdir():
+        if is_packed(path):
+            found[game_id_of(path)] = path
+        elif path.is_dir():
+            found.setdefault(path.name, path)
+    for game_id in sorted(found):
+        if has_member(found[game_id], DECISIONS_FILE):
+            yield found[game_id]
+
+
+def _load_meta(game_dir: Path) -> Dict[str, Any]:
+    """读取对局结果; 未结束的对局从存档中取游戏名."""
+    result = load_result(game_dir)
+    if result is not None:
+        return result
+    meta: Dict[str, Any] = {"game_name": None, "winner": None, "seats": []}
+    try:
+        with open_member(game_dir, "snapshot.json") as f:
+            meta["game_name"] = json.load(f).get("game_name")
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    return meta
+
+
+class _HistoryViews:
+    """
+    按事件文件重建各玩家在某一时刻可见的历史记录 (与 GameLogger.get_history 一致).
+    事件只顺序读取一遍; 决策记录按完成顺序写入, 其 seq 可能略小于已读取的位置,
+    因此每位玩家保留完整的可见记录及对应的事件序号.
+    """
+
+    def __init__(self, game_dir: Path):
+        self._events = iter_events(game_dir)
+        self._read = 0
+        self._views: Dict[str, Tuple[List[int], List[str]]] = {
+            name: ([], []) for name in load_index(game_dir)["seats"]
+        }
+
+    def history(self, name: str, seq: int, limit: Optional[int]) -> List[str]:
+        """玩家在前 seq 条事件中可见的记录, limit 不为 None 时只保留最近 limit 条."""
+        while self._read < seq:
+            event = next(self._events, None)
+            if event is None:
+                break
+            self._read = event["seq"] + 1
+            line = history_line(event["time"], event["message"])
+            for player in event["visible_to"] or self._views:
+                seqs, lines = self._views[player]
+                seqs.append(event["seq"])
+                lines.append(line)
+        seqs, lines = self._views.get(name, ([], []))
+        visible = lines[: bisect.bisect_left(seqs, seq)]
+        return visible[-limit:] if limit else visible
+
+
+def _rebuild_messages(
+    record: Dict[str, Any], views: _HistoryViews, systems: Dict[str, str]
+):
+    """把只保存提示词增量的决策记录还原为完整的 messages (旧格式的记录原样保留)."""
+    if "messages" in record:
+        return
+    player = record["player"]
+    if "system" in record:
+        systems[player] = record.pop("system")
+    context = record.pop("context", None)
+    history = ""
+    if context is not None:
+        lines = views.history(player, record["seq"], context.get("limit"))
+        history = "\n".join(lines + context.get("pending", []))
+    record["messages"] = decision_messages(
+        context, history, systems.get(player, ""), record.pop("prompt")
+    )
+
+
+def iter_decisions(game_dir: Path) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取一局的决策记录, 附上对局编号, 阵营和结果 (won / lost / unfinished).
+    决策记录只保存提示词增量, 这里按 seq 从事件文件重建玩家当时可见的历史,
+    还原完整的 messages.
+    对局进行中也可以读取, 末尾尚未写完的行会被跳过.
+    """
+    meta = _load_meta(game_dir)
+    seats = {seat["name"]: seat for seat in meta["seats"]}
+    views = _HistoryViews(game_dir)
+    systems: Dict[str, str] = {}
+    with open_member(game_dir, DECISIONS_FILE) as raw:
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            _rebuild_messages(record, views, systems)
+            seat = seats.get(record["player"])
+            record["game_id"] = game_id_of(game_dir)
+            record["game_name"] = meta["game_name"]
+            record["winner"] = meta["winner"]
+            record["team"] = seat["team"] if seat else None
+            if seat is None:
+                record["outcome"] = UNFINISHED
+            else:
+                record["outcome"] = "won" if seat["won"] else "lost"
+            yield record
+
+
+def _digest(record: Dict[str, Any]) -> int:
+    # 去重只看模型, 提示词和回复; 8 字节摘要使已见集合每条只占几十字节
+    key = json.dumps(
+        [record["model"], record["messages"], record["response"]],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def export_decisions(
+    output: Path,
+    dirs: Optional[Iterable[Path]] = None,
+    game_name: Optional[str] = None,
+    models: Optional[Collection[str]] = None,
+    roles: Optional[Collection[str]] = None,
+    outcomes: Optional[Collection[str]] = None,
+    dedupe: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    将决策记录流式导出为 JSONL, 输出文件名以 .gz 结尾时使用 gzip 压缩.
+    按游戏名, 模型, 角色和结果过滤; 逐局逐行读取并分批写出, 内存占用与对局数量无关
+    (去重时仅保留每条记录的摘要). 返回读取, 过滤, 去重和写出的条数.
+    """
+    dirs = game_dirs() if dirs is None else dirs
+    stats = {"games": 0, "read": 0, "filtered": 0, "duplicates": 0, "written": 0}
+    seen = set()
+    chunk = []
+
+    opener = gzip.open if str(output).endswith(".gz") else open
+    with opener(output, "wt", encoding="utf-8") as out:
+        for game_dir in dirs:
+            stats["games"] += 1
+            for record in iter_decisions(game_dir):
+                stats["read"] += 1
+                if (
+                    (game_name is not None and record["game_name"] != game_name)
+                    or (models is not None and record["model"] not in models)
+                    or (roles is not None and record["role"] not in roles)
+                    or (outcomes is not None and record["outcome"] not in outcomes)
+                ):
+                    stats["filtered"] += 1
+                    continue
+                if dedupe:
+                    digest = _digest(record)
+                    if digest in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(digest)
+
+                chunk.append(json.dumps(record, ensure_ascii=False) + "\n")
+                if len(chunk) >= chunk_size:
+                    out.write("".join(chunk))
+                    stats["written"] += len(chunk)
+                    chunk.clear()
+        if chunk:
+            out.write("".join(chunk))
+            stats["written"] += len(chunk)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出对局中的模型决策记录")
+    parser.add_argument("output", type=Path, help="输出文件, 以 .gz 结尾时压缩")
+    parser.add_argument("--logs", type=Path, default=GAMES_LOG_DIR, help="对局日志目录")
+    parser.add_argument("--game", help="只导出该游戏")
+    parser.add_argument("--model", action="append", help="只导出这些模型, 可重复")
+    parser.add_argument("--role", action="append", help="只导出这些角色, 可重复")
+    parser.add_argument(
+        "--outcome",
+        action="append",
+        choices=("won", "lost", UNFINISHED),
+        help="只导出这些结果, 可重复",
+    )
+    parser.add_argument("--no-dedupe", action="store_true", help="不去重")
+    args = parser.parse_args()
+
+    stats = export_decisions(
+        args.output,
+        game_dirs(args.logs),
+        game_name=args.game,
+        models=args.model,
+        roles=args.role,
+        outcomes=args.outcome,
+        dedupe=not args.no_dedupe,
+    )
+    print(
+        f"{stats['games']} 局, 读取 {stats['read']} 条, 过滤 {stats['filtered']} 条,"
+        f" 重复 {stats['duplicates']} 条, 写出 {stats['written']} 条 -> {args.output}"
+    )
@@ -1,36 +1,89 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Callable, Tuple, Union
+from types import MappingProxyType
+from typing import (
+    List,
+    Dict,
+    FrozenSet,
+    Optional,
+    Any,
+    Awaitable,
+    Callable,
+    Tuple,
+    Union,
+)
+from datetime import datetime
 from pathlib import Path
+import asyncio
+import hashlib
+import os
+import random
 import sys
 import json
+import threading
+import time
 
 # 确保项目根目录在路径中
 BASE = Path(__file__).resolve().parent.parent
 if str(BASE) not in sys.path:
     sys.path.append(str(BASE))
 
-from src.Logger import GameLogger
-from src.Player import Player
+from src.Analytics import get_store
+from src.Archive import build_index
+from src.EventBus import (
+    Announcement,
+    EventBus,
+    EventMetrics,
+    GameEnded,
+    GameEvent,
+    Notice,
+    SnapshotSaved,
+)
+from src.Logger import GAMES_LOG_DIR, SNAPSHOT_FILE, GameLogger, pending_events
+from src.Player import Player, step_rng
+from src.Search import get_search_index
+
+SNAPSHOT_VERSION = 1
+DEFINITION_FILE = "definition.json"
+
+# 发言耗时的指数滑动平均系数, 越大越偏向最近一次的耗时
+LATENCY_EMA_ALPHA = 0.3
+# 为赶时间而缩短发言时, 发言长度上限的默认值与下限 (字符数)
+DEFAULT_SPEECH_CHARS = 300
+MIN_SPEECH_CHARS = 40
+
+# 大厅模式的默认设置, 可由 config.json 中的 large_lobby 覆盖
+DEFAULT_LARGE_LOBBY = {
+    # 玩家人数达到该值时启用大厅模式
+    "threshold": 20,
+    # 每位玩家的上下文只保留最近若干条可见事件
+    "history_limit": 120,
+    # 单次发言的长度上限 (字符数)
+    "max_speech_chars": 150,
+}
 
 # -----------------------------------------------------------------------------
 # 核心引擎结构 (DSL 支持)
 # -----------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionContext:
     game: Any  # "Game" 子类
     player: Optional[Player] = None
     target: Optional[str] = None
-    extra_data: Dict[str, Any] = field(default_factory=dict)
+    # 步骤参数, 与编译后的步骤共享, 只读
+    extra_data: Mapping[str, Any] = field(default_factory=dict)
+    # 步骤声明的提示词 (prompt.json 中 prompt_key 指向的子树, 只读)
+    prompts: Mapping[str, Any] = field(default_factory=dict)
 
 
 class GameAction(ABC):
-    """在 DSL 中定义的游戏动作抽象基类."""
+    """在 DSL 中定义的游戏动作抽象基类. execute 是协程, 由引擎在事件循环中等待."""
 
     @abstractmethod
-    def execute(self, context: ActionContext) -> Any:
+    async def execute(self, context: ActionContext) -> Any:
         pass
 
     @abstractmethod
@@ -38,7 +91,7 @@ class GameAction(ABC):
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class GameStep:
     """游戏阶段中的单个步骤 (例如 '狼人醒来') ."""
 
@@ -46,6 +99,12 @@ class GameStep:
     roles_involved: List[Any]
     action: GameAction
     condition: Optional[Callable[[Any], bool]] = None
+    # 本步骤依赖的同阶段步骤名称, 被依赖的步骤必须先于本步骤加入阶段
+    depends_on: List[str] = field(default_factory=list)
+    # prompt.json 中的点分路径, 例如 "roles.guard", 解析结果传给 ActionContext.prompts
+    prompt_key: Optional[str] = None
+    # 传给 ActionContext.extra_data 的静态参数
+    params: Mapping[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -54,9 +113,44 @@ class GamePhase:
 
     name: str
     steps: List[GameStep] = field(default_factory=list)
+    # 阶段的墙钟时间预算 (秒), None 表示不限时
+    time_budget: Optional[float] = None
+    _waves: Optional[List[List[int]]] = field(default=None, init=False, repr=False)
 
     def add_step(self, step: GameStep):
         self.steps.append(step)
+        self._waves = None
+
+    def waves(self) -> List[List[int]]:
+        """
+        按依赖关系把步骤分成若干批次 (步骤索引列表), 同一批次内的步骤互不依赖.
+        阶段内没有任何步骤声明 depends_on 时, 保持逐个顺序执行.
+        """
+        if self._waves is not None:
+            return self._waves
+
+        if not any(step.depends_on for step in self.steps):
+            self._waves = [[i] for i in range(len(self.steps))]
+            return self._waves
+
+        indices = {}
+        levels: List[int] = []
+        for i, step in enumerate(self.steps):
+            for dep in step.depends_on:
+                if dep not in indices:
+                    raise ValueError(
+                        f"阶段 {self.name} 中步骤 {step.name} 依赖未知或在其之后的步骤 {dep}"
+                    )
+            levels.append(
+                1 + max((levels[indices[dep]] for dep in step.depends_on), default=-1)
+            )
+            indices[step.name] = i
+
+        waves: List[List[int]] = [[] for _ in range(max(levels) + 1)]
+        for i, level in enumerate(levels):
+            waves[level].append(i)
+        self._waves = waves
+        return self._waves
 
 
 class Game(ABC):
@@ -65,8 +159,22 @@ class Game(ABC):
         game_name: str,
         players_data: List[Dict[str, str]],
         event_emitter: Optional[Callable[[str, Optional[List[str]]], None]] = None,
-        input_handler: Optional[Callable[[str, str, str, List[str], bool], str]] = None,
+        # input_handler(玩家名, 输入类型, 提示, 选项, 可否跳过[, timeout=秒数])
+        input_handler: Optional[Callable[..., Union[str, Awaitable[str]]]] = None,
+        resume_from: Optional[Path] = None,
+        seed: Optional[int] = None,
+        console: bool = True,
+        persist: bool = True,
     ):
+        # 从存档恢复时, 沿用存档中的玩家数据和日志目录
+        self._resume_state: Optional[Dict[str, Any]] = None
+        log_dir = None
+        if resume_from is not None:
+            self._resume_state = load_snapshot(resume_from)
+            ensure_unfinished(self._resume_state)
+            players_data = players_data or self._resume_state["players_data"]
+            log_dir = Path(resume_from).parent
+
         self.game_name = game_name
         self.players: Dict[str, Player] = {}
         self.all_player_names: List[str] = [
@@ -75,80 +183,637 @@ class Game(ABC):
         self._players_data = players_data
         self.event_emitter = event_emitter
         self.input_handler = input_handler
+        self.prompts: Mapping[str, Any] = {}
+        self.config: Dict[str, Any] = {}
+        self.definition: Optional[GameDefinition] = None
+
+        # 大厅模式: 玩家较多时启用有界的历史视图, 并发收集投票并限制发言长度
+        self.large_lobby = False
+        self.history_limit: Optional[int] = None
+        self.max_speech_chars: Optional[int] = None
 
         # 初始化日志记录器
-        self.logger = GameLogger(game_name, self._players_data)
+        # persist=False 时不写日志文件和存档, 用于模拟对局
+        self.logger = GameLogger(game_name, self._players_data, log_dir, persist)
+
+        # 公告通过事件总线分发, 写文件/推送/控制台输出都在共享的工作线程池中进行
+        # console=False 时 (无界面运行) 不订阅控制台输出
+        self.bus = EventBus(on_error=self._on_subscriber_error)
+        self.metrics = EventMetrics()
+        self._init_subscribers(console)
 
         self.phases: List[GamePhase] = []
         self.day_number = 0
+        # 死亡记录 (玩家, 天数, 原因), 以及开局时刻 (time.time), 用于结果统计
+        self.deaths: List[Dict[str, Any]] = []
+        self.started_at: Optional[float] = None
         self._running = True
+        # 天数上限, 达到后在阶段边界停止 (None 表示不限), 用于模拟时防止对局无限进行
+        self.max_days: Optional[int] = None
+
+        # 存活玩家索引, 由 register_player / set_alive 增量维护
+        # 使用 dict 作为有序集合, 保持玩家的入座顺序
+        self._seats: Dict[str, int] = {}
+        self._alive: Dict[str, None] = {}
+        self._alive_by_role: Dict[str, Dict[str, None]] = {}
+        self._alive_by_team: Dict[str, int] = {}
+        self._alive_version = 0
+
+        # 阶段执行计划缓存: 阶段名 -> (编译时的存活版本号, 需执行的步骤索引)
+        self._schedules: Dict[str, Tuple[int, FrozenSet[int]]] = {}
+
+        # 状态版本号: 任何可能影响胜负的状态变化都会使其递增,
+        # check_game_over 只在版本号变化后重新判定
+        self._state_version = 0
+        self._winner_cache: Tuple[int, Optional[str]] = (-1, None)
+
+        # 每局游戏独立的随机数生成器, 引擎与玩家的所有随机行为都从这里取值
+        # 种子优先级: 构造参数 > config.json 中的 seed > 随机生成
+        self._seed_fixed = seed is not None
+        self.seed = seed
+        self._rng = random.Random()
+        self.reseed(seed)
+
+        # 存档游标: (阶段索引, 批次索引), 指向下一个待执行的步骤批次
+        self._cursor: Tuple[int, int] = (0, 0)
+
+        # 阶段时间预算: 当前阶段的截止时间 (time.monotonic), 以及每位玩家发言耗时的滑动平均
+        self._phase_deadline: Optional[float] = None
+        self._speaker_latency: Dict[str, float] = {}
+        self.snapshot_path: Optional[Path] = (
+            self.logger.log_dir / SNAPSHOT_FILE if self.logger.persist else None
+        )
+        self._last_snapshot: Optional[str] = None
+        # 尚未写入文件的最新存档, 由日志订阅者在写入此前的事件后落盘
+        self._unwritten_snapshot: Optional[str] = None
+        self._snapshot_lock = threading.Lock()
+
+    def _init_subscribers(self, console: bool):
+        # 订阅者在共享的工作线程池中运行, publish 从不阻塞事件循环;
+        # 落盘, 推送和控制台不能丢失事件, 积压过多时由 run_phase 在批次边界等待 (反压),
+        # 统计类订阅者在队列满时丢弃事件
+        if self.logger.persist:
+            self.bus.subscribe("log", self._log_subscriber, overflow="wait")
+        if self.event_emitter:
+            self.bus.subscribe(
+                "socket", self._emit_subscriber, (Announcement, Notice), overflow="wait"
+            )
+        self.bus.subscribe("metrics", self.metrics)
+        if self.logger.persist:
+            self.bus.subscribe("analytics", self._analytics_subscriber, (GameEnded,))
+        if console:
+            self.bus.subscribe(
+                "console",
+                self._console_subscriber,
+                (Announcement, Notice),
+                overflow="wait",
+            )
+
+    def _on_subscriber_error(self, name: str, e: Exception):
+        self.logger.system_logger.error(f"事件订阅者 {name} 处理事件时出错: {e}")
+
+    def _log_subscriber(self, event: GameEvent):
+        # 内存中的事件已在 announce 时同步记录, 这里只负责落盘;
+        # 存档在其之前的事件写入后才写入, 存档中的文件位置总是指向已落盘的内容
+        self.logger.write_pending()
+        self._write_snapshot()
+        if isinstance(event, Announcement):
+            # 公告已完整记录在事件文件中, System.log 只在调试级别重复记录
+            scope = f"仅对 {event.visible_to} 可见" if event.visible_to else "公开"
+            self.logger.system_logger.debug(f"公告: {event.message} ({scope})")
+        elif isinstance(event, GameEnded):
+            # 决出胜负时 on_game_over 已经记录, 这里只记录被停止或未分胜负的情况
+            if event.winner is None:
+                self.logger.system_logger.info("游戏结束, 未分出胜负")
+            # 结果与事件, 决策文件放在同一目录, 归档后的对局可以独立导出
+            if event.winner is not None:
+                self.logger.write_result(self.result_record())
+            # 事件文件不再增长, 建立按天和阶段的偏移索引, 已结束的对局再加入全文索引
+            build_index(self.logger.log_dir, save=True)
+            if event.winner is not None:
+                get_search_index().index_game(self.logger.log_dir)
+            # 最后写入结束标记: 此后日志目录不再变化, 归档任务可以压缩和清理
+            self.logger.write_ended(event.winner)
+
+    def _analytics_subscriber(self, event: GameEnded):
+        # 只记录分出胜负的对局; 此时游戏协程已结束, 可以安全读取玩家状态
+        if event.winner is not None:
+            get_store().record(self.result_record())
+
+    def _emit_subscriber(self, event: Union[Announcement, Notice]):
+        self.event_emitter(event.message, event.visible_to)
+
+    def _console_subscriber(self, event: Union[Announcement, Notice]):
+        # 控制台是"上帝视角", 显示所有内容; 可见性受限的公告会注明范围
+        if isinstance(event, Notice):
+            print(event.message)
+        elif event.visible_to:
+            print(f"{event.prefix} [Visible to {event.visible_to}] {event.message}")
+        else:
+            print(f"{event.prefix} {event.message}")
+
+    def reseed(self, seed: Optional[int] = None):
+        """重新设置随机种子并记录到游戏日志, 以便复现整局游戏."""
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.seed = seed
+        self._rng.seed(seed)
+        self.logger.system_logger.info(f"随机种子: {seed}")
+
+    @property
+    def rng(self) -> random.Random:
+        """
+        随机数生成器. 并发执行的步骤中返回该步骤独立的生成器 (见 _run_concurrent_steps),
+        否则返回游戏自身的生成器.
+        """
+        return step_rng.get() or self._rng
 
     def stop_game(self):
         """停止游戏运行"""
         self._running = False
         self.logger.system_logger.info("接收到游戏停止请求")
 
-    @abstractmethod
-    def _init_phases(self):
-        """初始化游戏阶段和步骤."""
-        pass
+    # 声明式定义所在目录及其引用的动作/条件, 由子类提供
+    game_dir: Optional[Path] = None
+    actions: Dict[str, Callable[[], "GameAction"]] = {}
+    conditions: Dict[str, Callable[[Any], bool]] = {}
+
+    @classmethod
+    def load_definition(cls) -> "GameDefinition":
+        """加载并校验游戏目录中的 definition.json (同一进程内按内容哈希缓存)."""
+        return load_game_definition(cls.game_dir, cls.actions, cls.conditions)
 
-    def run_phase(self, phase: GamePhase):
-        """运行单个游戏阶段."""
-        for step in phase.steps:
+    def _init_phases(self):
+        """初始化游戏阶段和步骤. 默认使用声明式定义中编译好的阶段."""
+        if self.definition is None:
+            self.definition = self.load_definition()
+        self.phases = list(self.definition.phases)
+
+    def _step_context(self, step: "GameStep") -> ActionContext:
+        prompts: Any = self.prompts
+        if step.prompt_key:
+            for key in step.prompt_key.split("."):
+                prompts = prompts[key]
+        return ActionContext(game=self, extra_data=step.params, prompts=prompts)
+
+    async def run_phase(self, phase: GamePhase, start_wave: int = 0):
+        """
+        运行单个游戏阶段. 同一批次内互不依赖的步骤并发执行.
+        start_wave 用于从存档恢复时跳过已执行的批次.
+        """
+        phase_index = self.phases.index(phase)
+        waves = phase.waves()
+        if start_wave == 0:
+            # 从存档恢复到阶段中途时, 阶段起点已随存档恢复
+            self.logger.begin_phase()
+        started = time.monotonic()
+        self._phase_deadline = (
+            started + phase.time_budget if phase.time_budget is not None else None
+        )
+        try:
+            await self._run_waves(phase, phase_index, waves, start_wave)
+        finally:
+            self._phase_deadline = None
+            self.logger.end_phase(self.day_number, phase.name)
+            if phase.time_budget is not None:
+                self.logger.system_logger.info(
+                    f"阶段 {phase.name} 用时 {time.monotonic() - started:.1f}s"
+                    f" / 预算 {phase.time_budget}s"
+                )
+
+    async def _run_waves(
+        self,
+        phase: GamePhase,
+        phase_index: int,
+        waves: List[List[int]],
+        start_wave: int,
+    ):
+        for wave_index in range(start_wave, len(waves)):
             if not self._running:
                 return
             if self.check_game_over():
                 return
 
-            # 如果存在条件则检查
-            if step.condition and not step.condition(self):
-                continue
+            # 跳过没有存活执行者的步骤, 如果存在条件则检查
+            schedule = self.compile_schedule(phase)
+            steps = []
+            for step_index in waves[wave_index]:
+                step = phase.steps[step_index]
+                if step_index not in schedule:
+                    continue
+                if step.condition and not step.condition(self):
+                    continue
+                steps.append(step)
+
+            if len(steps) == 1:
+                await steps[0].action.execute(self._step_context(steps[0]))
+            elif steps:
+                await self._run_concurrent_steps(steps)
+
+            # 批次边界: 记录下一个待执行的批次; 订阅者积压过多时在这里等待
+            self._cursor = (phase_index, wave_index + 1)
+            self.save_snapshot()
+            await self.bus.throttle()
+
+    async def _run_concurrent_steps(self, steps: List[GameStep]):
+        """
+        并发执行一批步骤.
+        仅对部分玩家可见的公告立即发出, 相关玩家无需等待整批完成;
+        公开公告先缓存在各自的任务上下文中 (步骤内的玩家仍能看到本步骤的公告),
+        全部完成后按声明顺序统一发出, 公开记录的顺序与任务交错无关.
+        每个步骤使用由游戏 rng 按声明顺序派生的独立随机数生成器, 同一种子下结果可复现.
+        """
+        buffers: List[List[Tuple[str, Optional[List[str]], str, Optional[str]]]] = [
+            [] for _ in steps
+        ]
+        seeds = [self._rng.getrandbits(64) for _ in steps]
+
+        async def run_step(step: GameStep, buffer, seed: int):
+            pending_events.set(buffer)
+            step_rng.set(random.Random(seed))
+            await step.action.execute(self._step_context(step))
 
-            context = ActionContext(game=self)
-            step.action.execute(context)
+        async with asyncio.TaskGroup() as group:
+            for step, buffer, seed in zip(steps, buffers, seeds):
+                group.create_task(run_step(step, buffer, seed))
+
+        for buffer in buffers:
+            for message, visible_to, prefix, actor in buffer:
+                self.announce(message, visible_to, prefix, actor)
+
+    def compile_schedule(self, phase: GamePhase) -> FrozenSet[int]:
+        """
+        按当前存活集合编译阶段的执行计划, 返回需要执行的步骤索引.
+        roles_involved 中的角色全部阵亡的步骤会被剔除 (roles_involved 为空表示总是执行).
+        只在存活集合变化后重新编译; condition 依赖任意状态, 仍在运行时逐步判定.
+        """
+        cached = self._schedules.get(phase.name)
+        if cached is not None and cached[0] == self._alive_version:
+            return cached[1]
+
+        active = frozenset(
+            i
+            for i, step in enumerate(phase.steps)
+            if not step.roles_involved
+            or any(self.count_alive(role=r) for r in step.roles_involved)
+        )
+        self._schedules[phase.name] = (self._alive_version, active)
+        skipped = [s.name for i, s in enumerate(phase.steps) if i not in active]
+        if skipped:
+            self.logger.system_logger.debug(
+                f"阶段 {phase.name} 的执行计划已重新编译, 跳过: {skipped}"
+            )
+        return active
 
     @abstractmethod
-    def check_game_over(self) -> bool:
+    def evaluate_winner(self) -> Optional[str]:
+        """
+        判定胜负, 返回获胜方标识, 游戏未结束时返回 None.
+        必须是无副作用的纯判定, 不要在这里发送公告.
+        """
         pass
 
+    def on_game_over(self, winner: str):
+        """游戏结束时调用一次, 子类在此发送结束公告."""
+        self.logger.system_logger.info(f"游戏结束, 获胜方: {winner}")
+
+    def record_death(self, player_name: str, reason: str):
+        """记录一次死亡, reason 为稳定的原因标识 (不随提示词变化), 供结果统计使用."""
+        self.deaths.append(
+            {"name": player_name, "day": self.day_number, "reason": reason}
+        )
+
+    def result_record(self) -> Dict[str, Any]:
+        """
+        整局结果的结构化记录 (见 src/Analytics.py): 阵容, 模型, 角色,
+        各玩家的死亡天数与原因, 胜利方, 用时与 token 用量.
+        """
+        winner = self.winner
+        deaths = {d["name"]: d for d in self.deaths}
+        seats = []
+        for seat, player in enumerate(self.players.values()):
+            death = deaths.get(player.name, {})
+            team = self.role_team(player.role)
+            seats.append(
+                {
+                    "seat": seat,
+                    "name": player.name,
+                    "model": None if player.is_human else player.model_id,
+                    "human": player.is_human,
+                    "role": player.role,
+                    "team": team,
+                    "won": team == winner,
+                    "alive": player.is_alive,
+                    "death_day": death.get("day"),
+                    "death_reason": death.get("reason"),
+                    "tokens": player.tokens,
+                    "decisions": player.decisions,
+                    "decision_time": player.decision_time,
+                }
+            )
+        finished = time.time()
+        return {
+            "id": self.logger.game_id,
+            "game_name": self.game_name,
+            "finished_at": datetime.fromtimestamp(finished).isoformat(timespec="seconds"),
+            "player_count": len(seats),
+            "winner": winner,
+            "days": self.day_number,
+            "duration": finished - (self.started_at or finished),
+            "tokens": sum(seat["tokens"] for seat in seats),
+            "seed": self.seed,
+            "seats": seats,
+        }
+
+    def mark_state_changed(self):
+        """递增状态版本号, 使缓存的胜负判定失效."""
+        self._state_version += 1
+
+    @property
+    def winner(self) -> Optional[str]:
+        """当前获胜方 (按状态版本号缓存) ."""
+        version, winner = self._winner_cache
+        if version != self._state_version:
+            winner = self.evaluate_winner()
+            self._winner_cache = (self._state_version, winner)
+        return winner
+
+    def check_game_over(self) -> bool:
+        return self.winner is not None
+
     @abstractmethod
-    def setup_game(self):
+    async def setup_game(self):
         """加载配置并初始化玩家/角色."""
         pass
 
-    def run_game(self):
-        """主游戏循环."""
-        self.setup_game()
-        self._init_phases()  # 确保阶段已初始化
+    async def run_game(self):
+        """
+        主游戏循环 (协程). 若构造时指定了 resume_from, 则从存档处继续.
+        多局游戏可以共享同一个事件循环; 单独运行时使用 run_blocking.
+        """
+        try:
+            if self._resume_state is not None:
+                self.restore_game(self._resume_state)
+            elif not self.players:
+                # 已有玩家说明游戏是由 fork 从状态构造的, 无需重新开局
+                await self.setup_game()
+            if self.started_at is None:
+                self.started_at = time.time()
+            self._init_phases()  # 确保阶段已初始化
+            self.save_snapshot()
+
+            while self._running and not self.check_game_over():
+                start_phase, start_wave = self._cursor
+                for phase_index in range(start_phase, len(self.phases)):
+                    if not self._running:
+                        break
+                    await self.run_phase(self.phases[phase_index], start_wave)
+                    start_wave = 0
+                    if not self._running or self.check_game_over():
+                        break
+
+                    # 阶段边界
+                    self._cursor = ((phase_index + 1) % len(self.phases), 0)
+                    self.save_snapshot()
+                    if self.max_days is not None and self.day_number >= self.max_days:
+                        self._running = False
+                        break
+
+            if self.check_game_over():
+                self.on_game_over(self.winner)
+                self.save_snapshot(finished=True)
+        finally:
+            # 等待订阅者处理完剩余事件 (包括 GameEnded 的结果落盘和索引) 后才关闭日志,
+            # 等待在线程中进行, 不阻塞事件循环
+            self.bus.publish(GameEnded(self.game_name, self._winner_cache[1]))
+            await asyncio.to_thread(self.bus.close)
+            self.logger.system_logger.info(f"事件总线统计: {self.bus.stats()}")
+            self.logger.close()
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], **options) -> "Game":
+        """
+        按状态中的游戏名和玩家数据构造游戏对象 (尚未恢复状态, 见 fork).
+        构造参数与基类不同的子类需覆盖此方法.
+        """
+        return cls(state["game_name"], state["players_data"], **options)
 
-        while self._running and not self.check_game_over():
-            for phase in self.phases:
-                if not self._running:
-                    break
-                self.run_phase(phase)
-                if self.check_game_over():
-                    break
+    @classmethod
+    def fork(
+        cls, state: Dict[str, Any], seed: Optional[int] = None, **options
+    ) -> "Game":
+        """
+        从 get_state 导出的状态构造一个游戏分支, 用于模拟后续走向.
+        分支不写文件, 不输出到控制台, 所有玩家都由随机代理接管;
+        指定 seed 时重新播种, 使同一局面的各个分支各不相同.
+        """
+        options.setdefault("console", False)
+        options.setdefault("persist", False)
+        game = cls.from_state(state, **options)
+        game.restore_game(state)
+        for player in game.players.values():
+            player.is_human = False
+            player.random_agent = True
+        if seed is not None:
+            game.reseed(seed)
+        return game
+
+    def run_blocking(self):
+        """在当前线程中新建事件循环并运行整局游戏."""
+        asyncio.run(self.run_game())
+
+    # -------------------------------------------------------------------------
+    # 存档与恢复
+    # -------------------------------------------------------------------------
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        导出可序列化的完整游戏状态.
+        子类应在此基础上追加自身字段.
+        """
+        version, internal, gauss = self._rng.getstate()
+        return {
+            "version": SNAPSHOT_VERSION,
+            "game_name": self.game_name,
+            "seed": self.seed,
+            "day_number": self.day_number,
+            "cursor": list(self._cursor),
+            "players_data": self._players_data,
+            "players": [
+                {
+                    "name": p.name,
+                    "role": p.role,
+                    "is_alive": p.is_alive,
+                    "is_guarded": p.is_guarded,
+                    "is_first_night": p.is_first_night,
+                    "tokens": p.tokens,
+                }
+                for p in self.players.values()
+            ],
+            "deaths": list(self.deaths),
+            "started_at": self.started_at,
+            "rng": [version, list(internal), gauss],
+            "history": self.logger.get_cursors(),
+        }
+
+    def set_state(self, state: Dict[str, Any]):
+        """
+        将 get_state 导出的状态写回当前对象.
+        调用前玩家对象必须已经创建 (见 restore_game).
+        """
+        self.day_number = state["day_number"]
+        self._cursor = tuple(state["cursor"])
+        for p_state in state["players"]:
+            player = self.players.get(p_state["name"])
+            if player is None:
+                continue
+            self.set_alive(player.name, p_state["is_alive"])
+            player.is_guarded = p_state["is_guarded"]
+            player.is_first_night = p_state["is_first_night"]
+            player.tokens = p_state.get("tokens", 0)
+
+        self.deaths = list(state.get("deaths", []))
+        self.started_at = state.get("started_at")
+        self.seed = state.get("seed")
+        version, internal, gauss = state["rng"]
+        self._rng.setstate((version, tuple(internal), gauss))
+        self.logger.restore_cursors(state.get("history", {}))
+
+    def restore_game(self, state: Dict[str, Any]):
+        """
+        从存档状态重建游戏 (代替 setup_game).
+        子类需先按存档中的角色创建玩家, 再调用本方法.
+        已结束对局的存档不能恢复, 抛出 ValueError.
+        """
+        ensure_unfinished(state)
+        self.set_state(state)
+        self.logger.system_logger.info(
+            f"从存档恢复游戏: 第 {self.day_number} 天, 游标 {self._cursor}"
+        )
+
+    def save_snapshot(self, finished: bool = False):
+        """
+        在阶段/步骤边界保存存档.
+        状态未变化时跳过; 文件由日志订阅者在工作线程中写入 (见 _write_snapshot),
+        不阻塞事件循环.
+        """
+        if self.snapshot_path is None:
+            return
+        try:
+            state = self.get_state()
+            state["finished"] = finished
+            data = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        except Exception as e:
+            self.logger.system_logger.error(f"保存存档失败: {e}")
+            return
+        if data == self._last_snapshot:
+            return
+        self._last_snapshot = data
+        with self._snapshot_lock:
+            self._unwritten_snapshot = data
+        # 通知被丢弃时, 存档随日志订阅者处理的下一个事件写入 (GameEnded 总会被处理)
+        self.bus.publish(SnapshotSaved(self.game_name))
+
+    def _write_snapshot(self):
+        """写入最新的存档. 先写临时文件再原子替换, 进程中途退出不会留下损坏的存档."""
+        with self._snapshot_lock:
+            data, self._unwritten_snapshot = self._unwritten_snapshot, None
+        if data is None:
+            return
+        try:
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            self.logger.system_logger.error(f"写入存档失败: {e}")
+
+    # -------------------------------------------------------------------------
+    # 玩家索引
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _role_value(role: Any) -> Any:
+        """角色可以是 Enum 成员或字符串, 统一取其值."""
+        return role.value if hasattr(role, "value") else role
+
+    def role_team(self, role: str) -> str:
+        """返回角色所属阵营. 默认每个角色自成一队, 子类按规则覆盖."""
+        return role
+
+    def register_player(self, player: Player):
+        """加入玩家并更新存活索引. 所有玩家都应通过此方法加入游戏."""
+        self.players[player.name] = player
+        self._seats[player.name] = len(self._seats)
+        self.logger.seat_of(player.name)
+        if player.is_alive:
+            self._index_add(player)
+        self.mark_state_changed()
+
+    def set_alive(self, player_name: str, alive: bool):
+        """
+        修改玩家存活状态并同步更新索引.
+        不要直接修改 Player.is_alive, 否则索引会失效.
+        """
+        player = self.players[player_name]
+        if player.is_alive == alive and (player_name in self._alive) == alive:
+            return
+        player.is_alive = alive
+        if alive:
+            self._index_add(player)
+            # 复活的玩家被追加到末尾, 重新按入座顺序排列 (很少发生, 不必优化)
+            seat = self._seats.__getitem__
+            self._alive = dict.fromkeys(sorted(self._alive, key=seat))
+            self._alive_by_role[player.role] = dict.fromkeys(
+                sorted(self._alive_by_role[player.role], key=seat)
+            )
+        else:
+            self._index_remove(player)
+        self.mark_state_changed()
+
+    def _index_add(self, player: Player):
+        if player.name in self._alive:
+            return
+        self._alive[player.name] = None
+        self._alive_by_role.setdefault(player.role, {})[player.name] = None
+        team = self.role_team(player.role)
+        self._alive_by_team[team] = self._alive_by_team.get(team, 0) + 1
+        self._alive_version += 1
+
+    def _index_remove(self, player: Player):
+        if player.name not in self._alive:
+            return
+        del self._alive[player.name]
+        del self._alive_by_role[player.role][player.name]
+        self._alive_by_team[self.role_team(player.role)] -= 1
+        self._alive_version += 1
+
+    def _rebuild_index(self):
+        """按 self.players 的当前状态重建索引."""
+        self._seats.clear()
+        self._alive.clear()
+        self._alive_by_role.clear()
+        self._alive_by_team.clear()
+        self._alive_version += 1
+        for player in list(self.players.values()):
+            self.register_player(player)
+        self.mark_state_changed()
 
     def get_alive_players(self, allowed_roles: Optional[List[Any]] = None) -> List[str]:
         """
-        获取存活玩家的姓名.
+        获取存活玩家的姓名, 按入座顺序排列.
         allowed_roles: 角色值列表 (可以是 Enum 成员或字符串) .
         """
-        alive_players = []
+        if not allowed_roles:
+            return list(self._alive)
 
-        target_roles = set()
-        if allowed_roles:
-            for r in allowed_roles:
-                if hasattr(r, "value"):
-                    target_roles.add(r.value)
-                else:
-                    target_roles.add(r)
+        if len(allowed_roles) == 1:
+            return list(self._alive_by_role.get(self._role_value(allowed_roles[0]), ()))
 
-        for name, p in self.players.items():
-            if p.is_alive:
-                if not allowed_roles or p.role in target_roles:
-                    alive_players.append(name)
+        alive_players = []
+        for r in {self._role_value(r) for r in allowed_roles}:
+            alive_players.extend(self._alive_by_role.get(r, ()))
+        alive_players.sort(key=self._seats.__getitem__)
         return alive_players
 
     def get_player_by_role(self, role: Any) -> Optional[Player]:
@@ -156,17 +821,25 @@ class Game(ABC):
         查找具有给定角色的第一个存活玩家.
         role: 可以是 Enum 成员或字符串.
         """
-        role_value = role.value if hasattr(role, "value") else role
-        for p in self.players.values():
-            if p.role == role_value and p.is_alive:
-                return p
+        for name in self._alive_by_role.get(self._role_value(role), ()):
+            return self.players[name]
         return None
 
-    def load_basic_config(self, game_dir: Path) -> Tuple[Dict, Dict, Dict[str, Dict]]:
+    def count_alive(self, role: Any = None, team: Optional[str] = None) -> int:
+        """按角色或阵营统计存活人数, O(1)."""
+        if role is not None:
+            return len(self._alive_by_role.get(self._role_value(role), ()))
+        if team is not None:
+            return self._alive_by_team.get(team, 0)
+        return len(self._alive)
+
+    def load_basic_config(
+        self, game_dir: Path
+    ) -> Tuple[Dict, Mapping[str, Any], Dict[str, Dict]]:
         """
         从游戏目录加载 config.json 和 prompt.json.
         将配置中的玩家数据与初始玩家数据合并.
-        返回 (config, prompts, player_config_map).
+        返回 (config, prompts, player_config_map), 其中 prompts 为共享的只读提示词包.
         """
         config_path = game_dir / "config.json"
         prompt_path = game_dir / "prompt.json"
@@ -178,6 +851,8 @@ class Game(ABC):
         try:
             with open(config_path, "r", encoding="utf-8") as file:
                 config = json.load(file)
+                if "seed" in config and not self._seed_fixed:
+                    self.reseed(config["seed"])
                 # 如果 __init__ 中未提供玩家, 则从配置加载
                 if not self._players_data:
                     player_configs = config.get("players", [])
@@ -209,8 +884,7 @@ class Game(ABC):
                             player_config_map[name] = {}
                         player_config_map[name].update(p)
 
-            with open(prompt_path, "r", encoding="utf-8") as file:
-                prompts = json.load(file)
+            prompts = load_prompt_bundle(prompt_path)
 
         except (FileNotFoundError, KeyError, ValueError) as e:
             self.logger.system_logger.error(f"配置文件或提示词文件有错: {str(e)}")
@@ -222,48 +896,113 @@ class Game(ABC):
             self.logger.system_logger.error(f"未知错误: {str(e)}")
             pass
 
+        self.config = config
+        self.configure_lobby(len(self.all_player_names))
         return config, prompts, player_config_map
 
+    def configure_lobby(self, player_count: int):
+        """按玩家人数决定是否启用大厅模式, 设置取自 config.json 的 large_lobby."""
+        options = {**DEFAULT_LARGE_LOBBY, **self.config.get("large_lobby", {})}
+        self.large_lobby = player_count >= options["threshold"]
+        if self.large_lobby:
+            self.history_limit = options["history_limit"]
+            self.max_speech_chars = options["max_speech_chars"]
+            self.logger.system_logger.info(
+                f"{player_count} 名玩家, 启用大厅模式: 历史视图 {self.history_limit} 条,"
+                f" 发言上限 {self.max_speech_chars} 字"
+            )
+        else:
+            self.history_limit = None
+            self.max_speech_chars = None
+
     def announce(
-        self, message: str, visible_to: Optional[List[str]] = None, prefix: str = "#:"
+        self,
+        message: str,
+        visible_to: Optional[List[str]] = None,
+        prefix: str = "#:",
+        actor: Optional[str] = None,
     ):
         """
         封装的游戏公告处理方法.
-        它打印到控制台 (标准输出) 并将事件记录到游戏日志记录器.
+        它将事件同步记录到游戏日志记录器的内存历史中, 并发布到事件总线,
+        由订阅者写入事件文件, 推送给客户端并打印到控制台.
 
         Args:
             message (str): 公告内容.
             visible_to (Optional[List[str]]): 可以看到此消息的玩家名称列表.
                                               如果为 None, 则为公开 (所有玩家).
             prefix (str): 控制台输出的前缀字符串 (例如 '#:', '#@', '#!') .
+            actor (Optional[str]): 做出该行为的玩家 (发言, 投票, 使用技能者),
+                                   记录在事件文件中, 供检索按发言者过滤; 系统公告为 None.
         """
-        # 记录到文件, 带可见性范围
-        self.logger.log_event(message, visible_to)
+        # 并发执行的步骤中, 公开公告 (包括发给全体玩家的公告) 先进入当前任务的缓冲区,
+        # 由引擎按顺序统一发出; 私密公告 (例如狼人频道) 立即发给相关玩家
+        buffer = pending_events.get()
+        if buffer is not None and self._is_public(visible_to):
+            buffer.append((message, visible_to, prefix, actor))
+            return
 
-        # 发送事件
-        if self.event_emitter:
-            try:
-                self.event_emitter(message, visible_to)
-            except Exception as e:
-                # 防止循环触发, 且防止由于logger错误
-                if "announce" not in str(e):
-                    self.logger.system_logger.error(f"发送公告事件时出错: {e}")
-                    print(f"发送公告事件时出错: {e}")
-
-        # 打印到控制台
-        # 注意：控制台输出通常显示管理员/旁观者的所有内容.
-        # 如果我们想向控制台隐藏秘密, 我们可以检查 visible_to.
-        # 但目前, 我们假设控制台是“上帝视角”.
-
-        if visible_to:
-            # 如果可见性受限, 可能需要在控制台中指出
-            self.logger.system_logger.info(f"公告: {message} (仅对 {visible_to} 可见)")
-            print(f"{prefix} [Visible to {visible_to}] {message}")
+        # 内存中的历史记录同步更新, 保证随后的玩家请求能看到这条公告
+        self.logger.log_event(message, visible_to, actor)
+
+        # 落盘, 推送和控制台输出交给事件总线的订阅者异步完成
+        self.bus.publish(Announcement(self.game_name, message, visible_to, prefix))
+
+    def notify(self, message: str, visible_to: Optional[List[str]] = None):
+        """
+        发出临时的状态提示 (例如 "某人正在思考..."). 与公告一样经事件总线推送给客户端
+        和控制台, 但不写入事件文件, 也不进入玩家的历史记录.
+        """
+        self.bus.publish(Notice(self.game_name, message, visible_to))
+
+    def _is_public(self, visible_to: Optional[List[str]]) -> bool:
+        """公告是否对所有玩家可见: visible_to 为 None, 或包含全部玩家."""
+        if visible_to is None:
+            return True
+        return len(visible_to) >= len(self.all_player_names) and set(
+            visible_to
+        ).issuperset(self.all_player_names)
+
+    def remaining_time(self) -> Optional[float]:
+        """当前阶段剩余的时间预算 (秒), 阶段不限时返回 None."""
+        if self._phase_deadline is None:
+            return None
+        return self._phase_deadline - time.monotonic()
+
+    def projected_latency(self, player_name: str) -> Optional[float]:
+        """预估玩家下一次发言的耗时: 优先用其本人的滑动平均, 否则用所有玩家的均值."""
+        latency = self._speaker_latency.get(player_name)
+        if latency is None and self._speaker_latency:
+            latency = sum(self._speaker_latency.values()) / len(self._speaker_latency)
+        return latency
+
+    def record_latency(self, player_name: str, seconds: float):
+        previous = self._speaker_latency.get(player_name)
+        if previous is None:
+            self._speaker_latency[player_name] = seconds
         else:
-            self.logger.system_logger.info(f"公告: {message} (公开)")
-            print(f"{prefix} {message}")
+            self._speaker_latency[player_name] = (
+                LATENCY_EMA_ALPHA * seconds + (1 - LATENCY_EMA_ALPHA) * previous
+            )
 
-    def process_discussion(
+    def speech_cap(
+        self, player_name: str, speakers_left: int, max_chars: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        计算本次发言的长度上限. 预计耗时超过剩余预算中本人应得的份额时,
+        按比例缩短上限 (不低于 MIN_SPEECH_CHARS); 否则返回 max_chars.
+        """
+        remaining = self.remaining_time()
+        projected = self.projected_latency(player_name)
+        if remaining is None or projected is None or projected <= 0:
+            return max_chars
+        share = remaining / max(speakers_left, 1)
+        if projected <= share:
+            return max_chars
+        base = max_chars or DEFAULT_SPEECH_CHARS
+        return max(MIN_SPEECH_CHARS, int(base * share / projected))
+
+    async def process_discussion(
         self,
         participants: List[str],
         prompts: Dict[str, str],
@@ -272,6 +1011,7 @@ class Game(ABC):
         shuffle_order: bool = False,
         visibility: Optional[List[str]] = None,
         prefix: str = "#:",
+        max_speech_chars: Optional[int] = None,
     ):
         """
         处理讨论阶段.
@@ -284,12 +1024,16 @@ class Game(ABC):
                 - 'speech': 演讲公告 (必需, 格式 {0}=name, {1}=content)
                 - 'ready_msg': 玩家准备好时的公告 (可选, 格式 {0}=name, {1}=ready_count, {2}=total)
                 - 'timeout': 达到最大轮次时的公告 (可选, 格式 {0}=max_rounds)
+                - 'out_of_time': 时间预算不足而提前结束时的公告 (可选, 缺省时使用 'timeout')
                 - 'alive_players': 存活玩家公告 (可选, 格式 {0}=joined_names)
+                - 'limit': 发言长度提示, 附加在输入提示之后 (可选, 格式 {0}=max_chars)
             max_rounds: 最大讨论轮数.
             enable_ready_check: 如果为 True, 输入 '0' 标记玩家准备结束讨论.
             shuffle_order: 如果为 True, 每轮随机打乱发言顺序.
             visibility: 谁可以看到公告 (None 表示公开) .
             prefix: 公告前缀.
+            max_speech_chars: 单次发言的长度上限 (字符数), None 表示使用大厅模式的上限 (未启用时不限).
+                阶段设置了时间预算时, 引擎会根据剩余时间和预估发言耗时提前结束讨论或缩短上限.
         """
         if "start" in prompts:
             self.announce(prompts["start"], visibility, "#@")
@@ -301,13 +1045,16 @@ class Game(ABC):
                 "#@",
             )
 
+        if max_speech_chars is None:
+            max_speech_chars = self.max_speech_chars
+
         ready_to_vote = set()
         discussion_rounds = 0
-
-        import random
+        out_of_time = False
 
         while (
             self._running
+            and not out_of_time
             and len(ready_to_vote) < len(participants)
             and discussion_rounds < max_rounds
         ):
@@ -316,15 +1063,31 @@ class Game(ABC):
             # 确定顺序
             speakers = list(participants)
             if shuffle_order:
-                random.shuffle(speakers)
+                self.rng.shuffle(speakers)
 
-            for player_name in speakers:
+            for i, player_name in enumerate(speakers):
                 if player_name in ready_to_vote:
                     continue
 
+                # 剩余预算不够下一位发言时提前结束讨论
+                remaining = self.remaining_time()
+                projected = self.projected_latency(player_name)
+                if remaining is not None and (
+                    remaining <= 0 or (projected is not None and projected > remaining)
+                ):
+                    out_of_time = True
+                    break
+
                 player = self.players[player_name]
                 prompt = prompts["prompt"].format(player_name)
-                action = player.speak(prompt)
+                speakers_left = sum(1 for p in speakers[i:] if p not in ready_to_vote)
+                cap = self.speech_cap(player_name, speakers_left, max_speech_chars)
+                if cap is not None and "limit" in prompts:
+                    prompt += prompts["limit"].format(cap)
+
+                started = time.monotonic()
+                action = await player.speak(prompt, max_chars=cap)
+                self.record_latency(player_name, time.monotonic() - started)
 
                 if enable_ready_check and action == "0":
                     ready_to_vote.add(player_name)
@@ -332,15 +1095,23 @@ class Game(ABC):
                         msg = prompts["ready_msg"].format(
                             player_name, len(ready_to_vote), len(participants)
                         )
-                        self.announce(msg, visibility, "#@")
+                        self.announce(msg, visibility, "#@", player_name)
                 elif action:
                     self.announce(
                         prompts["speech"].format(player_name, action),
                         visibility,
                         prefix,
+                        player_name,
                     )
 
-        if (
+        if out_of_time:
+            self.logger.system_logger.info(
+                f"时间预算不足, 第 {discussion_rounds} 轮讨论提前结束"
+            )
+            msg = prompts.get("out_of_time", prompts.get("timeout"))
+            if msg:
+                self.announce(msg.format(max_rounds), visibility, "#@")
+        elif (
             discussion_rounds >= max_rounds
             and len(ready_to_vote) < len(participants)
             and "timeout" in prompts
@@ -348,7 +1119,7 @@ class Game(ABC):
             msg = prompts["timeout"].format(max_rounds)
             self.announce(msg, visibility, "#@")
 
-    def process_vote(
+    async def process_vote(
         self,
         voters: List[str],
         candidates: List[str],
@@ -357,6 +1128,7 @@ class Game(ABC):
         max_retries: int = 5,
         visibility: Optional[List[str]] = None,
         prefix: str = "#:",
+        concurrent: Optional[bool] = None,
     ) -> Optional[str]:
         """
         处理投票阶段.
@@ -374,6 +1146,8 @@ class Game(ABC):
             max_retries: 重试最大次数, 防止死循环.
             visibility: 谁可以看到公告 (None 表示公开) .
             prefix: 公告前缀.
+            concurrent: 如果为 True, 同时向所有投票者收集选择, 再按投票者顺序公告.
+                None 表示仅在大厅模式下并发.
 
         Returns:
             选定目标的名称, 如果没有结果/平局 (且不重试) 则为 None.
@@ -381,19 +1155,39 @@ class Game(ABC):
         if "start" in prompts:
             self.announce(prompts["start"], visibility, "#@")
 
+        if concurrent is None:
+            concurrent = self.large_lobby
+
         retries = 0
         while True:
             votes = {name: 0 for name in candidates}
-            for voter_name in voters:
-                voter = self.players[voter_name]
-                prompt = prompts["prompt"].format(voter_name)
-                target = voter.choose(prompt, candidates)
+            if concurrent:
+                # 同时发出所有投票请求, 总耗时取决于最慢的投票者而不是所有人之和
+                ballots = await asyncio.gather(
+                    *(
+                        self.players[name].choose(
+                            prompts["prompt"].format(name), candidates
+                        )
+                        for name in voters
+                    )
+                )
+            else:
+                ballots = None
+
+            for i, voter_name in enumerate(voters):
+                if ballots is not None:
+                    target = ballots[i]
+                else:
+                    voter = self.players[voter_name]
+                    prompt = prompts["prompt"].format(voter_name)
+                    target = await voter.choose(prompt, candidates)
                 votes[target] += 1
                 if "action" in prompts:
                     self.announce(
                         prompts["action"].format(voter_name, target),
                         visibility,
                         prefix,
+                        voter_name,
                     )
 
             max_votes = 0
@@ -428,12 +1222,10 @@ class Game(ABC):
                     self.logger.system_logger.warning(
                         "投票达到最大重试次数, 将随机选择一个获胜者"
                     )
-                    import random
-
                     if targets:
-                        winner = random.choice(targets)
+                        winner = self.rng.choice(targets)
                     else:
-                        winner = random.choice(candidates)
+                        winner = self.rng.choice(candidates)
 
                     if "result_out" in prompts:
                         self.announce(
@@ -442,3 +1234,264 @@ class Game(ABC):
                             "#@" if visibility else "#!",
                         )
                     return winner
+
+
+# 进程级共享的只读提示词包: 文件内容哈希 -> 冻结后的提示词树
+_prompt_bundles: Dict[str, Mapping[str, Any]] = {}
+
+
+def freeze(value: Any) -> Any:
+    """递归地将 dict/list 转为只读的 MappingProxyType/tuple, 以便在多局游戏间安全共享."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def load_prompt_bundle(path: Path) -> Mapping[str, Any]:
+    """
+    加载 prompt.json 并返回只读的提示词包.
+    内容相同的文件在同一进程内只解析一次, 同一局的所有玩家以及所有对局共享同一份对象.
+    """
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    bundle = _prompt_bundles.get(digest)
+    if bundle is None:
+        bundle = freeze(json.loads(data.decode("utf-8")))
+        _prompt_bundles[digest] = bundle
+    return bundle
+
+
+def load_snapshot(path: Path) -> Dict[str, Any]:
+    """读取存档文件."""
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的存档版本: {state.get('version')}")
+    return state
+
+
+def ensure_unfinished(state: Dict[str, Any]):
+    """已结束对局的存档不能恢复, 抛出 ValueError."""
+    if state.get("finished"):
+        raise ValueError("存档对应的对局已经结束, 不能恢复")
+
+
+def find_latest_snapshot(game_name: str) -> Optional[Path]:
+    """在游戏日志目录中查找指定游戏最近一个未结束的存档."""
+    if not GAMES_LOG_DIR.exists():
+        return None
+
+    for log_dir in sorted(GAMES_LOG_DIR.iterdir(), reverse=True):
+        path = log_dir / SNAPSHOT_FILE
+        if not path.is_file():
+            continue
+        try:
+            state = load_snapshot(path)
+        except (OSError, ValueError):
+            continue
+        if state.get("game_name") == game_name and not state.get("finished"):
+            return path
+    return None
+
+
+# -----------------------------------------------------------------------------
+# 声明式游戏定义
+# -----------------------------------------------------------------------------
+
+
+class DefinitionError(ValueError):
+    """游戏定义文件 (definition.json) 校验失败."""
+
+    pass
+
+
+@dataclass
+class GameDefinition:
+    """编译后的游戏定义: 阶段/步骤图与各人数下的角色配置."""
+
+    digest: str
+    phases: List[GamePhase]
+    role_tables: Dict[int, Dict[str, int]]
+    default_roles: Dict[str, Any]
+
+    def roles_for(self, player_count: int) -> Dict[str, int]:
+        """
+        返回指定人数下的角色配置.
+        默认规则中的值可以是固定人数, {"per": n, "min": m} (每 n 人一个, 至少 m 个),
+        或 "rest" (剩余人数).
+        """
+        table = self.role_tables.get(player_count)
+        if table is not None:
+            return dict(table)
+
+        roles = {}
+        rest_role = None
+        for role, rule in self.default_roles.items():
+            if rule == "rest":
+                rest_role = role
+            elif isinstance(rule, int):
+                roles[role] = rule
+            else:
+                roles[role] = max(rule.get("min", 0), player_count // rule["per"])
+        if rest_role:
+            roles[rest_role] = player_count - sum(roles.values())
+        return roles
+
+
+# 内容哈希 -> 编译结果; 同一份定义在进程内只编译一次
+_definition_cache: Dict[str, GameDefinition] = {}
+
+
+def load_game_definition(
+    game_dir: Path,
+    actions: Dict[str, Callable[[], GameAction]],
+    conditions: Optional[Dict[str, Callable[[Any], bool]]] = None,
+) -> GameDefinition:
+    """
+    读取 game_dir 下的 definition.json, 对照 prompt.json 与动作/条件注册表校验后编译.
+    定义, 提示词与游戏模块源码的内容哈希相同时直接返回缓存结果.
+    """
+    if game_dir is None:
+        raise DefinitionError("未指定游戏目录")
+    game_dir = Path(game_dir)
+    definition_path = game_dir / DEFINITION_FILE
+    prompt_path = game_dir / "prompt.json"
+
+    hasher = hashlib.sha256()
+    for path in (definition_path, prompt_path, game_dir / "game.py"):
+        if path.exists():
+            hasher.update(path.read_bytes())
+    digest = hasher.hexdigest()
+
+    cached = _definition_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    try:
+        with open(definition_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        prompts = {}
+        if prompt_path.exists():
+            prompts = load_prompt_bundle(prompt_path)
+    except (OSError, ValueError) as e:
+        raise DefinitionError(f"无法读取游戏定义 {definition_path}: {e}") from e
+
+    definition = _compile_definition(raw, digest, actions, conditions or {}, prompts)
+    _definition_cache[digest] = definition
+    return definition
+
+
+def _compile_definition(
+    raw: Dict[str, Any],
+    digest: str,
+    actions: Dict[str, Callable[[], GameAction]],
+    conditions: Dict[str, Callable[[Any], bool]],
+    prompts: Dict[str, Any],
+) -> GameDefinition:
+    errors: List[str] = []
+
+    # 角色配置
+    roles_spec = raw.get("roles", {})
+    role_tables: Dict[int, Dict[str, int]] = {}
+    known_roles = set()
+    for table in roles_spec.get("tables", []):
+        count = table.get("players")
+        roles = table.get("roles", {})
+        if not isinstance(count, int) or count <= 0:
+            errors.append(f"角色表的人数无效: {count}")
+            continue
+        if any(not isinstance(n, int) or n < 0 for n in roles.values()):
+            errors.append(f"{count} 人角色表中存在无效的角色数量")
+        elif sum(roles.values()) != count:
+            errors.append(f"{count} 人角色表的角色总数为 {sum(roles.values())}")
+        role_tables[count] = roles
+        known_roles.update(roles)
+
+    default_roles = roles_spec.get("default", {})
+    for role, rule in default_roles.items():
+        valid = (
+            rule == "rest"
+            or (isinstance(rule, int) and rule >= 0)
+            or (
+                isinstance(rule, dict)
+                and isinstance(rule.get("per"), int)
+                and rule["per"] > 0
+            )
+        )
+        if not valid:
+            errors.append(f"默认角色规则无效: {role}={rule}")
+    if list(default_roles.values()).count("rest") > 1:
+        errors.append("默认角色规则中最多只能有一个 rest")
+    known_roles.update(default_roles)
+
+    # 阶段与步骤
+    phases: List[GamePhase] = []
+    phase_names = set()
+    for phase_spec in raw.get("phases", []):
+        phase_name = phase_spec.get("name")
+        if not phase_name or phase_name in phase_names:
+            errors.append(f"阶段名称缺失或重复: {phase_name}")
+            continue
+        phase_names.add(phase_name)
+        time_budget = phase_spec.get("time_budget")
+        if time_budget is not None and (
+            not isinstance(time_budget, (int, float)) or time_budget <= 0
+        ):
+            errors.append(f"阶段 {phase_name} 的 time_budget 无效: {time_budget}")
+            time_budget = None
+        phase = GamePhase(phase_name, time_budget=time_budget)
+
+        for step_spec in phase_spec.get("steps", []):
+            step_name = step_spec.get("name")
+            where = f"{phase_name}.{step_name}"
+            action_factory = actions.get(step_spec.get("action"))
+            if action_factory is None:
+                errors.append(f"{where}: 未知动作 {step_spec.get('action')}")
+                continue
+
+            roles = step_spec.get("roles", [])
+            for role in roles:
+                if role not in known_roles:
+                    errors.append(f"{where}: 角色 {role} 未出现在角色配置中")
+
+            condition = None
+            if "condition" in step_spec:
+                condition = conditions.get(step_spec["condition"])
+                if condition is None:
+                    errors.append(f"{where}: 未知条件 {step_spec['condition']}")
+
+            prompt_key = step_spec.get("prompt")
+            if prompt_key:
+                node: Any = prompts
+                for key in prompt_key.split("."):
+                    if not isinstance(node, Mapping) or key not in node:
+                        errors.append(f"{where}: 提示词 {prompt_key} 不存在")
+                        break
+                    node = node[key]
+
+            phase.add_step(
+                GameStep(
+                    step_name,
+                    roles,
+                    action_factory(),
+                    condition,
+                    depends_on=step_spec.get("depends_on", []),
+                    prompt_key=prompt_key,
+                    params=freeze(step_spec.get("params", {})),
+                )
+            )
+
+        try:
+            phase.waves()
+        except ValueError as e:
+            errors.append(str(e))
+        phases.append(phase)
+
+    if not phases:
+        errors.append("游戏定义中没有任何阶段")
+    if errors:
+        raise DefinitionError("游戏定义校验失败:\n" + "\n".join(errors))
+
+    return GameDefinition(digest, phases, role_tables, default_roles)
@@ -4,13 +4,27 @@
 # @not completed yet
 # ------------------------------
 
+import atexit
+from collections import deque
+from contextvars import ContextVar
+import copy
+import datetime as _dt
+import enum
 import functools
 import inspect
+import json
 import logging
+from logging.handlers import RotatingFileHandler
 import os
+import queue
+import re
+import string
+import threading
+import uuid
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List
+from itertools import chain
+from pathlib import Path, PurePath
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 from concurrent_log_handler import ConcurrentRotatingFileHandler
 
@@ -19,63 +33,420 @@ LOG_DIR = BASE / "logs"
 GAMES_DIR = BASE / ".games"
 GAMES_LOG_DIR = GAMES_DIR / "logs"
 DEFAULT_LOGFILE = LOG_DIR / "ludus.log"
+EVENTS_FILE = "events.jsonl"
+DECISIONS_FILE = "decisions.jsonl"
+RESULT_FILE = "result.json"
+# 对局结束 (包括被停止) 时写入的标记, 之后日志目录不再变化
+ENDED_FILE = "ended.json"
+SNAPSHOT_FILE = "snapshot.json"
+# 每局系统日志记录器的名称前缀, 后接对局编号
+SYSTEM_LOGGER_PREFIX = "System-"
 
 FORMATTER = logging.Formatter(
     "%(asctime)s [%(levelname)s] %(name)s - %(message)s", "%Y-%m-%d %H:%M:%S"
 )
 GAMES_LOG_FORMATTER = logging.Formatter("[%(asctime)s] %(message)s", "%m-%d %H:%M:%S")
 
+# 并发执行步骤时, 当前任务中尚未发出的公开公告: (内容, 可见范围, 前缀, 执行者)
+pending_events: ContextVar[
+    Optional[List[Tuple[str, Optional[List[str]], str, Optional[str]]]]
+] = ContextVar("pending_events", default=None)
+
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(GAMES_LOG_DIR, exist_ok=True)
 
 
+# 日志设置, 可由 config.yaml 的 logging 段覆盖 (见 configure_logging)
+LOGGING_DEFAULTS: Dict[str, Any] = {
+    # 记录交给后台线程写入, 调用方只把记录放入队列, 不做格式化和 I/O
+    "async": True,
+    # 多个进程同时写同一个日志文件时 (例如调试模式下的重载器) 才需要跨进程文件锁
+    "multiprocess": False,
+    # 单个日志文件的轮转大小 (字节) 和保留的备份数
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+    # 后台线程每批最多写入的记录数, 每批结束后每个处理程序只 flush 一次
+    "batch_size": 512,
+}
+_settings: Dict[str, Any] = dict(LOGGING_DEFAULTS)
+# get_logger 配置过的记录器: 名称 -> (级别, 日志文件, 格式), 设置变化时据此重建处理程序
+_configured: Dict[str, Tuple[int, Path, logging.Formatter]] = {}
+
+
+class _BatchFlushMixin:
+    """后台线程处理一批记录时推迟 flush, 整批写完后再统一 flush."""
+
+    _deferred = False
+
+    def flush(self):
+        if not self._deferred:
+            super().flush()
+
+
+class _StreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+class _RotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+    """
+    单进程使用的轮转文件处理程序. 自行累计文件大小来判断是否轮转,
+    不在每条记录上 seek/tell (那样会强制写出缓冲区, 批量 flush 就失去意义).
+    """
+
+    _size = 0
+    _pending = 0
+
+    def _open(self):
+        stream = super()._open()
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return False
+        line = self.format(record) + self.terminator
+        self._pending = len(line.encode(self.encoding or "utf-8"))
+        return self._size > 0 and self._size + self._pending >= self.maxBytes
+
+    def emit(self, record):
+        super().emit(record)
+        self._size += self._pending
+
+
+class _LogWriter:
+    """
+    后台写入线程. 各记录器的 _QueueHandler 把 (目标处理程序, 记录) 放入同一个队列,
+    这里成批取出写入; 所有记录器共用这一个线程.
+    """
+
+    def __init__(self):
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="LogWriter", daemon=True
+                )
+                self._thread.start()
+
+    def put(self, handlers, record):
+        self.queue.put((handlers, record))
+
+    def reset_after_fork(self):
+        """
+        fork 出的子进程中没有写入线程: 换用新的队列和锁 (父进程中尚未写出的记录由父进程负责),
+        父进程已启动写入线程时在子进程中重新启动.
+        """
+        running = self._thread is not None
+        self.queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        if running:
+            self.start()
+
+    def drain(self, timeout: float = 5.0):
+        """等待此前放入队列的记录全部写完."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put((None, done))
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < _settings["batch_size"]:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            touched = {}
+            markers = []
+            for handlers, record in batch:
+                if handlers is None:
+                    markers.append(record)
+                    continue
+                # 消息在这里格式化一次, 各处理程序不再重复格式化.
+                # 调用方的其他处理程序可能同时在读这条记录, 因此改在副本上
+                if record.args or not isinstance(record.msg, str):
+                    record = copy.copy(record)
+                    try:
+                        record.msg = record.getMessage()
+                    except Exception:
+                        record.msg = f"{record.msg!r} (日志参数格式化失败: {record.args!r})"
+                    record.args = None
+                for handler in handlers:
+                    if record.levelno < handler.level:
+                        continue
+                    if id(handler) not in touched:
+                        touched[id(handler)] = handler
+                        handler._deferred = True
+                    handler.handle(record)
+            for handler in touched.values():
+                handler._deferred = False
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+            for marker in markers:
+                marker.set()
+
+
+_writer = _LogWriter()
+atexit.register(_writer.drain)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer.reset_after_fork)
+
+
+# 不可变的值, 交给后台线程时无需复制
+_IMMUTABLE = (
+    str,
+    int,
+    float,
+    complex,
+    bytes,
+    type(None),
+    enum.Enum,
+    PurePath,
+    _dt.date,
+    _dt.time,
+    _dt.timedelta,
+)
+
+
+class _Unfreezable(Exception):
+    pass
+
+
+def _freeze(value):
+    """
+    复制日志参数中的可变容器, 使后台线程格式化时看到的是记录时的值.
+    无法安全复制的对象 (任意类的实例) 抛出 _Unfreezable.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+    kind = type(value)
+    if kind is tuple or kind is list or kind is set or kind is frozenset:
+        return kind(_freeze(item) for item in value)
+    if kind is dict:
+        return {key: _freeze(item) for key, item in value.items()}
+    raise _Unfreezable
+
+
+class _QueueHandler(logging.Handler):
+    """
+    把记录交给后台写入线程. 格式化和写入都在后台线程进行, 调用方 (例如游戏事件循环)
+    只复制消息参数中的可变容器; 参数中有无法复制的对象时才在调用方合并为最终消息.
+    """
+
+    def __init__(self, handlers: List[logging.Handler]):
+        super().__init__(min(h.level for h in handlers))
+        self.handlers = tuple(handlers)
+
+    def emit(self, record):
+        msg = record.msg
+        if record.args or not isinstance(msg, str):
+            try:
+                if isinstance(msg, _LazyMessage):
+                    record.msg = _LazyMessage(
+                        msg.template, _freeze(msg.args), _freeze(msg.fields)
+                    )
+                elif not isinstance(msg, str):
+                    raise _Unfreezable
+                if record.args:
+                    record.args = _freeze(record.args)
+            except _Unfreezable:
+                record.msg = record.getMessage()
+                record.args = None
+        _writer.put(self.handlers, record)
+
+    def close(self):
+        # 先写完队列中属于这些处理程序的记录, 再关闭它们
+        _writer.drain()
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
 def _create_stream_handler(level, formatter=FORMATTER):
-    sh = logging.StreamHandler()
+    sh = _StreamHandler()
     sh.setLevel(level)
     sh.setFormatter(formatter)
     return sh
 
 
 def _create_file_handler(logfile, level, formatter=FORMATTER):
-    # 使用大小轮转日志文件，每个文件最大100KB，保留5个备份
-    # This is process-safe
-    fh = ConcurrentRotatingFileHandler(
-        logfile, maxBytes=102400, backupCount=5, encoding="utf-8"
-    )
+    # 按大小轮转日志文件, 大小和备份数见 LOGGING_DEFAULTS
+    if _settings["multiprocess"]:
+        # 跨进程安全, 但每条记录都要获取文件锁
+        fh = ConcurrentRotatingFileHandler(
+            logfile,
+            maxBytes=_settings["max_bytes"],
+            backupCount=_settings["backup_count"],
+            encoding="utf-8",
+        )
+    else:
+        fh = _RotatingFileHandler(
+            logfile,
+            maxBytes=_settings["max_bytes"],
+            backupCount=_settings["backup_count"],
+            encoding="utf-8",
+        )
     fh.setLevel(level)
     fh.setFormatter(formatter)
     return fh
 
 
+def _create_handlers(level, logfile, formatter) -> List[logging.Handler]:
+    handlers = [
+        _create_stream_handler(level, formatter),
+        _create_file_handler(logfile, level, formatter),
+    ]
+    if _settings["async"]:
+        _writer.start()
+        return [_QueueHandler(handlers)]
+    return handlers
+
+
+def _close_handlers(logger: logging.Logger):
+    for h in logger.handlers[:]:
+        logger.removeHandler(h)
+        h.close()
+
+
+def release_logger(name: str):
+    """
+    关闭记录器的处理程序, 并把它从 logging 的全局注册表中移除.
+    用于随对局创建的记录器, 对局结束后不在 logging.Logger.manager 中堆积.
+    """
+    _configured.pop(name, None)
+    logger = logging.Logger.manager.loggerDict.pop(name, None)
+    if isinstance(logger, logging.Logger):
+        _close_handlers(logger)
+
+
+def history_line(record_time: str, message: str) -> str:
+    """玩家历史记录 (模型上下文) 中的一行."""
+    return f"[{record_time}] {message}"
+
+
+def decision_messages(
+    context: Optional[Dict[str, Any]], history: str, system: str, prompt: str
+) -> List[Dict[str, str]]:
+    """
+    按决策记录中的提示词增量构造发给模型的消息. Player 请求模型时与导出时
+    (src/Export.py 从事件文件重建 history) 共用, 保证两者一致.
+    context 为 None 时不附带游戏记录; 否则包含标题 title 和提醒 reminder.
+    """
+    messages = []
+    if context is not None:
+        messages.append(
+            {
+                "role": "system",
+                "content": f"{context['title']}\n{history}\n\n{context['reminder']}",
+            }
+        )
+    messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def open_games() -> Set[str]:
+    """
+    当前进程中日志尚未关闭的对局编号: 对局进行中, 或已结束但仍在写入结果和索引.
+    每局的系统日志记录器在 GameLogger.close 时才释放 (见 release_logger).
+    """
+    return {
+        name[len(SYSTEM_LOGGER_PREFIX) :]
+        for name in list(_configured)
+        if name.startswith(SYSTEM_LOGGER_PREFIX)
+    }
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None):
+    """
+    按应用配置 (config.yaml 的 logging 段) 调整日志设置, 未给出的项保持默认值,
+    并按新设置重建已经创建的记录器的处理程序.
+    """
+    options = (config or {}).get("logging") or {}
+    for key, value in options.items():
+        if key in LOGGING_DEFAULTS:
+            _settings[key] = type(LOGGING_DEFAULTS[key])(value)
+
+    for name, (level, logfile, formatter) in list(_configured.items()):
+        logger = logging.getLogger(name)
+        _close_handlers(logger)
+        for handler in _create_handlers(level, logfile, formatter):
+            logger.addHandler(handler)
+
+
+class _LazyMessage:
+    """装饰器生成的日志消息, 只在处理程序真正输出时才格式化."""
+
+    __slots__ = ("template", "args", "fields")
+
+    def __init__(self, template: str, args: tuple, fields: Dict[str, Any]):
+        self.template = template
+        self.args = args
+        self.fields = fields
+
+    def __str__(self):
+        return self.template.format(*self.args, **self.fields)
+
+
 class DecoratorFactory:
     """
     一个工厂类, 用于创建日志装饰器, 并将其绑定到指定的日志记录器实例.
     例如, @logger.decorate.info("Executing {func_name}")
     """
 
+    # 模板中不需要绑定参数就能提供的字段
+    SPECIAL_FIELDS = frozenset(("func_name", "args", "kwargs"))
+
     def __init__(self, logger):
         self._logger = logger
 
     def _create_decorator(self, level, message_template):
+        logger = self._logger
+
         def decorator(func):
+            # 签名和模板字段在装饰时解析一次; 字段可能带属性或下标, 如 {data[gameId]}
+            signature = inspect.signature(func)
+            roots = {
+                re.split(r"[.\[]", field, maxsplit=1)[0]
+                for _, field, _, _ in string.Formatter().parse(message_template)
+                if field is not None
+            }
+            named = {r for r in roots if r and not r.isdigit()}
+            needs_bind = bool(named - self.SPECIAL_FIELDS)
+            # 消息只携带模板引用的参数, 交给后台线程时需要复制的值越少越好
+            positional = any(r == "" or r.isdigit() for r in roots)
+            # 没有字段的模板 (最常见) 直接使用格式化好的常量消息
+            constant = None if roots else message_template.format()
+            func_name = func.__name__
+
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                # Bind arguments to parameter names for rich formatting
-                bound_args = inspect.signature(func).bind(*args, **kwargs)
-                bound_args.apply_defaults()
-
-                # Create a dictionary of all arguments, including defaults
-                all_args = bound_args.arguments
-
-                # Add special and all-encompassing format keys
-                format_dict = {
-                    **all_args,
-                    "func_name": func.__name__,
-                    "args": args,
-                    "kwargs": kwargs,
-                }
-
-                self._logger.log(level, message_template.format(*args, **format_dict))
+                if logger.isEnabledFor(level):
+                    if constant is not None:
+                        message = constant
+                    else:
+                        fields = {"func_name": func_name, "args": args, "kwargs": kwargs}
+                        if needs_bind:
+                            bound_args = signature.bind(*args, **kwargs)
+                            bound_args.apply_defaults()
+                            fields = {**bound_args.arguments, **fields}
+                        fields = {k: v for k, v in fields.items() if k in named}
+                        message = _LazyMessage(
+                            message_template, args if positional else (), fields
+                        )
+                    logger.log(level, message)
                 return func(*args, **kwargs)
 
             return wrapper
@@ -124,8 +495,9 @@ def get_logger(name=None, level=logging.DEBUG, logfile=None, formatter=FORMATTER
     logger.setLevel(level)
     logger.propagate = False
 
-    logger.addHandler(_create_stream_handler(level, formatter))
-    logger.addHandler(_create_file_handler(logfile, level, formatter))
+    for handler in _create_handlers(level, logfile, formatter):
+        logger.addHandler(handler)
+    _configured[name] = (level, logfile, formatter)
 
     # 将 DecoratorFactory 实例绑定到记录器, 用于创建日志装饰器
     setattr(logger, "decorate", DecoratorFactory(logger))
@@ -134,17 +506,86 @@ def get_logger(name=None, level=logging.DEBUG, logfile=None, formatter=FORMATTER
 
 
 class GameLogger:
-    def __init__(self, name: str, players: List[Dict[str, str]]):
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_dir = GAMES_LOG_DIR / self.timestamp
-        os.makedirs(self.log_dir, exist_ok=True)
+    """
+    单局游戏的日志记录器.
 
-        self._clear_handlers("System")
-        self.system_logger = get_logger(
-            "System", logging.INFO, self.log_dir / "System.log", GAMES_LOG_FORMATTER
-        )
+    所有公告写入同一个追加式事件文件 (JSONL), 每条记录带可见性位掩码,
+    每位对应一个座位. 各玩家视角的历史记录按需从事件列表中惰性派生,
+    因此每条公告只产生一次写入, 打开的文件数也不随玩家人数增长.
+    内存中的事件列表同步更新; 事件文件的写入由 write_pending 完成,
+    可以交给事件总线的订阅者线程执行.
+    persist=False 时只保留内存中的事件, 不创建目录和文件 (用于模拟对局).
+
+    每局有独立的会话编号: 日志目录名和系统日志记录器名都带上它,
+    同一进程中并发的多局互不干扰; close 时释放本局的记录器.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        players: List[Dict[str, str]],
+        log_dir: Optional[Path] = None,
+        persist: bool = True,
+    ):
+        self.persist = persist
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.session_id = uuid.uuid4().hex[:8]
+        # 对局编号: 日志目录名 (时间戳_会话编号), 按名称排序即按开局时间排序
+        self.game_id = f"{self.timestamp}_{self.session_id}"
+        self.log_dir: Optional[Path] = None
+        if persist:
+            # 传入 log_dir 时沿用已有目录 (例如从存档恢复), 否则新建
+            if log_dir is None:
+                self.log_dir = GAMES_LOG_DIR / self.game_id
+                os.makedirs(self.log_dir)
+            else:
+                self.log_dir = Path(log_dir)
+                self.game_id = self.log_dir.name
+                os.makedirs(self.log_dir, exist_ok=True)
+
+            # 同一对局 (例如从存档恢复) 沿用同名记录器, 先关闭旧的处理程序
+            system_name = f"{SYSTEM_LOGGER_PREFIX}{self.game_id}"
+            release_logger(system_name)
+            self.system_logger = get_logger(
+                system_name,
+                logging.INFO,
+                self.log_dir / "System.log",
+                GAMES_LOG_FORMATTER,
+            )
+        else:
+            self.system_logger = logging.getLogger("Simulation")
+            if not self.system_logger.handlers:
+                self.system_logger.addHandler(logging.NullHandler())
+                self.system_logger.propagate = False
+
+        # 座位号 -> 可见性掩码中的位; 事件: (时间, 掩码, 内容), 掩码为 None 表示公开
+        self.seats: Dict[str, int] = {}
+        self.events: List[Tuple[str, Optional[int], str]] = []
+        # 玩家视角缓存: 名称 -> (已处理的事件数, 可见的格式化记录)
+        self._views: Dict[str, Tuple[int, Deque[str]]] = {}
+
+        self.events_path: Optional[Path] = None
+        self._events_file = None
+        self._offset = 0
+        # 当前阶段开始时的 (事件数, 文件位置), 阶段结束时写入阶段标记
+        self._phase_start: Tuple[int, int] = (0, 0)
+        if persist:
+            self.events_path = self.log_dir / EVENTS_FILE
+            self._load_events()
+            self._events_file = self._open_events()
+            self._offset = self._events_file.tell()
+        # 已编码但尚未写入文件的记录, 由 _io_lock 保护
+        self._unwritten: List[str] = []
+        self._unwritten_decisions: List[str] = []
+        # 各玩家最近写入决策文件的系统提示词
+        self._decision_systems: Dict[str, str] = {}
+        self._decisions_file = None
+        # 决策文件的长度 (字节), 已计入尚未写入的记录; 存档时记录, 恢复时据此截断
+        self._decisions_offset = 0
+        if persist and (self.log_dir / DECISIONS_FILE).exists():
+            self._decisions_offset = (self.log_dir / DECISIONS_FILE).stat().st_size
+        self._io_lock = threading.Lock()
 
-        self.loggers = {}
         for player in players:
             # Try to extract assuming {"player_uuid": "...", "player_name": "..."}
             p_uuid = player.get("player_uuid")
@@ -157,35 +598,216 @@ class GameLogger:
                     p_name = list(player.values())[0]
 
             if p_uuid and p_name:
-                self._clear_handlers(p_name)
-                self.loggers[p_name] = get_logger(
-                    p_name,
-                    logging.INFO,
-                    self.log_dir / f"{p_uuid}.log",
-                    GAMES_LOG_FORMATTER,
-                )
-
-    def _clear_handlers(self, name):
-        logger = logging.getLogger(name)
-        for h in logger.handlers[:]:
-            logger.removeHandler(h)
-            h.close()
+                self.seat_of(p_name)
+
+    def _open_events(self):
+        # newline="": 换行符按原样写入 (Windows 上不会变成 \r\n), 记录的字节位置与文件一致
+        return open(self.events_path, "a", encoding="utf-8", newline="")
+
+    def _load_events(self):
+        """从已有的事件文件恢复座位和事件 (用于从存档恢复)."""
+        self.seats.clear()
+        self.events.clear()
+        self._views.clear()
+        if not self.events_path.exists():
+            return
+
+        with open(self.events_path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "seat" in record:
+                    self.seats[record["seat"]] = record["bit"]
+                elif "mark" not in record:
+                    self.events.append((record["t"], record["v"], record["m"]))
+
+    def _write(self, record: Dict):
+        if self._events_file is None:
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._io_lock:
+            self._unwritten.append(line)
+        self._offset += len(line.encode("utf-8"))
+
+    def write_pending(self):
+        """把尚未写入的记录追加到事件文件和决策文件. 可在任意线程调用."""
+        with self._io_lock:
+            if self._unwritten:
+                lines, self._unwritten = self._unwritten, []
+                self._events_file.write("".join(lines))
+                self._events_file.flush()
+            if self._unwritten_decisions:
+                lines, self._unwritten_decisions = self._unwritten_decisions, []
+                if self._decisions_file is None:
+                    self._decisions_file = open(
+                        self.log_dir / DECISIONS_FILE, "a", encoding="utf-8", newline=""
+                    )
+                self._decisions_file.write("".join(lines))
+                self._decisions_file.flush()
+
+    def log_decision(self, record: Dict):
+        """
+        记录一次模型决策, 随事件一起由 write_pending 追加到决策文件,
+        对局进行中即可读取 (见 src/Export.py). 记录只保存提示词的增量 (见 decision_messages):
+        seq 为构造提示词时已发生的事件数, 历史记录在导出时按 seq 和可见性从事件文件重建;
+        玩家的系统提示词 (system) 只在与该玩家上一条记录不同时写入.
+        """
+        if self._events_file is None:
+            return
+        record = {"seq": len(self.events), **record}
+        system = record.get("system")
+        if system is not None:
+            if self._decision_systems.get(record["player"]) == system:
+                del record["system"]
+            else:
+                self._decision_systems[record["player"]] = system
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._io_lock:
+            self._unwritten_decisions.append(line)
+            self._decisions_offset += len(line.encode("utf-8"))
+
+    def _write_json(self, name: str, data: Dict):
+        # 先写临时文件再原子替换, 读取方不会看到写了一半的文件
+        if self.log_dir is None:
+            return
+        path = self.log_dir / name
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def write_result(self, result: Dict):
+        """写入整局结果 (Game.result_record)."""
+        self._write_json(RESULT_FILE, result)
+
+    def write_ended(self, winner: Optional[str]):
+        """
+        写入结束标记. 被停止或未分胜负的对局没有结果文件,
+        归档任务 (src/Retention.py) 据此判断对局已经结束, 可以压缩和清理.
+        """
+        self._write_json(
+            ENDED_FILE,
+            {"winner": winner, "ended_at": datetime.now().isoformat(timespec="seconds")},
+        )
 
-    def log_event(self, message: str, visible_to: List[str] = None):
+    def seat_of(self, name: str) -> int:
+        """返回玩家在可见性掩码中的位, 首次出现时分配并写入事件文件."""
+        bit = self.seats.get(name)
+        if bit is None:
+            bit = len(self.seats)
+            self.seats[name] = bit
+            self._write({"seat": name, "bit": bit})
+        return bit
+
+    def log_event(
+        self, message: str, visible_to: List[str] = None, actor: Optional[str] = None
+    ):
+        """
+        记录一条事件. 事件文件中的记录: seq 序号, t 时间, v 可见性掩码, m 内容,
+        以及 a 执行者 (做出该行为的玩家, 系统公告不写此字段).
+        """
+        mask = None
         if visible_to:
-            self.system_logger.info(f"[visible to {visible_to}] {message}")
+            mask = 0
             for p_name in visible_to:
-                logger = self.loggers.get(p_name)
-                if logger:
-                    logger.info(message)
-        else:
-            self.system_logger.info(message)
-            for logger in self.loggers.values():
-                logger.info(message)
-
-    def get_events(self, name: str) -> Path:
-        # 获得指定玩家的log文件路径
-        return self.log_dir / f"{name}.log"
+                mask |= 1 << self.seat_of(p_name)
+
+        record_time = datetime.now().strftime(GAMES_LOG_FORMATTER.datefmt)
+        self.events.append((record_time, mask, message))
+        record = {"seq": len(self.events), "t": record_time, "v": mask, "m": message}
+        if actor is not None:
+            record["a"] = actor
+        self._write(record)
+
+    def begin_phase(self):
+        """记录阶段开始时的事件数和文件位置."""
+        self._phase_start = (len(self.events), self._offset)
+
+    def end_phase(self, day: int, phase: str):
+        """
+        写入阶段标记: 阶段名, 结束时的天数, 以及阶段开始处的事件数和文件位置.
+        归档索引 (src/Archive.py) 据此按天和阶段定位, 无需从头读取事件文件.
+        """
+        seq, offset = self._phase_start
+        self._write({"mark": phase, "day": day, "seq": seq, "offset": offset})
+
+    def get_history(self, name: str, limit: Optional[int] = None) -> str:
+        """
+        返回指定玩家可见的历史记录, 只处理上次调用之后新增的事件.
+        limit 不为 None 时只保留最近 limit 条, 视图占用的内存不随对局长度增长.
+        当前任务中尚未发出的公开公告 (见 pending_events) 也会附在末尾.
+        """
+        count, lines = self._views.get(name, (0, None))
+        if lines is None or lines.maxlen != limit:
+            count, lines = 0, deque(maxlen=limit)
+        if count < len(self.events):
+            bit = 1 << self.seat_of(name)
+            for record_time, mask, message in self.events[count:]:
+                if mask is None or mask & bit:
+                    lines.append(history_line(record_time, message))
+            self._views[name] = (len(self.events), lines)
+        return "\n".join(chain(lines, self.pending_history()))
+
+    def pending_history(self) -> List[str]:
+        """当前任务中尚未发出的公开公告 (见 pending_events), 按历史记录的格式返回."""
+        pending = pending_events.get()
+        if not pending:
+            return []
+        record_time = datetime.now().strftime(GAMES_LOG_FORMATTER.datefmt)
+        return [history_line(record_time, message) for message, *_ in pending]
+
+    def get_cursors(self) -> Dict[str, int]:
+        """
+        返回事件文件和决策文件的当前位置, 用于存档. 位置已计入尚未写入的记录, 不需要先落盘;
+        调用方应在 write_pending 之后才写入存档 (见 Game._write_snapshot).
+        """
+        return {
+            "offset": self._offset,
+            "decisions": self._decisions_offset,
+            "events": len(self.events),
+            "phase_start": list(self._phase_start),
+        }
+
+    def restore_cursors(self, cursors: Dict[str, int]):
+        """
+        将事件文件和决策文件截断到存档时的位置, 丢弃存档之后写入的记录;
+        恢复后重新进行的步骤会再次写入这些记录, 不截断会重复.
+        """
+        if "phase_start" in cursors:
+            self._phase_start = tuple(cursors["phase_start"])
+        if self._events_file is None:
+            return
+        self.write_pending()
+
+        offset = cursors.get("offset")
+        if offset is not None and offset < self._offset:
+            self._events_file.close()
+            os.truncate(self.events_path, offset)
+            self._load_events()
+            self._events_file = self._open_events()
+            self._offset = offset
+
+        decisions = cursors.get("decisions")
+        if decisions is not None and decisions < self._decisions_offset:
+            with self._io_lock:
+                if self._decisions_file is not None:
+                    self._decisions_file.close()
+                    self._decisions_file = None
+                os.truncate(self.log_dir / DECISIONS_FILE, decisions)
+                self._decisions_offset = decisions
+                # 截断可能去掉了某位玩家唯一一条带系统提示词的记录, 之后的记录重新写入
+                self._decision_systems.clear()
+
+    def close(self):
+        """写完并关闭事件和决策文件, 释放本局的系统日志记录器. 可重复调用."""
+        if self._events_file is not None:
+            self.write_pending()
+            self._events_file.close()
+            self._events_file = None
+        if self._decisions_file is not None:
+            self._decisions_file.close()
+            self._decisions_file = None
+        if self.persist:
+            release_logger(self.system_logger.name)
 
 
 if __name__ == "__main__":
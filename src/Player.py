@@ -1,112 +1,329 @@
+import asyncio
+import concurrent.futures
+from contextvars import ContextVar
+import inspect
 import os
-from typing import Dict, List, Any
-from litellm import completion
+from pathlib import Path
+import random
+import sys
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from litellm import acompletion
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Logger import decision_messages
+
+# 当前任务中模型请求的限流器: limiter(供应商) 在发出请求前等待配额, 为 None 时不限流
+# 由锦标赛等批量运行方在启动对局任务前设置, 同一任务中的所有玩家共享
+request_limiter: ContextVar[Optional[Callable[[str], Awaitable[None]]]] = ContextVar(
+    "request_limiter", default=None
+)
+# 当前任务的随机数生成器: 引擎并发执行同一批次的步骤时, 每个步骤使用由游戏种子派生的
+# 独立生成器, 随机结果不受任务交错顺序影响; 为 None 时使用游戏 (玩家) 自身的 rng
+step_rng: ContextVar[Optional[random.Random]] = ContextVar("step_rng", default=None)
+
+
+def _handler_info(handler: Callable[..., Any]) -> Tuple[bool, bool]:
+    """
+    人类输入处理函数的调用方式: (是否接受 timeout 关键字参数, 是否为协程函数).
+    协程函数 (见 src/services/games.py) 在事件循环中直接调用;
+    其余的按同步函数在线程中调用, 返回的 awaitable 再回到事件循环中等待.
+    """
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return False, False
+    accepts_timeout = any(
+        p.name == "timeout" or p.kind is inspect.Parameter.VAR_KEYWORD
+        for p in parameters
+    )
+    return accepts_timeout, inspect.iscoroutinefunction(handler)
 
 
 class Player:
+    # AI 的思考延迟区间 (秒), 用于控制游戏节奏; 可由游戏配置 think_delay 覆盖
+    DEFAULT_THINK_DELAY = {"choose": (1.5, 3.0), "speak": (2.0, 4.0)}
+    # 人类玩家输入超时后的默认动作
+    TIMEOUT_ACTIONS = ("skip", "random", "ai")
+
+    # 模拟大量对局时玩家对象数量庞大, 使用 __slots__ 去掉每个实例的 __dict__
+    __slots__ = (
+        "name",
+        "role",
+        "config",
+        "prompts",
+        "game_logger",
+        "input_handler",
+        "notify",
+        "_rng",
+        "history_limit",
+        "think_delay",
+        "input_timeout",
+        "on_timeout",
+        "is_human",
+        "random_agent",
+        "is_alive",
+        "is_guarded",
+        "is_first_night",
+        "decisions",
+        "decision_time",
+        "tokens",
+        "_prompt",
+    )
+
     def __init__(
         self,
         name: str,
         role: str,
         config_data: Dict[str, Any],
-        prompts: Dict[str, str],
+        prompts: Mapping[str, Any],
         game_logger=None,
         input_handler=None,
-        event_emitter=None,
+        notify=None,
+        rng: Optional[random.Random] = None,
+        history_limit: Optional[int] = None,
+        think_delay: Optional[Mapping[str, Sequence[float]]] = None,
+        input_policy: Optional[Mapping[str, Any]] = None,
     ):
         self.name = name
         self.role = role
         self.config = config_data
+        # 同一局 (以及内容相同的各局) 的玩家共享同一份只读提示词包
         self.prompts = prompts
         self.game_logger = game_logger
         self.input_handler = input_handler
-        self.event_emitter = event_emitter
+        # notify(消息, 可见玩家): 临时的状态提示, 由所属游戏经事件总线发出 (见 Game.notify)
+        self.notify = notify
+        # 由所属游戏传入, 保证同一种子下的随机行为可复现
+        self._rng = rng if rng is not None else random.Random()
+        # 上下文中保留的历史事件条数, None 表示全部 (大厅模式下由游戏设置)
+        self.history_limit = history_limit
+        self.think_delay = {**self.DEFAULT_THINK_DELAY, **(think_delay or {})}
+        # 人类输入的超时时间 (秒, None 表示一直等待) 及超时后的默认动作
+        input_policy = input_policy or {}
+        self.input_timeout: Optional[float] = input_policy.get("timeout")
+        self.on_timeout: str = input_policy.get("on_timeout", "skip")
+        if self.on_timeout not in self.TIMEOUT_ACTIONS:
+            raise ValueError(f"未知的超时动作: {self.on_timeout}")
 
         self.is_human = self.config.get("human", False)
+        # 随机代理: 不调用模型, 直接用 rng 做选择, 不发言 (用于模拟对局)
+        self.random_agent = False
         self.is_alive = True
         self.is_guarded = False
         self.is_first_night = True
-
-        # 将 self 注入主提示词
-        self.prompt = self.prompts.get("PROMPT", "").format(self=self)
+        # 模型请求次数及累计耗时 (秒, 不含思考延迟), 用于统计各模型的决策延迟
+        self.decisions = 0
+        self.decision_time = 0.0
+        # 模型返回的累计 token 用量
+        self.tokens = 0
+
+        self._prompt: Optional[str] = None
+
+    @property
+    def prompt(self) -> str:
+        # 将 self 注入主提示词, 首次请求模型时才格式化
+        if self._prompt is None:
+            self._prompt = self.prompts.get("PROMPT", "").format(self=self)
+        return self._prompt
+
+    @property
+    def rng(self) -> random.Random:
+        """随机数生成器, 并发执行的步骤中为该步骤独立的生成器 (见 step_rng)."""
+        return step_rng.get() or self._rng
+
+    @property
+    def model_id(self) -> str:
+        """请求时使用的模型标识 "供应商/模型", 也用于按模型汇总统计."""
+        model = self.config.get("model", "gpt-3.5-turbo")
+        provider = self.config.get("providerId")
+        # 如果指定了 provider，且 model 中没有包含 /，则尝试组合
+        # 通常 model="provider/model_name" 是 litellm 推荐的方式
+        # 如果 model 已经包含了 provider（例如 "openai/gpt-4"），则不重复添加
+        if provider and provider != "default" and "/" not in model:
+            return f"{provider}/{model}"
+        return model
 
     def set_logger(self, logger):
         self.game_logger = logger
 
-    def call_ai_response(self, prompt_text: str, valid_choices: List[str]):
-        # 增加思考延迟，提升游戏节奏感
-        import time
-        import random
+    def _history_context(self, title: str, reminder: str) -> Dict[str, Any]:
+        """
+        决策记录中的游戏记录部分: 标题, 提醒和历史条数上限. 历史本身不写入记录,
+        导出时按 seq 从事件文件重建; 尚未落入事件文件的公告 (见 pending_events) 原样保存.
+        """
+        context = {"title": title, "reminder": reminder, "limit": self.history_limit}
+        pending = self.game_logger.pending_history()
+        if pending:
+            context["pending"] = pending
+        return context
+
+    async def _complete(
+        self,
+        completion_kwargs: Dict[str, Any],
+        kind: str,
+        decision: Dict[str, Any],
+        choices: Optional[List[str]] = None,
+    ):
+        """
+        发出模型请求: 先按供应商等待限流配额, 再计时调用模型,
+        并把提示词增量 (decision) 与回复作为一条决策记录写入游戏日志
+        (kind 为 "choice" 或 "speech", 见 GameLogger.log_decision).
+        """
+        model = completion_kwargs["model"]
+        provider = model.split("/", 1)[0] if "/" in model else "default"
+        limiter = request_limiter.get()
+        if limiter is not None:
+            await limiter(provider)
+
+        started = time.perf_counter()
+        try:
+            response = await acompletion(**completion_kwargs)
+        finally:
+            latency = time.perf_counter() - started
+            self.decisions += 1
+            self.decision_time += latency
+        tokens = 0
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            tokens = getattr(usage, "total_tokens", 0) or 0
+            self.tokens += tokens
+        if self.game_logger:
+            self.game_logger.log_decision(
+                {
+                    "player": self.name,
+                    "role": self.role,
+                    "model": model,
+                    "kind": kind,
+                    **decision,
+                    "choices": choices,
+                    "response": response.choices[0].message.content,
+                    "latency": round(latency, 4),
+                    "tokens": tokens,
+                }
+            )
+        return response
+
+    async def _ask_human(self, input_type, prompt_text, valid_choices, allow_skip):
+        # input_handler 可以是协程函数, 也可以是同步函数 (可返回 awaitable, 例如 Future).
+        # 只有声明了 timeout 参数的处理函数才会收到截止时间, 旧的五参数处理函数仍可使用
+        accepts_timeout, is_async = _handler_info(self.input_handler)
+        args = (self.name, input_type, prompt_text, valid_choices, allow_skip)
+        kwargs = {"timeout": self.input_timeout} if accepts_timeout else {}
+        if is_async:
+            response = self.input_handler(*args, **kwargs)
+            if not inspect.isawaitable(response):
+                return response
+        else:
+            # 同步处理函数 (例如读取控制台) 在线程中运行, 不阻塞事件循环, 同样受超时限制;
+            # 超时后线程中的调用仍会继续, 其结果被丢弃
+            response = self._run_sync_handler(args, kwargs)
+        try:
+            return await asyncio.wait_for(response, self.input_timeout)
+        except asyncio.TimeoutError:
+            return await self._on_input_timeout(
+                input_type, prompt_text, valid_choices, allow_skip
+            )
+
+    async def _run_sync_handler(self, args, kwargs):
+        def call():
+            response = self.input_handler(*args, **kwargs)
+            if isinstance(response, concurrent.futures.Future):
+                return response.result()
+            return response
+
+        response = await asyncio.to_thread(call)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    async def _on_input_timeout(
+        self, input_type, prompt_text, valid_choices, allow_skip
+    ):
+        """输入超时后按 on_timeout 执行默认动作: 跳过, 随机选择或交给 AI 代替."""
+        if self.game_logger:
+            self.game_logger.system_logger.info(
+                f"{self.name} 输入超时 ({self.input_timeout}s), 按 {self.on_timeout} 处理"
+            )
+        if self.on_timeout == "ai":
+            if input_type == "speech":
+                return await self.call_ai_speak(prompt_text)
+            return await self.call_ai_response(prompt_text, valid_choices)
+        if input_type == "speech":
+            return ""
+        if self.on_timeout == "skip":
+            if allow_skip:
+                return "skip"
+            if self.game_logger:
+                self.game_logger.system_logger.info(
+                    f"{self.name} 的本次选择不允许跳过, 改为随机选择"
+                )
+        return self.rng.choice(valid_choices)
 
-        delay = random.uniform(1.5, 3.0)
-        if self.event_emitter:
-            self.event_emitter(f"{self.name} 正在思考...", None)
-        time.sleep(delay)
+    async def call_ai_response(self, prompt_text: str, valid_choices: List[str]):
+        # 增加思考延迟，提升游戏节奏感
+        delay = self.rng.uniform(*self.think_delay["choose"])
+        if self.notify:
+            self.notify(f"{self.name} 正在思考...", None)
+        await asyncio.sleep(delay)
 
         # 检查环境或配置中的调试标志，这里我们假设通过配置或 os 传递
         if os.getenv("DEBUG_GAME", "0") == "1":
-            return random.choice(valid_choices)
+            return self.rng.choice(valid_choices)
 
-        history = []
+        seq, context, log_content = 0, None, ""
         if self.game_logger:
-            log_file = self.game_logger.get_events(self.name)
-            if os.path.exists(log_file):
-                with open(log_file, "r", encoding="utf-8") as f:
-                    log_content = f.read()
-
-                    # 使用注入的模板构建上下文提醒
-                    context_reminder = self.prompts.get("REMINDER", "").format(
-                        self.name, self.role
-                    )
-
-                    # 狼人夜间讨论提醒的逻辑
-                    # 注意：此逻辑略微特定于游戏，但依赖于提示词的存在
-                    if (
-                        "请发言或输入 '0' 准备投票" in prompt_text
-                        and self.role == "Werewolf"
-                    ):
-                        context_reminder += self.prompts.get("REMINDER_WEREWOLF", "")
-                        if self.is_first_night:
-                            self.is_first_night = False
-                            context_reminder += self.prompts.get(
-                                "REMINDER_FIRST_NIGHT", ""
-                            )
-
-                    history.append(
-                        {
-                            "role": "system",
-                            "content": f"本场全部游戏记录：\n{log_content}\n\n{context_reminder}",
-                        }
-                    )
-
-        history.append({"role": "system", "content": self.prompt})
+            seq = len(self.game_logger.events)
+            log_content = self.game_logger.get_history(self.name, self.history_limit)
+
+            # 使用注入的模板构建上下文提醒
+            context_reminder = self.prompts.get("REMINDER", "").format(
+                self.name, self.role
+            )
+
+            # 狼人夜间讨论提醒的逻辑
+            # 注意：此逻辑略微特定于游戏，但依赖于提示词的存在
+            if "请发言或输入 '0' 准备投票" in prompt_text and self.role == "Werewolf":
+                context_reminder += self.prompts.get("REMINDER_WEREWOLF", "")
+                if self.is_first_night:
+                    self.is_first_night = False
+                    context_reminder += self.prompts.get("REMINDER_FIRST_NIGHT", "")
+
+            context = self._history_context("本场全部游戏记录：", context_reminder)
+
         prompt = f"{prompt_text}\n请从以下选项中选择: {', '.join(valid_choices)}"
-        history.append({"role": "user", "content": prompt})
+        history = decision_messages(context, log_content, self.prompt, prompt)
+        decision = {"seq": seq, "context": context, "system": self.prompt, "prompt": prompt}
 
         try:
-            model = self.config.get("model", "gpt-3.5-turbo")
-            provider = self.config.get("providerId")
             api_base = self.config.get("apiBase")
 
             # 构建 completion 参数
             completion_kwargs = {
-                "model": model,
+                "model": self.model_id,
                 "messages": history,
                 "stream": False,
             }
 
-            # 如果指定了 provider，且 model 中没有包含 /，则尝试组合
-            # 或者直接作为参数传递（取决于 litellm 版本，通常 model="provider/model_name" 是推荐方式）
-            if provider and provider != "default":
-                # 对于某些 provider，可能需要显式传递 custom_llm_provider 或者修改 model 字符串
-                # 如果 model 已经包含了 provider（例如 "openai/gpt-4"），则不重复添加
-                if "/" not in model:
-                    completion_kwargs["model"] = f"{provider}/{model}"
-
             if api_base:
                 completion_kwargs["api_base"] = api_base
 
-            response = completion(**completion_kwargs)
+            response = await self._complete(
+                completion_kwargs, "choice", decision, valid_choices
+            )
 
             ai_choice = response.choices[0].message.content
             for choice in valid_choices:
@@ -117,9 +334,7 @@ class Player:
                         )
                     return choice
             # 兜底
-            import random
-
-            return random.choice(valid_choices)
+            return self.rng.choice(valid_choices)
         except Exception as e:
             if self.game_logger:
                 self.game_logger.system_logger.error(
@@ -127,17 +342,15 @@ class Player:
                 )
             else:
                 print(f"AI Error: {e}")
-            import random
-
-            return random.choice(valid_choices)
+            return self.rng.choice(valid_choices)
 
-    def call_human_response(
+    async def call_human_response(
         self, prompt_text: str, valid_choices: List[str], allow_skip: bool = False
     ):
         if self.input_handler:
             while True:
-                response = self.input_handler(
-                    self.name, "choice", prompt_text, valid_choices, allow_skip
+                response = await self._ask_human(
+                    "choice", prompt_text, valid_choices, allow_skip
                 )
 
                 # 验证输入
@@ -167,7 +380,7 @@ class Player:
             for i, choice in enumerate(display_choices):
                 print(f"[yellow]{i + 1}[/yellow]. [cyan]{choice}[/cyan]")
 
-            player_input = input("> ").strip()
+            player_input = (await asyncio.to_thread(input, "> ")).strip()
             player_input_lower = player_input.lower()
 
             if player_input.isdigit():
@@ -184,68 +397,58 @@ class Player:
 
             print("[bold red]无效的选择, 请重新输入. [/bold red]")
 
-    def call_ai_speak(self, prompt_text: str):
-        import time
-        import random
-
-        delay = random.uniform(2.0, 4.0)
-        if self.event_emitter:
-            self.event_emitter(f"{self.name} 正在组织语言...", None)
-        else:
-            print(f"{self.name} 正在思考...")
-        time.sleep(delay)
+    async def call_ai_speak(self, prompt_text: str, max_chars: Optional[int] = None):
+        delay = self.rng.uniform(*self.think_delay["speak"])
+        if self.notify:
+            self.notify(f"{self.name} 正在组织语言...", None)
+        await asyncio.sleep(delay)
 
         if os.getenv("DEBUG_GAME", "0") == "1":
             return "ai_response (debug)"
 
-        history = []
+        seq, context, log_content = 0, None, ""
         if self.game_logger:
-            log_file = self.game_logger.get_events(self.name)
-            if os.path.exists(log_file):
-                with open(log_file, "r", encoding="utf-8") as f:
-                    log_content = f.read()
-                    if log_content.strip():
-                        context_reminder = self.prompts.get("REMINDER", "").format(
-                            self.name, self.role
-                        )
-                        if (
-                            "请发言或输入 '0' 准备投票" in prompt_text
-                            and self.role == "Werewolf"
-                        ):
-                            context_reminder += self.prompts.get(
-                                "REMINDER_WEREWOLF", ""
-                            )
-
-                        context_prompt = (
-                            f"游戏记录:\n{log_content}\n\n{context_reminder}"
-                        )
-                        history.append({"role": "system", "content": context_prompt})
-
-        history.append({"role": "system", "content": self.prompt})
-        history.append({"role": "user", "content": prompt_text})
+            seq = len(self.game_logger.events)
+            log_content = self.game_logger.get_history(self.name, self.history_limit)
+            if log_content.strip():
+                context_reminder = self.prompts.get("REMINDER", "").format(
+                    self.name, self.role
+                )
+                if (
+                    "请发言或输入 '0' 准备投票" in prompt_text
+                    and self.role == "Werewolf"
+                ):
+                    context_reminder += self.prompts.get("REMINDER_WEREWOLF", "")
+
+                context = self._history_context("游戏记录:", context_reminder)
+
+        history = decision_messages(context, log_content, self.prompt, prompt_text)
+        decision = {
+            "seq": seq,
+            "context": context,
+            "system": self.prompt,
+            "prompt": prompt_text,
+        }
 
         try:
-            model = self.config.get("model", "gpt-3.5-turbo")
-            provider = self.config.get("providerId")
             api_base = self.config.get("apiBase")
 
             # 构建 completion 参数
             completion_kwargs = {
-                "model": model,
+                "model": self.model_id,
                 "messages": history,
                 "stream": False,
             }
 
-            if provider and provider != "default":
-                if "/" not in model:
-                    completion_kwargs["model"] = f"{provider}/{model}"
-
             if api_base:
                 completion_kwargs["api_base"] = api_base
 
-            response = completion(**completion_kwargs)
+            response = await self._complete(completion_kwargs, "speech", decision)
 
             speech = response.choices[0].message.content
+            # 模型不一定遵守长度提示, 超出上限的部分直接截断
+            if max_chars is not None and speech and len(speech) > max_chars:
+                speech = speech[:max_chars] + "…"
             if self.game_logger:
                 self.game_logger.system_logger.info(
                     f"Player {self.name} (AI) generated speech"
@@ -256,21 +459,27 @@ class Player:
                 self.game_logger.system_logger.error(f"AI Error in call_ai_speak: {e}")
             return f"(生成演讲时出错: {e})"
 
-    def call_human_speak(self, prompt_text: str):
+    async def call_human_speak(self, prompt_text: str):
         if self.input_handler:
-            return self.input_handler(self.name, "speech", prompt_text, [], False)
-        return input(prompt_text)
+            return await self._ask_human("speech", prompt_text, [], False)
+        return await asyncio.to_thread(input, prompt_text)
 
-    def speak(self, prompt_text: str):
+    async def speak(self, prompt_text: str, max_chars: Optional[int] = None):
+        if self.random_agent:
+            return ""
         if self.is_human:
-            return self.call_human_speak(prompt_text)
+            return await self.call_human_speak(prompt_text)
         else:
-            return self.call_ai_speak(prompt_text)
+            return await self.call_ai_speak(prompt_text, max_chars)
 
-    def choose(
+    async def choose(
         self, prompt_text: str, valid_choices: List[str], allow_skip: bool = False
     ) -> str:
+        if self.random_agent:
+            return self.rng.choice(valid_choices)
         if self.is_human:
-            return self.call_human_response(prompt_text, valid_choices, allow_skip)
+            return await self.call_human_response(
+                prompt_text, valid_choices, allow_skip
+            )
         else:
-            return self.call_ai_response(prompt_text, valid_choices)
+            return await self.call_ai_response(prompt_text, valid_choices)
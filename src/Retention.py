@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Archive import (
+    EVENT_CHUNK,
+    INDEX_FILE,
+    PACKED_SUFFIX,
+    chunk_starts,
+    load_index,
+)
+from src.Logger import (
+    ENDED_FILE,
+    EVENTS_FILE,
+    GAMES_LOG_DIR,
+    RESULT_FILE,
+    SNAPSHOT_FILE,
+    get_logger,
+    open_games,
+)
+from src.Search import get_search_index
+
+retention_log = get_logger("Retention")
+
+# 归档任务和保留策略的设置, 可由 config.yaml 的 retention 段覆盖 (见 start_retention)
+RETENTION_DEFAULTS: Dict[str, Any] = {
+    # 是否启动后台归档任务
+    "enabled": True,
+    # 后台任务的运行间隔 (秒)
+    "interval": 600,
+    # 对局结束 (写入结果文件) 多久之后压缩 (秒)
+    "pack_after": 60,
+    # 保留天数, 超过的对局被删除; 0 表示不按时间清理
+    "max_age_days": 0,
+    # 日志目录总大小上限 (字节), 超出时从最早的已结束对局开始删除; 0 表示不限
+    "max_bytes": 0,
+    # 没有结束标记的对局 (进程中途退出, 或更早版本留下的目录) 超过多少天没有写入
+    # 视为已放弃, 与已结束的对局一样压缩和清理; 0 表示一直保留
+    "abandon_after_days": 30,
+}
+# 压缩时跳过的文件: 跨进程日志的锁文件和写入中途的临时文件
+SKIP_SUFFIXES = (".lock", ".tmp")
+
+
+def _snapshot_finished(path: Path) -> bool:
+    """存档是否标记为已结束 (结束后进程在写入结束标记之前退出时只有存档记录了结束)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return bool(json.load(f).get("finished"))
+    except (OSError, ValueError):
+        return False
+
+
+def scan_games(log_root: Path = GAMES_LOG_DIR) -> List[Dict[str, Any]]:
+    """
+    扫描日志目录, 按对局编号 (即开局时间) 顺序返回每局的路径, 是否已压缩, 是否已结束,
+    文件数, 字节数, 最后写入时间和结束时间. 归档文件只需一次 stat, 目录只扫描一层;
+    有结果文件或结束标记的目录为已结束, 都没有时才读取存档中的结束标志.
+    """
+    games: List[Dict[str, Any]] = []
+    if not log_root.exists():
+        return games
+
+    with os.scandir(log_root) as entries:
+        for entry in entries:
+            if entry.name.endswith(SKIP_SUFFIXES):
+                continue
+            if entry.is_file():
+                if not entry.name.endswith(PACKED_SUFFIX):
+                    continue
+                stat = entry.stat()
+                games.append(
+                    {
+                        "id": entry.name[: -len(PACKED_SUFFIX)],
+                        "path": Path(entry.path),
+                        "packed": True,
+                        "finished": True,
+                        "files": 1,
+                        "bytes": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "finished_at": stat.st_mtime,
+                    }
+                )
+            elif entry.is_dir():
+                files, size, mtime, finished_at = 0, 0, 0.0, None
+                snapshot = None
+                with os.scandir(entry.path) as inner:
+                    for item in inner:
+                        if not item.is_file():
+                            continue
+                        stat = item.stat()
+                        files += 1
+                        size += stat.st_size
+                        mtime = max(mtime, stat.st_mtime)
+                        if item.name in (RESULT_FILE, ENDED_FILE):
+                            finished_at = max(finished_at or 0.0, stat.st_mtime)
+                        elif item.name == SNAPSHOT_FILE:
+                            snapshot = (Path(item.path), stat.st_mtime)
+                if finished_at is None and snapshot and _snapshot_finished(snapshot[0]):
+                    finished_at = snapshot[1]
+                games.append(
+                    {
+                        "id": entry.name,
+                        "path": Path(entry.path),
+                        "packed": False,
+                        "finished": finished_at is not None,
+                        "files": files,
+                        "bytes": size,
+                        "mtime": mtime or entry.stat().st_mtime,
+                        "finished_at": finished_at,
+                    }
+                )
+    games.sort(key=lambda g: (g["id"], g["packed"]))
+    return games
+
+
+def has_ended(directory: Path) -> bool:
+    """对局目录是否已结束: 有结果文件或结束标记, 或存档标记为已结束."""
+    directory = Path(directory)
+    return (
+        (directory / RESULT_FILE).exists()
+        or (directory / ENDED_FILE).exists()
+        or _snapshot_finished(directory / SNAPSHOT_FILE)
+    )
+
+
+def _settled(game: Dict[str, Any], now: float, abandon_after_days: float) -> bool:
+    """对局已结束, 或超过 abandon_after_days 天没有写入 (视为已放弃)."""
+    if game["finished"]:
+        return True
+    return abandon_after_days > 0 and now - game["mtime"] > abandon_after_days * 86400
+
+
+def pack_game(directory: Path, abandoned: bool = False) -> Path:
+    """
+    把已结束对局的日志目录压缩为同级的单个归档文件 (<对局编号>.zip), 再删除原目录.
+    事件文件按索引检查点分块压缩, 归档后仍可按位置分页读取 (见 src/Archive.py).
+    abandoned=True 时不检查对局是否结束 (调用方已判定其被放弃).
+    """
+    directory = Path(directory)
+    if not (directory / EVENTS_FILE).exists():
+        raise ValueError(f"没有事件文件, 无法压缩: {directory.name}")
+    if not abandoned and not has_ended(directory):
+        raise ValueError(f"对局尚未结束: {directory.name}")
+    index = load_index(directory)
+    target = directory.with_name(directory.name + PACKED_SUFFIX)
+    # 临时文件名带上进程号, 多个进程同时压缩同一局时不会写坏对方的文件
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+
+    with os.scandir(directory) as entries:
+        files = [entry for entry in entries if entry.is_file()]
+    # 归档文件沿用最后写入时间, 按天数保留时不会因为压缩而重新计时
+    mtime = max(entry.stat().st_mtime for entry in files)
+    names = sorted(
+        entry.name
+        for entry in files
+        if entry.name not in (EVENTS_FILE, INDEX_FILE)
+        and not entry.name.endswith(SKIP_SUFFIXES)
+    )
+
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name in names:
+            zf.write(directory / name, name)
+        zf.writestr(INDEX_FILE, json.dumps(index, ensure_ascii=False))
+
+        starts = chunk_starts(index)
+        with open(directory / EVENTS_FILE, "rb") as f:
+            for i, start in enumerate(starts):
+                end = starts[i + 1] if i + 1 < len(starts) else index["size"]
+                zf.writestr(EVENT_CHUNK.format(start), f.read(end - start))
+    os.utime(tmp_path, (mtime, mtime))
+    os.replace(tmp_path, target)
+    # 删除失败 (例如文件仍被占用) 时保留残余目录, 读取时优先使用归档文件, 下次运行再删除
+    shutil.rmtree(directory, ignore_errors=True)
+    return target
+
+
+def pack_finished(
+    pack_after: float = 60,
+    log_root: Path = GAMES_LOG_DIR,
+    abandon_after_days: float = RETENTION_DEFAULTS["abandon_after_days"],
+) -> int:
+    """
+    压缩所有结束已超过 pack_after 秒的对局目录, 以及已放弃的对局 (见 _settled),
+    返回压缩的对局数. 没有事件文件的目录 (更早版本的日志) 无法压缩, 只按保留策略清理.
+    """
+    now = time.time()
+    games = scan_games(log_root)
+    packed_ids = {g["id"] for g in games if g["packed"]}
+    active = open_games()
+    count = 0
+    for game in games:
+        if game["packed"] or game["id"] in active:
+            continue
+        if not _settled(game, now, abandon_after_days):
+            continue
+        if game["id"] in packed_ids:
+            # 上次压缩后没能删除的残余目录
+            shutil.rmtree(game["path"], ignore_errors=True)
+            continue
+        if now - (game["finished_at"] or game["mtime"]) < pack_after:
+            continue
+        if not (game["path"] / EVENTS_FILE).exists():
+            continue
+        try:
+            pack_game(game["path"], abandoned=not game["finished"])
+            count += 1
+        except Exception as e:
+            retention_log.error(f"压缩对局 {game['id']} 失败: {e}")
+    return count
+
+
+def apply_retention(
+    max_age_days: float = 0,
+    max_bytes: int = 0,
+    log_root: Path = GAMES_LOG_DIR,
+    abandon_after_days: float = RETENTION_DEFAULTS["abandon_after_days"],
+) -> Dict[str, int]:
+    """
+    按保留天数和总大小上限, 从最早的对局开始删除日志 (目录或归档文件),
+    并从搜索索引中移除; 统计库中的结果记录保留. 返回删除的对局数和释放的字节数.
+    只删除已结束 (包括被停止) 或已放弃的对局: 未结束的对局可能在等待人类玩家输入,
+    或者可以从存档恢复, 在 abandon_after_days 天内保留; 本进程中日志尚未关闭的对局不会被删除.
+    """
+    now = time.time()
+    games = scan_games(log_root)
+    total = sum(g["bytes"] for g in games)
+    active = open_games()
+    removed: List[str] = []
+    freed = 0
+    for game in games:
+        if game["id"] in active or not _settled(game, now, abandon_after_days):
+            continue
+        expired = max_age_days > 0 and now - game["mtime"] > max_age_days * 86400
+        oversize = max_bytes > 0 and total > max_bytes
+        if not (expired or oversize):
+            continue
+        try:
+            if game["packed"]:
+                game["path"].unlink()
+            else:
+                shutil.rmtree(game["path"])
+        except OSError as e:
+            retention_log.error(f"删除对局 {game['id']} 失败: {e}")
+            continue
+        total -= game["bytes"]
+        freed += game["bytes"]
+        removed.append(game["id"])
+
+    if removed:
+        search = get_search_index()
+        for game_id in set(removed):
+            search.remove_game(game_id)
+    return {"games": len(set(removed)), "bytes": freed}
+
+
+def disk_usage(log_root: Path = GAMES_LOG_DIR) -> Dict[str, Any]:
+    """日志目录的占用: 对局数 (已压缩 / 未压缩 / 已结束), 文件数, 字节数及最早和最新的对局."""
+    games = scan_games(log_root)
+    packed = [g for g in games if g["packed"]]
+    unpacked = [g for g in games if not g["packed"]]
+    return {
+        "games": len({g["id"] for g in games}),
+        "packed": len(packed),
+        "unpacked": len(unpacked),
+        "finished": len({g["id"] for g in games if g["finished"]}),
+        "files": sum(g["files"] for g in games),
+        "bytes": sum(g["bytes"] for g in games),
+        "packed_bytes": sum(g["bytes"] for g in packed),
+        "unpacked_bytes": sum(g["bytes"] for g in unpacked),
+        "oldest": games[0]["id"] if games else None,
+        "newest": games[-1]["id"] if games else None,
+    }
+
+
+class RetentionJob:
+    """后台归档任务: 定期压缩已结束的对局, 按保留策略清理, 并记录磁盘占用."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = {**RETENTION_DEFAULTS, **(settings or {})}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        settings = self.settings
+        abandon_after_days = settings["abandon_after_days"]
+        packed = pack_finished(settings["pack_after"], GAMES_LOG_DIR, abandon_after_days)
+        removed = apply_retention(
+            settings["max_age_days"],
+            settings["max_bytes"],
+            GAMES_LOG_DIR,
+            abandon_after_days,
+        )
+        usage = disk_usage()
+        self.last_report = {"packed": packed, "removed": removed, "usage": usage}
+        retention_log.info(
+            f"日志归档: 压缩 {packed} 局, 清理 {removed['games']} 局"
+            f" ({removed['bytes'] / 2**20:.1f} MiB); 当前 {usage['games']} 局,"
+            f" {usage['files']} 个文件, {usage['bytes'] / 2**20:.1f} MiB"
+        )
+        return self.last_report
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                retention_log.error(f"日志归档任务出错: {e}")
+            self._stop.wait(self.settings["interval"])
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="Retention", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_job: Optional[RetentionJob] = None
+
+
+def start_retention(config: Optional[Dict[str, Any]] = None) -> Optional[RetentionJob]:
+    """
+    按应用配置 (config.yaml 的 retention 段) 启动后台归档任务, 未启用时返回 None.
+    同一日志目录只应由一个进程运行该任务 (调试模式下只在 Flask 重载器的服务进程中启动).
+    """
+    global _job
+    settings = {**RETENTION_DEFAULTS, **((config or {}).get("retention") or {})}
+    if not settings["enabled"]:
+        return None
+    if _job is None:
+        _job = RetentionJob(settings)
+        _job.start()
+    return _job
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="压缩已结束的对局日志并按保留策略清理")
+    parser.add_argument("--pack", action="store_true", help="压缩所有已结束的对局")
+    parser.add_argument("--max-age-days", type=float, default=0, help="删除超过天数的对局")
+    parser.add_argument("--max-bytes", type=int, default=0, help="日志目录总大小上限")
+    parser.add_argument(
+        "--abandon-after-days",
+        type=float,
+        default=RETENTION_DEFAULTS["abandon_after_days"],
+        help="未结束的对局超过天数没有写入时视为已放弃, 0 表示一直保留",
+    )
+    args = parser.parse_args()
+
+    if args.pack:
+        print(f"压缩 {pack_finished(0, GAMES_LOG_DIR, args.abandon_after_days)} 局")
+    if args.max_age_days or args.max_bytes:
+        removed = apply_retention(
+            args.max_age_days, args.max_bytes, GAMES_LOG_DIR, args.abandon_after_days
+        )
+        print(f"删除 {removed['games']} 局, 释放 {removed['bytes']} 字节")
+    usage = disk_usage()
+    print(
+        f"{usage['games']} 局 (已压缩 {usage['packed']}, 未压缩 {usage['unpacked']}),"
+        f" {usage['files']} 个文件, {usage['bytes'] / 2**20:.1f} MiB"
+    )
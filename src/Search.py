@@ -0,0 +1,295 @@
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Archive import game_id_of, iter_events, load_result
+from src.Logger import GAMES_LOG_DIR
+
+SEARCH_DB = BASE / ".games" / "search.db"
+# trigram 分词器只能匹配至少 3 个字符的词, 更短的词改为子串过滤
+MIN_MATCH_CHARS = 3
+# 每次批量写入的事件条数
+INSERT_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    game_name TEXT,
+    finished_at TEXT,
+    winner TEXT,
+    player_count INTEGER,
+    event_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_search_games_time ON games (finished_at);
+
+CREATE TABLE IF NOT EXISTS seats (
+    game_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT,
+    model TEXT,
+    PRIMARY KEY (game_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_search_seats_model ON seats (model);
+CREATE INDEX IF NOT EXISTS idx_search_seats_role ON seats (role);
+CREATE INDEX IF NOT EXISTS idx_search_seats_name ON seats (name);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS events USING fts5 (
+    message,
+    speaker,
+    role,
+    model,
+    game_id UNINDEXED,
+    seq UNINDEXED,
+    day UNINDEXED,
+    phase UNINDEXED,
+    tokenize = 'trigram'
+);
+"""
+
+
+class SearchIndex:
+    """
+    已归档对局事件的全文索引 (SQLite FTS5, trigram 分词, 中文无需额外分词).
+    每条事件索引消息内容, 发言者 (事件记录中的执行者, 见 GameLogger.log_event)
+    及其角色和模型; 天数, 阶段等用于过滤和展示.
+    对局结束后增量加入索引, 已索引的对局不会重复处理.
+    """
+
+    def __init__(self, path: Path = SEARCH_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def index_game(self, directory: Path) -> bool:
+        """
+        把一局已结束的对局 (日志目录或归档文件) 加入索引.
+        已索引或没有结果文件时返回 False.
+        """
+        directory = Path(directory)
+        game_id = game_id_of(directory)
+        with closing(self._connect()) as conn:
+            if conn.execute("SELECT 1 FROM games WHERE id = ?", (game_id,)).fetchone():
+                return False
+        result = load_result(directory)
+        if result is None:
+            return False
+
+        seats = {seat["name"]: seat for seat in result["seats"]}
+
+        count = 0
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO seats VALUES (?, ?, ?, ?)",
+                [
+                    (game_id, s["name"], s["role"], s["model"])
+                    for s in result["seats"]
+                ],
+            )
+            batch = []
+            for event in iter_events(directory, page_size=INSERT_BATCH):
+                speaker = event["actor"]
+                seat = seats.get(speaker, {})
+                batch.append(
+                    (
+                        event["message"],
+                        speaker,
+                        seat.get("role"),
+                        seat.get("model"),
+                        game_id,
+                        event["seq"],
+                        event["day"],
+                        event["phase"],
+                    )
+                )
+                if len(batch) >= INSERT_BATCH:
+                    conn.executemany(
+                        "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch
+                    )
+                    count += len(batch)
+                    batch.clear()
+            if batch:
+                conn.executemany(
+                    "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch
+                )
+                count += len(batch)
+            # 对局记录最后写入, 与事件在同一事务中, 中途失败时整局可以重新索引
+            conn.execute(
+                "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    game_id,
+                    result["game_name"],
+                    result["finished_at"],
+                    result["winner"],
+                    result["player_count"],
+                    count,
+                ),
+            )
+        return True
+
+    def sync(self, log_root: Path = GAMES_LOG_DIR) -> int:
+        """索引日志目录中所有尚未索引的已结束对局, 返回新增的对局数."""
+        if not log_root.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            indexed = {row["id"] for row in conn.execute("SELECT id FROM games")}
+        added = 0
+        for path in sorted(log_root.iterdir()):
+            game_id = game_id_of(path)
+            if game_id not in indexed and self.index_game(path):
+                indexed.add(game_id)
+                added += 1
+        return added
+
+    def remove_game(self, game_id: str):
+        """从索引中删除一局 (例如对局日志按保留策略被清理后)."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM events WHERE game_id = ?", (game_id,))
+            conn.execute("DELETE FROM seats WHERE game_id = ?", (game_id,))
+            conn.execute("DELETE FROM games WHERE id = ?", (game_id,))
+
+    @staticmethod
+    def _match_expression(query: str) -> Tuple[Optional[str], List[str]]:
+        """
+        把查询拆成空格分隔的词 (同时出现才算匹配): 长度足够的词组成 FTS5 表达式,
+        每个词作为短语加引号, 避免被解析为运算符; 过短的词返回给调用方做子串过滤.
+        """
+        phrases, short = [], []
+        for term in query.split():
+            if len(term) >= MIN_MATCH_CHARS:
+                phrases.append('"' + term.replace('"', '""') + '"')
+            else:
+                short.append(term)
+        return (" ".join(phrases) or None), short
+
+    def search(
+        self,
+        query: str = "",
+        speaker: Optional[str] = None,
+        role: Optional[str] = None,
+        model: Optional[str] = None,
+        day: Optional[int] = None,
+        phase: Optional[str] = None,
+        game_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        搜索事件, 结果按相关度 (bm25) 排序并分页; 只有过滤条件时按对局倒序.
+        返回 {"total", "items"}, 每项包含对局编号, 事件序号, 天数, 阶段, 发言者和高亮片段.
+        """
+        expression, short = self._match_expression(query)
+        clauses, params = [], []
+        if expression:
+            clauses.append("events MATCH ?")
+            params.append(expression)
+        for term in short:
+            # trigram 表上少于 3 个字符的 LIKE 模式可能查不到结果, 改用 instr 逐行比较
+            clauses.append("instr(e.message, ?) > 0")
+            params.append(term)
+        for column, value in (
+            ("e.speaker", speaker),
+            ("e.role", role),
+            ("e.model", model),
+            ("e.day", day),
+            ("e.phase", phase),
+            ("g.game_name", game_name),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        if expression:
+            text = "snippet(events, 0, '<mark>', '</mark>', '…', 24)"
+            order = "ORDER BY rank"
+        else:
+            text = "e.message"
+            order = "ORDER BY e.game_id DESC, e.seq"
+        source = "events e JOIN games g ON g.id = e.game_id"
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM {source} {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT e.game_id AS game_id, e.seq AS seq, e.day AS day,"
+                f" e.phase AS phase, e.speaker AS speaker, e.role AS role,"
+                f" e.model AS model, {text} AS text, g.game_name AS game_name,"
+                f" g.finished_at AS finished_at"
+                f" FROM {source} {where} {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return {"total": total, "items": [dict(row) for row in rows]}
+
+    def games(
+        self,
+        player: Optional[str] = None,
+        role: Optional[str] = None,
+        model: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        """有满足条件的座位 (玩家名, 角色, 模型) 的对局, 按结束时间倒序分页."""
+        clauses, params = [], []
+        for column, value in (("name", player), ("role", role), ("model", model)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = ""
+        if clauses:
+            where = (
+                "WHERE id IN (SELECT game_id FROM seats"
+                f" WHERE {' AND '.join(clauses)})"
+            )
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM games {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM games {where} ORDER BY finished_at DESC"
+                " LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return {"total": total, "items": [dict(row) for row in rows]}
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """返回默认的搜索索引 (.games/search.db), 首次调用时建表."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+    return _index
+
+
+if __name__ == "__main__":
+    # 用法: python -m src.Search <查询词>   (先索引所有尚未索引的对局)
+    index = get_search_index()
+    added = index.sync()
+    if added:
+        print(f"新索引 {added} 局")
+    if len(sys.argv) > 1:
+        found = index.search(" ".join(sys.argv[1:]))
+        print(f"共 {found['total']} 条")
+        for item in found["items"]:
+            print(
+                f"  {item['game_id']} 第 {item['day']} 天 {item['phase']}"
+                f" #{item['seq']}: {item['text']}"
+            )
@@ -7,8 +7,12 @@ from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 
 from .Logger import get_logger
+from .services.archive import archive_bp, init_archive_socket_events
 from .services.games import games_bp, init_game_socket_events
 from .services.players import players_bp
+from .services.search import search_bp
+from .services.stats import stats_bp
+from .services.tournaments import tournaments_bp
 
 BASE = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE / "res" / "app" / "static"
@@ -34,9 +38,14 @@ socketio = SocketIO(
 
 # 初始化游戏Socket事件
 init_game_socket_events(socketio)
+init_archive_socket_events(socketio)
 
 app.register_blueprint(games_bp)
 app.register_blueprint(players_bp)
+app.register_blueprint(archive_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(stats_bp)
+app.register_blueprint(tournaments_bp)
 
 
 # 全局变量，用于跟踪已连接的客户端
@@ -0,0 +1,161 @@
+import asyncio
+import copy
+import importlib.util
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Game import load_snapshot
+
+GAMES_DIR = BASE / ".games"
+# 每个分支的默认天数上限, 超过后记为未分胜负
+DEFAULT_MAX_DAYS = 30
+
+# 工作进程内的全局状态, 由 _init_worker 在进程启动时设置一次
+_worker_game_class = None
+_worker_state: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class SimulationResult:
+    """一组模拟分支的汇总结果."""
+
+    runs: int
+    wins: Dict[str, int] = field(default_factory=dict)
+    # 达到天数上限仍未分出胜负的分支数
+    unfinished: int = 0
+    average_days: float = 0.0
+    elapsed: float = 0.0
+
+    def win_rate(self, side: str) -> float:
+        return self.wins.get(side, 0) / self.runs if self.runs else 0.0
+
+    def std_error(self, side: str) -> float:
+        """胜率的标准误差, 用于判断分支数是否足够."""
+        if not self.runs:
+            return 0.0
+        p = self.win_rate(side)
+        return math.sqrt(p * (1 - p) / self.runs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "wins": dict(self.wins),
+            "win_rates": {side: self.win_rate(side) for side in self.wins},
+            "std_errors": {side: self.std_error(side) for side in self.wins},
+            "unfinished": self.unfinished,
+            "average_days": self.average_days,
+            "elapsed": self.elapsed,
+        }
+
+
+def load_game_class(game_name: str):
+    """从 .games 目录加载游戏模块中的 Game 类."""
+    game_path = GAMES_DIR / game_name / "game.py"
+    module_name = f"games.{game_name}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, game_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return getattr(module, "Game")
+
+
+def _init_worker(game_name: str, state: Dict[str, Any]):
+    # 游戏类和局面状态只在每个工作进程启动时传递一次, 之后的任务只传种子
+    global _worker_game_class, _worker_state
+    _worker_game_class = load_game_class(game_name)
+    _worker_state = state
+
+
+def run_continuation(
+    game_class, state: Dict[str, Any], seed: int, max_days: int
+) -> Tuple[Optional[str], int]:
+    """从局面状态分叉出一局并运行到结束, 返回 (胜利方, 结束时的天数)."""
+    # 深拷贝后分叉, 各分支之间以及与原局面之间互不影响
+    game = game_class.fork(copy.deepcopy(state), seed=seed)
+    game.max_days = max_days
+    game.run_blocking()
+    winner = game.winner if game.check_game_over() else None
+    return winner, game.day_number
+
+
+def _run_batch(seeds: List[int], max_days: int) -> List[Tuple[Optional[str], int]]:
+    return [
+        run_continuation(_worker_game_class, _worker_state, seed, max_days)
+        for seed in seeds
+    ]
+
+
+def simulate(
+    game_name: str,
+    state: Dict[str, Any],
+    runs: int = 200,
+    workers: Optional[int] = None,
+    base_seed: int = 0,
+    max_days: int = DEFAULT_MAX_DAYS,
+) -> SimulationResult:
+    """
+    从同一局面 (get_state 或存档的内容) 出发, 在进程池中并行运行 runs 个分支,
+    第 i 个分支的种子为 base_seed + i, 结果可复现. 返回各方胜率等统计.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(base_seed, base_seed + runs))
+    # 按工作进程数分批, 减少任务调度和结果传输的开销
+    batch_size = max(1, math.ceil(runs / (workers * 4)))
+    batches = [seeds[i : i + batch_size] for i in range(0, runs, batch_size)]
+
+    started = time.perf_counter()
+    outcomes: List[Tuple[Optional[str], int]] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(game_name, state)
+    ) as executor:
+        for batch in executor.map(_run_batch, batches, [max_days] * len(batches)):
+            outcomes.extend(batch)
+
+    result = SimulationResult(runs=runs, elapsed=time.perf_counter() - started)
+    for winner, days in outcomes:
+        if winner is None:
+            result.unfinished += 1
+        else:
+            result.wins[winner] = result.wins.get(winner, 0) + 1
+    if outcomes:
+        result.average_days = sum(days for _, days in outcomes) / len(outcomes)
+    return result
+
+
+def simulate_snapshot(snapshot_path: Path, **kwargs) -> SimulationResult:
+    """从存档文件出发进行模拟."""
+    state = load_snapshot(snapshot_path)
+    return simulate(state["game_name"], state, **kwargs)
+
+
+if __name__ == "__main__":
+    # 用法: python -m src.Simulation <snapshot.json> [分支数] [进程数]
+    if len(sys.argv) < 2:
+        print("用法: python -m src.Simulation <snapshot.json> [分支数] [进程数]")
+        sys.exit(1)
+
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    path = Path(sys.argv[1])
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    result = simulate_snapshot(path, runs=runs, workers=workers)
+    print(f"分支数: {result.runs}, 用时 {result.elapsed:.2f}s")
+    for side in sorted(result.wins):
+        print(
+            f"  {side}: 胜率 {result.win_rate(side):.1%}"
+            f" (±{1.96 * result.std_error(side):.1%})"
+        )
+    print(f"  未分胜负: {result.unfinished}, 平均结束天数 {result.average_days:.1f}")
@@ -0,0 +1,468 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+from src.Logger import get_logger
+from src.Player import request_limiter
+from src.Simulation import load_game_class
+
+GAMES_DIR = BASE / ".games"
+TOURNAMENTS_DIR = GAMES_DIR / "tournaments"
+PLAYERS_FILE = BASE / ".users" / "players.json"
+
+DEFAULT_RATING = 1500.0
+ELO_K = 32.0
+# 每局的天数上限, 超过后记为未分胜负, 防止单局拖住整个锦标赛
+DEFAULT_MAX_DAYS = 30
+
+tournament_log = get_logger("Tournament")
+
+
+def load_entrants(game_name: str = "werewolf", source: str = "config") -> List[Dict]:
+    """
+    加载参赛的 AI 玩家配置. source 为 "users" 时读取 .users/players.json
+    (online 与 local 列表), 为 "config" 时读取游戏目录的 config.json. 人类玩家不参赛.
+    """
+    if source == "users":
+        with open(PLAYERS_FILE, "r", encoding="utf-8") as f:
+            store = json.load(f)
+        configs = store.get("online", []) + store.get("local", [])
+    elif source == "config":
+        with open(GAMES_DIR / game_name / "config.json", "r", encoding="utf-8") as f:
+            configs = json.load(f).get("players", [])
+    else:
+        raise ValueError(f"未知的参赛玩家来源: {source}")
+
+    entrants = []
+    seen = set()
+    for config in configs:
+        if config.get("human") or config.get("type") == "human":
+            continue
+        key = config.get("uuid") or config["name"]
+        if key in seen:
+            continue
+        seen.add(key)
+        # API Key 只存在于环境变量中, 不写入锦标赛状态
+        entrants.append({k: v for k, v in config.items() if k != "apiKey"})
+    return entrants
+
+
+class ProviderRateLimiter:
+    """
+    按供应商限制模型请求频率 (每分钟请求数), 请求被均匀地排到各自的时间槽上.
+    只在单个事件循环中使用, 读取和更新时间槽之间没有 await, 无需加锁.
+    """
+
+    def __init__(
+        self, limits: Optional[Mapping[str, float]] = None, default: Optional[float] = None
+    ):
+        self.limits = dict(limits or {})
+        self.default = default
+        self._next_slot: Dict[str, float] = {}
+        self.waited = 0.0
+
+    async def __call__(self, provider: str):
+        per_minute = self.limits.get(provider, self.default)
+        if not per_minute:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(provider, now))
+        self._next_slot[provider] = slot + 60.0 / per_minute
+        if slot > now:
+            self.waited += slot - now
+            await asyncio.sleep(slot - now)
+
+
+def compute_leaderboard(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按对局完成顺序重放结果, 计算各模型的 Elo 等级分, 胜率, 分角色胜率和平均决策延迟.
+    Elo 以阵营为单位: 阵营分为成员分的平均值, 与其他阵营的平均分比较得出期望得分,
+    同一模型在一局中占多个座位时, 取这些座位变动的平均值. 未分胜负的对局不影响等级分.
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    def entry(model):
+        if model not in stats:
+            stats[model] = {
+                "model": model,
+                "rating": DEFAULT_RATING,
+                "games": 0,
+                "wins": 0,
+                "roles": {},
+                "decisions": 0,
+                "decision_time": 0.0,
+            }
+        return stats[model]
+
+    for result in results:
+        winner = result.get("winner")
+        teams: Dict[str, List[str]] = {}
+        for seat in result["seats"]:
+            model = seat["model"]
+            item = entry(model)
+            item["decisions"] += seat["decisions"]
+            item["decision_time"] += seat["decision_time"]
+            if winner is None:
+                continue
+            won = seat["team"] == winner
+            item["games"] += 1
+            item["wins"] += won
+            role = item["roles"].setdefault(seat["role"], {"games": 0, "wins": 0})
+            role["games"] += 1
+            role["wins"] += won
+            teams.setdefault(seat["team"], []).append(model)
+
+        if len(teams) < 2:
+            continue
+        averages = {
+            team: sum(stats[m]["rating"] for m in models) / len(models)
+            for team, models in teams.items()
+        }
+        deltas: Dict[str, List[float]] = {}
+        for team, models in teams.items():
+            others = [r for t, r in averages.items() if t != team]
+            opponent = sum(others) / len(others)
+            expected = 1 / (1 + 10 ** ((opponent - averages[team]) / 400))
+            delta = ELO_K * ((team == winner) - expected)
+            for model in models:
+                deltas.setdefault(model, []).append(delta)
+        for model, values in deltas.items():
+            stats[model]["rating"] += sum(values) / len(values)
+
+    board = []
+    for item in stats.values():
+        games = item["games"]
+        board.append(
+            {
+                "model": item["model"],
+                "rating": round(item["rating"], 1),
+                "games": games,
+                "wins": item["wins"],
+                "win_rate": item["wins"] / games if games else 0.0,
+                "roles": {
+                    role: {**r, "win_rate": r["wins"] / r["games"]}
+                    for role, r in sorted(item["roles"].items())
+                },
+                "decisions": item["decisions"],
+                "avg_latency": (
+                    item["decision_time"] / item["decisions"] if item["decisions"] else None
+                ),
+            }
+        )
+    board.sort(key=lambda x: x["rating"], reverse=True)
+    return board
+
+
+class Tournament:
+    """
+    模型锦标赛: 在参赛玩家中轮换组成阵容, 以有界并发运行多局无界面游戏,
+    每局结束后把结果写入 .games/tournaments/<id>.json. 中断后可从该文件恢复,
+    已完成的对局不会重跑; 运行中随时可以读取排行榜.
+    """
+
+    def __init__(
+        self,
+        tournament_id: str,
+        game_name: str,
+        entrants: List[Dict[str, Any]],
+        games: int,
+        roster_size: Optional[int] = None,
+        concurrency: int = 2,
+        rate_limits: Optional[Mapping[str, float]] = None,
+        seed: int = 0,
+        max_days: int = DEFAULT_MAX_DAYS,
+        persist: bool = True,
+    ):
+        if not entrants:
+            raise ValueError("没有可参赛的 AI 玩家")
+        if roster_size is not None and roster_size < 1:
+            raise ValueError(f"阵容人数无效: {roster_size}")
+        self.id = tournament_id
+        self.game_name = game_name
+        self.entrants = entrants
+        self.games = games
+        self.roster_size = roster_size or len(entrants)
+        self.concurrency = max(1, concurrency)
+        # 供应商 -> 每分钟请求数, 键 "*" 为未列出供应商的默认限制
+        self.rate_limits = dict(rate_limits or {})
+        self.seed = seed
+        self.max_days = max_days
+        # 是否像普通对局一样写日志和存档 (并记入统计库与搜索索引)
+        self.persist = persist
+
+        self.status = "pending"
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.results: List[Dict[str, Any]] = []
+        self.failed = 0
+        self.path = TOURNAMENTS_DIR / f"{tournament_id}.json"
+
+        self._running_games: Dict[int, Any] = {}
+        self._stopping = False
+
+    @classmethod
+    def create(
+        cls,
+        game_name: str = "werewolf",
+        source: str = "config",
+        entrants: Optional[List[Dict[str, Any]]] = None,
+        **options,
+    ) -> "Tournament":
+        """新建锦标赛, 未指定参赛者时按 source 加载 (见 load_entrants)."""
+        tournament_id = (
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        )
+        if entrants is None:
+            entrants = load_entrants(game_name, source)
+        options.setdefault("games", 20)
+        tournament = cls(tournament_id, game_name, entrants, **options)
+        tournament.save()
+        return tournament
+
+    @classmethod
+    def load(cls, tournament_id: str) -> "Tournament":
+        """从状态文件恢复锦标赛."""
+        path = TOURNAMENTS_DIR / f"{tournament_id}.json"
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        tournament = cls(
+            state["id"],
+            state["game_name"],
+            state["entrants"],
+            state["games"],
+            roster_size=state["roster_size"],
+            concurrency=state["concurrency"],
+            rate_limits=state["rate_limits"],
+            seed=state["seed"],
+            max_days=state["max_days"],
+            persist=state["persist"],
+        )
+        tournament.status = state["status"]
+        tournament.created = state["created"]
+        tournament.results = state["results"]
+        tournament.failed = state.get("failed", 0)
+        return tournament
+
+    # -------------------------------------------------------------------------
+    # 阵容
+    # -------------------------------------------------------------------------
+
+    def roster(self, index: int) -> List[Dict[str, Any]]:
+        """
+        第 index 局的玩家数据. 每局从上一局之后的参赛者开始依次入座,
+        参赛者不足时循环入座, 重复入座的玩家名加序号区分.
+        """
+        count = len(self.entrants)
+        start = index * self.roster_size % count
+        players = []
+        names: Dict[str, int] = {}
+        for seat in range(self.roster_size):
+            entrant = self.entrants[(start + seat) % count]
+            base_name = entrant["name"]
+            names[base_name] = names.get(base_name, 0) + 1
+            name = base_name if names[base_name] == 1 else f"{base_name}{names[base_name]}"
+            players.append(
+                {
+                    **entrant,
+                    "player_name": name,
+                    "player_uuid": f"{entrant.get('uuid', base_name)}#{seat}",
+                    "name": name,
+                    "human": False,
+                    "model": entrant.get("model", "gpt-3.5-turbo"),
+                }
+            )
+        return players
+
+    # -------------------------------------------------------------------------
+    # 运行
+    # -------------------------------------------------------------------------
+
+    def _record(self, index: int, seed: int, game, duration: float):
+        # 与分析库使用同一份结果记录 (Game.result_record), 另附局序号和本局实际用时
+        record = game.result_record()
+        for seat in record["seats"]:
+            seat["decision_time"] = round(seat["decision_time"], 4)
+        record.update(index=index, seed=seed, duration=round(duration, 3))
+        self.results.append(record)
+
+    async def _play(self, index: int):
+        seed = self.seed + index
+        game_class = load_game_class(self.game_name)
+        game = game_class(
+            self.roster(index), seed=seed, console=False, persist=self.persist
+        )
+        game.max_days = self.max_days
+        self._running_games[index] = game
+        started = time.perf_counter()
+        try:
+            await game.run_game()
+        except Exception as e:
+            # 出错的对局不记录结果, 恢复时会重新运行
+            self.failed += 1
+            tournament_log.error(f"锦标赛 {self.id} 第 {index} 局出错: {e}")
+            return
+        finally:
+            self._running_games.pop(index, None)
+
+        if self._stopping and not game.check_game_over():
+            return
+        self._record(index, seed, game, time.perf_counter() - started)
+        self.save()
+        tournament_log.info(
+            f"锦标赛 {self.id} 第 {index} 局结束, 获胜方: {game.winner}"
+            f" ({len(self.results)}/{self.games})"
+        )
+
+    async def run(self):
+        """运行所有未完成的对局 (协程). 已完成的对局从状态文件中读取, 不会重跑."""
+        done = {r["index"] for r in self.results}
+        pending = [i for i in range(self.games) if i not in done]
+        self._stopping = False
+        self.status = "running"
+        self.save()
+
+        # 限流器通过上下文变量传给玩家, 下面创建的对局任务都会继承
+        limits = {k: v for k, v in self.rate_limits.items() if k != "*"}
+        request_limiter.set(ProviderRateLimiter(limits, self.rate_limits.get("*")))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def play(index):
+            async with semaphore:
+                if not self._stopping:
+                    await self._play(index)
+
+        tournament_log.info(
+            f"锦标赛 {self.id} 开始: 剩余 {len(pending)} 局, 并发 {self.concurrency}"
+        )
+        try:
+            await asyncio.gather(*(play(i) for i in pending))
+        finally:
+            if self._stopping:
+                self.status = "stopped"
+            elif len(self.results) >= self.games:
+                self.status = "finished"
+            else:
+                self.status = "incomplete"
+            self.save()
+            tournament_log.info(f"锦标赛 {self.id} 结束运行, 状态: {self.status}")
+
+    def stop(self):
+        """停止锦标赛: 不再开始新对局, 运行中的对局在阶段边界停止且不计入结果."""
+        self._stopping = True
+        for game in list(self._running_games.values()):
+            game.stop_game()
+
+    def run_blocking(self):
+        asyncio.run(self.run())
+
+    # -------------------------------------------------------------------------
+    # 状态
+    # -------------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Any]:
+        results = list(self.results)
+        return {
+            "id": self.id,
+            "game_name": self.game_name,
+            "status": self.status,
+            "created": self.created,
+            "games": self.games,
+            "completed": len(results),
+            "running": sorted(self._running_games),
+            "failed": self.failed,
+            "unfinished": sum(1 for r in results if r["winner"] is None),
+            "leaderboard": compute_leaderboard(results),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "game_name": self.game_name,
+            "status": self.status,
+            "created": self.created,
+            "entrants": self.entrants,
+            "games": self.games,
+            "roster_size": self.roster_size,
+            "concurrency": self.concurrency,
+            "rate_limits": self.rate_limits,
+            "seed": self.seed,
+            "max_days": self.max_days,
+            "persist": self.persist,
+            "failed": self.failed,
+            "results": list(self.results),
+        }
+
+    def save(self):
+        """先写临时文件再原子替换, 中途退出不会损坏状态文件."""
+        os.makedirs(TOURNAMENTS_DIR, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def list_tournaments() -> List[Dict[str, Any]]:
+    """列出所有锦标赛状态文件的概要 (不含排行榜)."""
+    items = []
+    if not TOURNAMENTS_DIR.exists():
+        return items
+    for path in sorted(TOURNAMENTS_DIR.glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        items.append(
+            {
+                "id": state["id"],
+                "game_name": state["game_name"],
+                "status": state["status"],
+                "created": state["created"],
+                "games": state["games"],
+                "completed": len(state["results"]),
+            }
+        )
+    return items
+
+
+if __name__ == "__main__":
+    # 用法: python -m src.Tournament <游戏名> [局数] [并发数]
+    #       python -m src.Tournament --resume <锦标赛ID>
+    if len(sys.argv) < 2:
+        print("用法: python -m src.Tournament <游戏名> [局数] [并发数]")
+        print("      python -m src.Tournament --resume <锦标赛ID>")
+        sys.exit(1)
+
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    if sys.argv[1] == "--resume":
+        tournament = Tournament.load(sys.argv[2])
+    else:
+        tournament = Tournament.create(
+            sys.argv[1],
+            games=int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+            concurrency=int(sys.argv[3]) if len(sys.argv) > 3 else 2,
+        )
+    print(f"锦标赛 {tournament.id}, 状态文件: {tournament.path}")
+    try:
+        tournament.run_blocking()
+    except KeyboardInterrupt:
+        print("已中断, 可使用 --resume 继续")
+
+    summary = tournament.summary()
+    print(f"完成 {summary['completed']}/{summary['games']} 局")
+    for item in summary["leaderboard"]:
+        latency = item["avg_latency"]
+        print(
+            f"  {item['model']:40s} Elo {item['rating']:7.1f}"
+            f" 胜率 {item['win_rate']:.1%} ({item['games']} 局)"
+            f" 平均延迟 {'-' if latency is None else f'{latency:.2f}s'}"
+        )
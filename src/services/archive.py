@@ -0,0 +1,243 @@
+import math
+import threading
+
+from flask import Blueprint, jsonify, request
+from flask_socketio import SocketIO
+
+from ..Archive import (
+    DEFAULT_PAGE_SIZE,
+    event_gap,
+    game_dir,
+    iter_events,
+    list_games,
+    load_index,
+    load_result,
+    phase_range,
+    read_events,
+)
+from ..Logger import get_logger
+from ..Retention import disk_usage
+from .games import SYSTEM_SENDER
+
+archive_bp = Blueprint("archive", __name__)
+archive_log = get_logger("ArchiveService")
+
+# 回放时两条事件之间的最长等待 (秒, 按原速计), 避免长时间的人类思考造成空等
+MAX_REPLAY_GAP = 10.0
+
+# socket sid -> 停止回放的信号
+_replays = {}
+_socketio_instance = None
+
+
+def _not_found(gid):
+    return (
+        jsonify({"ok": False, "error": f"未找到对局: {gid}"}),
+        404,
+    )
+
+
+@archive_bp.route("/api/archive", methods=["GET"])
+def api_archive_get():
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 20, type=int), 0), 200)
+    return (
+        jsonify({"ok": True, "data": list_games(offset, limit)}),
+        200,
+    )
+
+
+@archive_bp.route("/api/archive/usage", methods=["GET"])
+def api_archive_usage_get():
+    """对局日志的磁盘占用: 对局数 (已压缩 / 未压缩), 文件数和字节数."""
+    return (
+        jsonify({"ok": True, "data": disk_usage()}),
+        200,
+    )
+
+
+@archive_bp.route("/api/archive/<gid>", methods=["GET"])
+def api_archive_game_get(gid):
+    """对局概要: 事件总数, 按天和阶段的起始位置, 以及结果 (已结束时)."""
+    try:
+        directory = game_dir(gid)
+    except FileNotFoundError:
+        return _not_found(gid)
+
+    index = load_index(directory)
+    result = load_result(directory)
+    data = {
+        "id": gid,
+        "events": index["events"],
+        "phases": [
+            {"day": p["day"], "phase": p["phase"], "seq": p["seq"]}
+            for p in index["phases"]
+        ],
+        "result": result,
+    }
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
+
+
+@archive_bp.route("/api/archive/<gid>/events", methods=["GET"])
+def api_archive_events_get(gid):
+    """
+    分页读取事件. 参数 start/limit 按事件序号读取;
+    指定 day (及 phase) 时从该天 (阶段) 的起点开始, start 为相对偏移, 且不超过其终点.
+    """
+    try:
+        directory = game_dir(gid)
+    except FileNotFoundError:
+        return _not_found(gid)
+
+    index = load_index(directory)
+    start = max(request.args.get("start", 0, type=int), 0)
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    day = request.args.get("day", type=int)
+    end = index["events"]
+    if day is not None:
+        span = phase_range(index, day, request.args.get("phase"))
+        if span is None:
+            return (
+                jsonify({"ok": False, "error": "未找到该天或阶段"}),
+                404,
+            )
+        start += span["start"]
+        end = span["end"]
+        limit = min(limit, max(0, end - start))
+
+    events = read_events(directory, start, limit, index)
+    return (
+        jsonify(
+            {
+                "ok": True,
+                "data": {
+                    "total": index["events"],
+                    "start": start,
+                    "end": end,
+                    "events": events,
+                },
+            }
+        ),
+        200,
+    )
+
+
+def _replay(sid, directory, start, speed, stop):
+    """
+    按原始节奏的 1/speed 推送事件到客户端的聊天界面; speed 为 0 时立即推送全部事件.
+    分页读取, 内存中只保留一页事件.
+    """
+    socketio = _socketio_instance
+    socketio.emit("game:info", {"status": "回放中", "statusType": "info"}, to=sid)
+    previous = None
+    for event in iter_events(directory, start):
+        if stop.is_set():
+            break
+        if speed > 0 and previous is not None:
+            gap = min(event_gap(previous, event["time"]), MAX_REPLAY_GAP)
+            if gap:
+                socketio.sleep(gap / speed)
+        previous = event["time"]
+        socketio.emit(
+            "game:message",
+            {
+                "sender": SYSTEM_SENDER,
+                "content": event["message"],
+                "time": event["time"].split(" ")[-1],
+                "visible_to": event["visible_to"],
+                "seq": event["seq"],
+                "day": event["day"],
+                "phase": event["phase"],
+            },
+            to=sid,
+        )
+    if _replays.get(sid) is stop:
+        del _replays[sid]
+    socketio.emit("game:info", {"status": "回放结束", "statusType": "info"}, to=sid)
+
+
+def _replay_error(content):
+    archive_log.error(content)
+    _socketio_instance.emit(
+        "game:notification",
+        {"type": "error", "content": content},
+        to=request.sid,
+    )
+
+
+def _parse_replay_options(data):
+    """解析回放参数, 返回 (start, day, speed); 参数无效时抛出 ValueError (消息可直接展示)."""
+    try:
+        start = int(data.get("start") or 0)
+    except (TypeError, ValueError):
+        raise ValueError(f"回放起点无效: {data.get('start')}")
+    day = data.get("day")
+    if day is not None:
+        try:
+            day = int(day)
+        except (TypeError, ValueError):
+            raise ValueError(f"回放天数无效: {day}")
+    speed = data.get("speed")
+    try:
+        speed = 1.0 if speed is None else float(speed)
+    except (TypeError, ValueError):
+        raise ValueError(f"回放速度无效: {speed}")
+    if not math.isfinite(speed) or speed < 0:
+        raise ValueError(f"回放速度无效: {speed}")
+    return max(0, start), day, speed
+
+
+def socket_on_archive_replay(data):
+    if not isinstance(data, dict):
+        _replay_error("回放请求格式错误")
+        return
+    gid = str(data.get("gameId") or "")
+    try:
+        directory = game_dir(gid)
+    except FileNotFoundError:
+        _replay_error(f"未找到对局: {gid}")
+        return
+    try:
+        start, day, speed = _parse_replay_options(data)
+    except ValueError as e:
+        _replay_error(str(e))
+        return
+
+    if day is not None:
+        span = phase_range(load_index(directory), day, data.get("phase"))
+        if span is not None:
+            start += span["start"]
+
+    # 同一客户端同时只进行一个回放
+    previous = _replays.pop(request.sid, None)
+    if previous is not None:
+        previous.set()
+    stop = threading.Event()
+    _replays[request.sid] = stop
+    archive_log.info(f"开始回放对局 {gid}: 起点 {start}, 速度 {speed}")
+    _socketio_instance.start_background_task(
+        _replay, request.sid, directory, start, speed, stop
+    )
+
+
+def socket_on_archive_stop():
+    stop = _replays.pop(request.sid, None)
+    if stop is not None:
+        stop.set()
+
+
+def init_archive_socket_events(socketio: SocketIO):
+    global _socketio_instance
+    _socketio_instance = socketio
+
+    @archive_log.decorate.info("对局回放请求")
+    @socketio.on("archive:replay")
+    def on_archive_replay(data):
+        socket_on_archive_replay(data)
+
+    @socketio.on("archive:stopReplay")
+    def on_archive_stop(data=None):
+        socket_on_archive_stop()
@@ -1,29 +1,42 @@
+import asyncio
 import datetime
 import importlib.util
 import os
 from pathlib import Path
-import queue
 import sys
 import threading
+import time
+import uuid
 
 from flask import Blueprint, jsonify, request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
+from ..Game import find_latest_snapshot
 from ..Logger import get_logger
 from ..services.players import get_player_by_uuid
 
 BASE = Path(__file__).resolve().parent.parent.parent
 GAMES_DIR = BASE / ".games"
+# .games 下存放引擎数据而不是游戏的目录: 对局日志和锦标赛状态
+DATA_DIRS = ("logs", "tournaments")
 
 os.makedirs(GAMES_DIR, exist_ok=True)
 
 games_bp = Blueprint("games", __name__)
 games_log = get_logger("GameService")
 
-# session_id -> { "game": game_instance, "thread": thread, "queues": {player_name: Queue} }
+# 系统消息的发送者信息, 所有消息共享同一个对象, 不在每次发送时重建
+SYSTEM_SENDER = {"name": "System", "id": "system", "type": "system"}
+
+# session_id -> { "game": game_instance, "task": Future, "inputs": {player_name: pending_input} }
+# pending_input: {"id": 请求ID, "future": asyncio.Future, "deadline": 截止时间戳或 None}
 game_sessions = {}
 _socketio_instance = None
 
+# 所有游戏会话共享一个事件循环, 运行在单独的后台线程中
+_game_loop = None
+_game_loop_lock = threading.Lock()
+
 
 class GameStopError(Exception):
     """当游戏被手动停止时抛出此异常"""
@@ -43,16 +56,58 @@ def load_game_class(game_name):
     spec.loader.exec_module(module)
 
     # Return the 'Game' class or attribute from the module
-    if hasattr(module, "Game"):
-        return getattr(module, "Game")
-    raise AttributeError(f"在模块 {game_name} 中未找到 'Game' 类")
+    if not hasattr(module, "Game"):
+        raise AttributeError(f"在模块 {game_name} 中未找到 'Game' 类")
+
+    # 提供声明式定义的游戏在会话开始前完成校验和编译
+    game_class = getattr(module, "Game")
+    if getattr(game_class, "game_dir", None):
+        game_class.load_definition()
+    return game_class
+
+
+def validate_games():
+    """启动时加载并校验所有游戏, 将定义错误尽早写入日志."""
+    for p in sorted(GAMES_DIR.iterdir()):
+        if not (p / "game.py").exists():
+            continue
+        try:
+            load_game_class(p.name)
+            games_log.info(f"游戏 {p.name} 校验通过")
+        except Exception as e:
+            games_log.error(f"游戏 {p.name} 校验失败: {e}")
+
+
+def get_game_loop() -> asyncio.AbstractEventLoop:
+    """返回共享的游戏事件循环, 首次调用时在后台线程中启动."""
+    global _game_loop
+    with _game_loop_lock:
+        if _game_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="GameLoop", daemon=True
+            ).start()
+            _game_loop = loop
+            games_log.info("游戏事件循环已启动")
+    return _game_loop
+
+
+def _resolve_input(future, response):
+    # 只能在事件循环线程中调用
+    if not future.done():
+        future.set_result(response)
+
+
+def _fail_input(future, exc):
+    if not future.done():
+        future.set_exception(exc)
 
 
 def make_event_emitter(session_id, socketio):
     def emitter(message, visible_to=None):
         # 构造消息对象
         msg = {
-            "sender": {"name": "System", "id": "system", "type": "system"},
+            "sender": SYSTEM_SENDER,
             "content": message,
             "time": datetime.datetime.now().strftime("%H:%M:%S"),
             "visible_to": visible_to,
@@ -65,15 +120,23 @@ def make_event_emitter(session_id, socketio):
     return emitter
 
 
-def make_input_handler(session_id, input_queues, socketio):
-    def handler(player_name, input_type, prompt, choices, allow_skip):
+def make_input_handler(session_id, pending_inputs, socketio):
+    async def handler(
+        player_name, input_type, prompt, choices, allow_skip, timeout=None
+    ):
+        # 每个输入请求带唯一 ID 和截止时间, 客户端回复时附带 requestId
+        request_id = uuid.uuid4().hex
+        deadline = time.time() + timeout if timeout else None
+
         # 发送输入请求
         req = {
+            "request_id": request_id,
             "player_name": player_name,
             "type": input_type,
             "prompt": prompt,
             "choices": choices,
             "allow_skip": allow_skip,
+            "deadline": deadline,
         }
         # 发送给所有客户端，客户端根据 player_name 判断是否显示输入框
         socketio.emit("game:input_request", req, room=session_id)
@@ -82,24 +145,36 @@ def make_input_handler(session_id, input_queues, socketio):
         socketio.emit(
             "game:message",
             {
-                "sender": {"name": "System", "id": "system", "type": "system"},
+                "sender": SYSTEM_SENDER,
                 "content": f"等待 {player_name} 输入: {prompt}",
                 "time": datetime.datetime.now().strftime("%H:%M:%S"),
             },
             room=session_id,
         )
 
-        # 确保队列存在
-        if player_name not in input_queues:
-            input_queues[player_name] = queue.Queue()
-
-        # 阻塞等待输入
-        games_log.info(f"等待 {player_name} 输入, 会话ID: {session_id}")
-        response = input_queues[player_name].get()
+        # 以 Future 表示待完成的输入, 等待期间不占用线程
+        # 超时由调用方 (Player) 取消本协程, 并按配置的默认动作处理
+        future = asyncio.get_running_loop().create_future()
+        pending = {"id": request_id, "future": future, "deadline": deadline}
+        pending_inputs[player_name] = pending
 
-        if response == "__GAME_STOP__":
+        games_log.info(f"等待 {player_name} 输入 ({request_id}), 会话ID: {session_id}")
+        try:
+            response = await future
+        except GameStopError:
             games_log.info(f"游戏手动停止, 会话ID: {session_id}")
-            raise GameStopError()
+            raise
+        except asyncio.CancelledError:
+            games_log.info(f"{player_name} 的输入请求 {request_id} 已超时或被取消")
+            socketio.emit(
+                "game:input_timeout",
+                {"request_id": request_id, "player_name": player_name},
+                room=session_id,
+            )
+            raise
+        finally:
+            if pending_inputs.get(player_name) is pending:
+                del pending_inputs[player_name]
 
         games_log.info(f"从 {player_name} 接收输入: {response}")
         return response
@@ -113,7 +188,7 @@ def api_games_get():
     items = []
     if GAMES_DIR.exists():
         for p in GAMES_DIR.iterdir():
-            if p.is_dir() and not p.name.startswith("logs"):
+            if p.is_dir() and p.name not in DATA_DIRS:
                 items.append(p.name)
 
     games_log.info(f"游戏列表: {items}")
@@ -127,6 +202,8 @@ def socket_on_init_game(data):
     game_id = data.get("gameId")
     player_ids = data.get("playerIds")
     session_id = data.get("sessionId")
+    resume = data.get("resume", False)
+    seed = data.get("seed")
     sid = request.sid
 
     games_log.info(
@@ -183,7 +260,7 @@ def socket_on_init_game(data):
         GameClass = load_game_class(game_id)
 
         # 准备会话数据
-        input_queues = {}
+        pending_inputs = {}
 
         # 实例化游戏
         # 注意：这里我们需要传入 emitter 和 input_handler
@@ -200,17 +277,30 @@ def socket_on_init_game(data):
             return
 
         emitter = make_event_emitter(session_id, _socketio_instance)
-        input_handler = make_input_handler(session_id, input_queues, _socketio_instance)
+        input_handler = make_input_handler(
+            session_id, pending_inputs, _socketio_instance
+        )
+
+        # 如果请求恢复, 查找该游戏最近一个未结束的存档
+        resume_from = find_latest_snapshot(game_id) if resume else None
+        if resume_from:
+            games_log.info(f"从存档 {resume_from} 恢复游戏 {game_id}")
+        elif resume:
+            games_log.warning(f"未找到游戏 {game_id} 的可用存档, 将开始新游戏")
 
         game = GameClass(
-            players_config, event_emitter=emitter, input_handler=input_handler
+            players_config,
+            event_emitter=emitter,
+            input_handler=input_handler,
+            resume_from=resume_from,
+            seed=seed,
         )
 
-        # 启动游戏线程
-        def run_game_wrapper():
+        # 在共享事件循环中启动游戏协程
+        async def run_game_wrapper():
             try:
                 games_log.info(f"开始游戏循环, 会话ID: {session_id}")
-                game.run_game()
+                await game.run_game()
                 games_log.info(f"游戏循环结束, 会话ID: {session_id}")
                 _socketio_instance.emit(
                     "game:info",
@@ -235,17 +325,13 @@ def socket_on_init_game(data):
                     room=session_id,
                 )
 
-        if _socketio_instance:
-            thread = _socketio_instance.start_background_task(run_game_wrapper)
-        else:
-            thread = threading.Thread(target=run_game_wrapper, daemon=True)
-            thread.start()
+        task = asyncio.run_coroutine_threadsafe(run_game_wrapper(), get_game_loop())
 
         # 存储会话
         game_sessions[session_id] = {
             "game": game,
-            "thread": thread,
-            "queues": input_queues,
+            "task": task,
+            "inputs": pending_inputs,
         }
         games_log.info(f"游戏会话 {session_id} 已初始化")
         games_log.debug(f"当前线程池: {threading.enumerate()}")
@@ -254,7 +340,7 @@ def socket_on_init_game(data):
         # 注意: socket_on_init_game 是在请求上下文中调用的，所以可以使用 flask_socketio.join_room
         join_room(session_id)
         games_log.debug(f"Socket {request.sid} 加入房间 {session_id}")
-        games_log.info(f"游戏会话 {session_id} 线程已启动")
+        games_log.info(f"游戏会话 {session_id} 协程已启动")
 
         # 回复客户端
         emit(
@@ -299,17 +385,24 @@ def socket_on_game_chat(data):
         # 检查是否为游戏输入
         if session_id in game_sessions:
             session = game_sessions[session_id]
-            queues = session["queues"]
 
-            # 如果该玩家有正在等待的队列，将内容放入队列
-            if sender_name in queues:
-                # 只有当队列为空（正在等待）时才放入？
-                # 或者直接放入，游戏那边会取
-                # 为了防止多余的聊天信息干扰，这里可以做得更细致，但目前假设所有聊天都是输入
-                games_log.info(f"路由输入到玩家 {sender_name} 在会话 {session_id}")
-                queues[sender_name].put(content)
+            # 如果该玩家有正在等待的输入, 在事件循环线程中完成对应的 Future
+            # 没有等待中的输入, 未附带或不匹配请求 ID, 或已过截止时间的消息只作为聊天, 不作为输入
+            pending = session["inputs"].get(sender_name)
+            request_id = data.get("requestId")
+            if pending is None:
+                games_log.debug(f"玩家 {sender_name} 没有等待中的输入")
+            elif request_id is None:
+                games_log.debug(f"{sender_name} 的消息未附带请求 ID, 只作为聊天")
+            elif request_id != pending["id"]:
+                games_log.debug(f"丢弃 {sender_name} 对过期请求 {request_id} 的回复")
+            elif pending["deadline"] is not None and time.time() > pending["deadline"]:
+                games_log.debug(f"丢弃 {sender_name} 超过截止时间的回复")
             else:
-                games_log.debug(f"玩家 {sender_name} 没有活跃的输入队列")
+                games_log.info(f"路由输入到玩家 {sender_name} 在会话 {session_id}")
+                get_game_loop().call_soon_threadsafe(
+                    _resolve_input, pending["future"], content
+                )
     else:
         # 降级：广播给所有连接的客户端（不推荐，但作为 fallback）
         games_log.warning("没有 sessionId 在聊天中，广播给所有连接的客户端")
@@ -326,14 +419,14 @@ def socket_on_game_leave(data):
         if "game" in session and hasattr(session["game"], "stop_game"):
             session["game"].stop_game()
 
-        # 解除所有输入队列的阻塞
-        if "queues" in session:
-            for q_name, q in session["queues"].items():
-                games_log.info(f"向会话 {session_id} 的队列 {q_name} 放入停止信号")
-                q.put("__GAME_STOP__")
+        # 唤醒所有等待中的输入, 使游戏协程以 GameStopError 退出
+        for p_name, pending in list(session["inputs"].items()):
+            games_log.info(f"向会话 {session_id} 中 {p_name} 的输入发送停止信号")
+            get_game_loop().call_soon_threadsafe(
+                _fail_input, pending["future"], GameStopError()
+            )
 
-        # 不立即删除，等待线程结束？或者直接删除，线程会因为 _running False 而退出
-        # 这里为了安全，我们还是删除引用
+        # 不等待协程结束, 协程会因为 _running False 而退出
         del game_sessions[session_id]
         games_log.info(f"游戏会话 {session_id} 已标记停止并移除")
         games_log.debug(f"当前线程池: {threading.enumerate()}")
@@ -345,6 +438,7 @@ def socket_on_game_leave(data):
 def init_game_socket_events(socketio: SocketIO):
     global _socketio_instance
     _socketio_instance = socketio
+    validate_games()
 
     @games_log.decorate.info("初始化游戏请求")
     @socketio.on("app:initGame")
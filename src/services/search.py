@@ -0,0 +1,63 @@
+from flask import Blueprint, jsonify, request
+
+from ..Logger import get_logger
+from ..Search import get_search_index
+
+search_bp = Blueprint("search", __name__)
+search_log = get_logger("SearchService")
+
+
+def _page():
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 20, type=int), 0), 100)
+    return offset, limit
+
+
+@search_bp.route("/api/search", methods=["GET"])
+def api_search_get():
+    """全文搜索事件. 参数: q, speaker, role, model, day, phase, game, offset, limit."""
+    offset, limit = _page()
+    data = get_search_index().search(
+        request.args.get("q", ""),
+        speaker=request.args.get("speaker"),
+        role=request.args.get("role"),
+        model=request.args.get("model"),
+        day=request.args.get("day", type=int),
+        phase=request.args.get("phase"),
+        game_name=request.args.get("game"),
+        offset=offset,
+        limit=limit,
+    )
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
+
+
+@search_bp.route("/api/search/games", methods=["GET"])
+def api_search_games_get():
+    """按座位条件查找对局. 参数: player, role, model, offset, limit."""
+    offset, limit = _page()
+    data = get_search_index().games(
+        player=request.args.get("player"),
+        role=request.args.get("role"),
+        model=request.args.get("model"),
+        offset=offset,
+        limit=limit,
+    )
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
+
+
+@search_bp.route("/api/search/sync", methods=["POST"])
+@search_log.decorate.info("唤起搜索索引同步函数")
+def api_search_sync_post():
+    """索引所有尚未索引的已结束对局 (例如升级前的旧对局)."""
+    added = get_search_index().sync()
+    search_log.info(f"搜索索引新增 {added} 局")
+    return (
+        jsonify({"ok": True, "data": {"added": added}}),
+        200,
+    )
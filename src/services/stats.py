@@ -0,0 +1,68 @@
+from flask import Blueprint, jsonify, request
+
+from ..Analytics import get_store
+from ..Logger import get_logger
+
+stats_bp = Blueprint("stats", __name__)
+stats_log = get_logger("StatsService")
+
+
+def _filters():
+    """从查询参数读取通用过滤条件: game, players, since, until. 不合法的人数视为未指定."""
+    return {
+        "game_name": request.args.get("game"),
+        "player_count": request.args.get("players", type=int),
+        "since": request.args.get("since"),
+        "until": request.args.get("until"),
+    }
+
+
+@stats_bp.route("/api/stats/winrates", methods=["GET"])
+def api_stats_winrates_get():
+    return (
+        jsonify({"ok": True, "data": get_store().win_rates(**_filters())}),
+        200,
+    )
+
+
+@stats_bp.route("/api/stats/models", methods=["GET"])
+def api_stats_models_get():
+    data = get_store().model_stats(role=request.args.get("role"), **_filters())
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
+
+
+@stats_bp.route("/api/stats/deaths", methods=["GET"])
+def api_stats_deaths_get():
+    return (
+        jsonify({"ok": True, "data": get_store().death_stats(**_filters())}),
+        200,
+    )
+
+
+@stats_bp.route("/api/stats/games", methods=["GET"])
+def api_stats_games_get():
+    limit = min(max(request.args.get("limit", 20, type=int), 0), 200)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    data = get_store().recent_games(limit, offset, **_filters())
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
+
+
+@stats_bp.route("/api/stats/games/<gid>", methods=["GET"])
+def api_stats_game_get(gid):
+    data = get_store().game(gid)
+    if data is None:
+        stats_log.warning(f"未找到对局记录: {gid}")
+        return (
+            jsonify({"ok": False, "error": f"未找到对局记录: {gid}"}),
+            404,
+        )
+    return (
+        jsonify({"ok": True, "data": data}),
+        200,
+    )
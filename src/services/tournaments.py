@@ -0,0 +1,141 @@
+import asyncio
+
+from flask import Blueprint, jsonify, request
+
+from ..Logger import get_logger
+from ..Tournament import Tournament, list_tournaments
+from .games import get_game_loop
+
+tournaments_bp = Blueprint("tournaments", __name__)
+tournaments_log = get_logger("TournamentService")
+
+# tournament_id -> { "tournament": Tournament, "task": Future }
+# 只保存本进程中启动过的锦标赛, 其他锦标赛从状态文件读取
+tournament_sessions = {}
+
+# 每局阵容人数的范围
+MIN_ROSTER_SIZE = 2
+MAX_ROSTER_SIZE = 64
+
+
+def _start(tournament: Tournament):
+    task = asyncio.run_coroutine_threadsafe(tournament.run(), get_game_loop())
+    tournament_sessions[tournament.id] = {"tournament": tournament, "task": task}
+    tournaments_log.info(f"锦标赛 {tournament.id} 已在共享事件循环中启动")
+
+
+def _roster_size(value):
+    """解析请求中的 rosterSize; 未指定时返回 None (使用全部参赛者), 无效时抛出 ValueError."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"阵容人数无效: {value}")
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"阵容人数无效: {value}")
+    if not MIN_ROSTER_SIZE <= size <= MAX_ROSTER_SIZE:
+        raise ValueError(
+            f"阵容人数应在 {MIN_ROSTER_SIZE} 到 {MAX_ROSTER_SIZE} 之间: {size}"
+        )
+    return size
+
+
+def _is_running(tournament_id) -> bool:
+    session = tournament_sessions.get(tournament_id)
+    return session is not None and not session["task"].done()
+
+
+@tournaments_bp.route("/api/tournaments", methods=["GET"])
+def api_tournaments_get():
+    return (
+        jsonify({"ok": True, "data": list_tournaments()}),
+        200,
+    )
+
+
+@tournaments_bp.route("/api/tournaments", methods=["POST"])
+@tournaments_log.decorate.info("唤起锦标赛创建函数")
+def api_tournaments_post():
+    data = request.get_json(force=True) or {}
+    try:
+        tournament = Tournament.create(
+            data.get("gameId", "werewolf"),
+            source=data.get("source", "config"),
+            games=int(data.get("games", 20)),
+            roster_size=_roster_size(data.get("rosterSize")),
+            concurrency=int(data.get("concurrency", 2)),
+            rate_limits=data.get("rateLimits"),
+            seed=int(data.get("seed", 0)),
+        )
+    except (OSError, ValueError, TypeError) as e:
+        tournaments_log.error(f"锦标赛创建失败: {e}")
+        return (
+            jsonify({"ok": False, "error": f"锦标赛创建失败: {e}"}),
+            400,
+        )
+
+    _start(tournament)
+    return (
+        jsonify({"ok": True, "data": tournament.summary()}),
+        200,
+    )
+
+
+@tournaments_bp.route("/api/tournaments/<tid>", methods=["GET"])
+def api_tournament_get(tid):
+    # 运行中的锦标赛直接读取内存中的结果, 否则读取状态文件
+    session = tournament_sessions.get(tid)
+    if session is not None:
+        tournament = session["tournament"]
+    else:
+        try:
+            tournament = Tournament.load(tid)
+        except FileNotFoundError:
+            return (
+                jsonify({"ok": False, "error": f"未找到锦标赛: {tid}"}),
+                404,
+            )
+    return (
+        jsonify({"ok": True, "data": tournament.summary()}),
+        200,
+    )
+
+
+@tournaments_bp.route("/api/tournaments/<tid>/resume", methods=["POST"])
+@tournaments_log.decorate.info("唤起锦标赛恢复函数")
+def api_tournament_resume_post(tid):
+    if _is_running(tid):
+        return (
+            jsonify({"ok": False, "error": "锦标赛正在运行"}),
+            409,
+        )
+    try:
+        tournament = Tournament.load(tid)
+    except FileNotFoundError:
+        return (
+            jsonify({"ok": False, "error": f"未找到锦标赛: {tid}"}),
+            404,
+        )
+
+    _start(tournament)
+    return (
+        jsonify({"ok": True, "data": tournament.summary()}),
+        200,
+    )
+
+
+@tournaments_bp.route("/api/tournaments/<tid>/stop", methods=["POST"])
+@tournaments_log.decorate.info("唤起锦标赛停止函数")
+def api_tournament_stop_post(tid):
+    if not _is_running(tid):
+        return (
+            jsonify({"ok": False, "error": "锦标赛未在运行"}),
+            409,
+        )
+    tournament = tournament_sessions[tid]["tournament"]
+    get_game_loop().call_soon_threadsafe(tournament.stop)
+    return (
+        jsonify({"ok": True}),
+        200,
+    )
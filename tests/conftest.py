@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.append(str(BASE))
+
+# 不联网拉取模型价格表
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import src.Analytics as Analytics
+import src.Game as Game
+import src.Logger as Logger
+import src.Search as Search
+from src.Simulation import load_game_class
+
+
+@pytest.fixture
+def log_root(tmp_path, monkeypatch):
+    """把对局日志目录, 统计库和搜索索引都指向临时目录."""
+    root = tmp_path / "logs"
+    root.mkdir()
+    monkeypatch.setattr(Logger, "GAMES_LOG_DIR", root)
+    monkeypatch.setattr(Game, "GAMES_LOG_DIR", root)
+    monkeypatch.setattr(Analytics, "_store", Analytics.AnalyticsStore(tmp_path / "a.db"))
+    monkeypatch.setattr(Search, "_index", Search.SearchIndex(tmp_path / "s.db"))
+    return root
+
+
+@pytest.fixture
+def werewolf(log_root, monkeypatch):
+    """狼人杀游戏类. 玩家随机决策, 不等待思考延迟."""
+    real_sleep = asyncio.sleep
+
+    async def no_delay(delay, *args, **kwargs):
+        await real_sleep(0)
+
+    monkeypatch.setenv("DEBUG_GAME", "1")
+    monkeypatch.setattr(asyncio, "sleep", no_delay)
+    return load_game_class("werewolf")
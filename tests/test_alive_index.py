@@ -0,0 +1,71 @@
+import asyncio
+import random
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(12)
+]
+
+
+def scan(game, role=None, team=None):
+    """不经索引, 逐个检查玩家得到的存活名单."""
+    return [
+        name
+        for name, player in game.players.items()
+        if player.is_alive
+        and (role is None or player.role == role)
+        and (team is None or game.role_team(player.role) == team)
+    ]
+
+
+def assert_index_matches(game):
+    assert game.get_alive_players() == scan(game)
+    assert game.count_alive() == len(scan(game))
+    for role in set(p.role for p in game.players.values()):
+        assert game.get_alive_players([role]) == scan(game, role=role)
+        assert game.count_alive(role=role) == len(scan(game, role=role))
+        first = game.get_player_by_role(role)
+        assert (first.name if first else None) == next(iter(scan(game, role=role)), None)
+    for team in ("werewolf", "villager"):
+        assert game.count_alive(team=team) == len(scan(game, team=team))
+
+
+def test_index_follows_deaths_and_revivals(werewolf):
+    game = werewolf(PLAYERS, seed=3)
+    asyncio.run(game.setup_game())
+    assert_index_matches(game)
+
+    names = list(game.players)
+    for name in random.Random(3).sample(names, 8):
+        game.set_alive(name, False)
+        assert_index_matches(game)
+    # 重复设置同一状态不改变计数
+    game.set_alive(names[0], game.players[names[0]].is_alive)
+    assert_index_matches(game)
+    for name in names[:4]:
+        game.set_alive(name, True)
+        assert_index_matches(game)
+
+
+def test_restored_game_rebuilds_index(werewolf):
+    game = werewolf(PLAYERS, seed=5)
+    asyncio.run(game.setup_game())
+    game._init_phases()
+    for name in list(game.players)[:5]:
+        game.set_alive(name, False)
+    game.save_snapshot()
+    # 存档由日志订阅者写入, 关闭事件总线等待其处理完毕
+    game.bus.close()
+
+    resumed = werewolf([], resume_from=game.snapshot_path)
+    resumed.restore_game(resumed._resume_state)
+    assert resumed.get_alive_players() == game.get_alive_players()
+    assert_index_matches(resumed)
+
+
+def test_cancel_clears_the_index(werewolf):
+    game = werewolf(PLAYERS)
+    asyncio.run(game.setup_game())
+    game._cancel()
+    assert game.count_alive() == 0
+    assert game.get_alive_players() == []
+    assert game.count_alive(team="werewolf") == 0
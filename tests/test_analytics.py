@@ -0,0 +1,65 @@
+import pytest
+from flask import Flask
+
+import src.Analytics as Analytics
+from src.Analytics import AnalyticsStore
+from src.services.stats import stats_bp
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": name}
+    for i, name in enumerate(["A", "B", "C", "D", "E", "F"])
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = AnalyticsStore(tmp_path / "analytics.db")
+    monkeypatch.setattr(Analytics, "_store", store)
+    return store
+
+
+def test_finished_game_is_recorded(werewolf, store):
+    game = werewolf(PLAYERS, seed=2)
+    game.run_blocking()
+
+    rates = store.win_rates(game_name="werewolf")
+    assert rates["games"] == 1
+    assert rates["wins"] == {game.winner: 1}
+    recorded = store.game(game.logger.game_id)
+    assert [seat["name"] for seat in recorded["seats"]] == list(game.players)
+    deaths = sum(row["deaths"] for row in store.death_stats())
+    assert deaths == sum(not player.is_alive for player in game.players.values())
+
+
+def test_queries_filter_by_player_count_and_time(werewolf, store):
+    game = werewolf(PLAYERS, seed=2)
+    game.run_blocking()
+    record = game.result_record()
+    for game_id, count, finished_at in [
+        ("g1", 6, "2026-01-01T10:00:00"),
+        ("g2", 8, "2026-02-01T10:00:00"),
+    ]:
+        store.record(
+            {**record, "id": game_id, "player_count": count, "finished_at": finished_at}
+        )
+
+    assert store.win_rates(player_count=8)["games"] == 1
+    assert store.win_rates(since="2026-01-15", until="2026-03-01")["games"] == 1
+    assert [g["id"] for g in store.recent_games(limit=2)][1] == "g2"
+    wolves = store.model_stats(role="werewolf", player_count=8)
+    assert [(row["model"], row["games"]) for row in wolves] == [("gpt-3.5-turbo", 2)]
+    # 重复写入同一局时覆盖
+    store.record({**record, "id": "g1", "player_count": 6})
+    assert len(store.game("g1")["seats"]) == len(record["seats"])
+
+
+def test_invalid_query_integers_are_ignored(store):
+    app = Flask(__name__)
+    app.register_blueprint(stats_bp)
+    client = app.test_client()
+
+    assert client.get("/api/stats/winrates?players=abc").status_code == 200
+    response = client.get("/api/stats/games?limit=x&offset=-5")
+    assert response.status_code == 200
+    assert response.get_json()["data"] == []
+    assert client.get("/api/stats/games/missing").status_code == 404
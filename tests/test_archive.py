@@ -0,0 +1,110 @@
+import pytest
+
+import src.Archive as Archive
+from src.Archive import (
+    build_index,
+    iter_events,
+    list_games,
+    load_index,
+    phase_range,
+    read_events,
+)
+from src.Logger import GameLogger
+from src.Retention import pack_game
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": name} for i, name in enumerate("ABC")]
+
+
+@pytest.fixture(autouse=True)
+def small_stride(monkeypatch):
+    # 检查点更密, 使几十条事件的对局也会分成多个归档块
+    monkeypatch.setattr(Archive, "INDEX_STRIDE", 4)
+
+
+def write_game(directory, days: int = 2):
+    """写入一局: 每天夜晚和白天各若干条公开, 私密和带执行者的事件."""
+    logger = GameLogger("test", PLAYERS, log_dir=directory)
+    for day in range(1, days + 1):
+        for phase in ("Night", "Day"):
+            logger.begin_phase()
+            logger.log_event(f"{day} {phase} 开始")
+            logger.log_event(f"{day} {phase} 只有 A 可见", ["A"])
+            logger.log_event(f"{day} {phase} B 发言", actor="B")
+            logger.log_event(f"{day} {phase} B 和 C 可见", ["B", "C"], actor="C")
+            logger.end_phase(day, phase)
+    logger.write_result({"id": directory.name, "winner": "village", "seats": []})
+    logger.close()
+    return directory
+
+
+def test_build_index(tmp_path):
+    directory = write_game(tmp_path / "game")
+    index = build_index(directory, save=True)
+
+    assert index["events"] == 16
+    assert index["seats"] == {"A": 0, "B": 1, "C": 2}
+    assert [(p["day"], p["phase"], p["seq"]) for p in index["phases"]] == [
+        (1, "Night", 0),
+        (1, "Day", 4),
+        (2, "Night", 8),
+        (2, "Day", 12),
+    ]
+    assert [seq for seq, _ in index["checkpoints"]] == [0, 4, 8, 12]
+    assert load_index(directory) == index
+
+
+def test_read_events_pages(tmp_path):
+    directory = write_game(tmp_path / "game")
+    events = read_events(directory, 0, 100)
+
+    assert [e["seq"] for e in events] == list(range(16))
+    assert events[1]["visible_to"] == ["A"]
+    assert events[3]["visible_to"] == ["B", "C"]
+    assert events[0]["actor"] is None and events[2]["actor"] == "B"
+    assert (events[5]["day"], events[5]["phase"]) == (1, "Day")
+    for start in range(16):
+        assert read_events(directory, start, 3) == events[start : start + 3]
+    assert list(iter_events(directory, page_size=5)) == events
+    assert read_events(directory, 16, 10) == []
+
+
+def test_phase_range(tmp_path):
+    index = build_index(write_game(tmp_path / "game"))
+    assert phase_range(index, 1, "Day")["start"] == 4
+    assert (phase_range(index, 2)["start"], phase_range(index, 2)["end"]) == (8, 16)
+    assert phase_range(index, 3) is None
+
+
+def test_list_games_skips_unfinished(tmp_path):
+    for name in ("20260101_000000", "20260102_000000", "20260103_000000"):
+        write_game(tmp_path / name, days=1)
+    logger = GameLogger("test", PLAYERS, log_dir=tmp_path / "20260104_000000")
+    logger.close()
+
+    page = list_games(0, 2, tmp_path)
+    assert page["total"] == 3
+    assert [item["id"] for item in page["items"]] == ["20260103_000000", "20260102_000000"]
+    assert all("seats" not in item for item in page["items"])
+
+
+def test_packed_archive_reads_the_same(tmp_path):
+    directory = write_game(tmp_path / "game")
+    events = read_events(directory, 0, 100)
+    index = load_index(directory)
+
+    packed = pack_game(directory)
+    assert packed.name == "game.zip"
+    assert not directory.exists()
+    assert load_index(packed) == index
+    assert read_events(packed, 0, 100) == events
+    for start in range(16):
+        assert read_events(packed, start, 3) == events[start : start + 3]
+    assert list(iter_events(packed, 7, page_size=2)) == events[7:]
+
+
+def test_unfinished_game_is_not_packed(tmp_path):
+    logger = GameLogger("test", PLAYERS, log_dir=tmp_path / "game")
+    logger.log_event("开始")
+    logger.close()
+    with pytest.raises(ValueError):
+        pack_game(tmp_path / "game")
@@ -0,0 +1,44 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import src.Balance as Balance
+from src.Balance import BotPolicy, _Batch, analyze
+
+
+def village_of_four(monkeypatch, targets):
+    """四人局 (座位 0 为狼人), 白天第 i 位投票人投给 targets[i]."""
+    batch = _Batch(np.random.default_rng(0), [Balance.VILLAGER] * 4, 1, BotPolicy())
+    batch.roles[:] = [Balance.WEREWOLF] + [Balance.VILLAGER] * 3
+    batch.wolf = batch.roles == Balance.WEREWOLF
+    calls = iter(targets)
+
+    def pick(rng, mask):
+        return np.full(len(mask), next(calls)), mask.any(axis=1)
+
+    monkeypatch.setattr(Balance, "_pick", pick)
+    return batch
+
+
+def test_tied_vote_eliminates_nobody(monkeypatch):
+    batch = village_of_four(monkeypatch, [1, 2, 3, 0])
+    batch.day()
+    assert batch.alive.all()
+
+
+def test_unique_top_vote_is_eliminated(monkeypatch):
+    batch = village_of_four(monkeypatch, [1, 2, 1, 1])
+    batch.day()
+    assert batch.alive.tolist() == [[True, False, True, True]]
+
+
+def test_analyze_is_reproducible():
+    roles = {"werewolf": 2, "seer": 1, "witch": 1, "villager": 3}
+    report = analyze(roles, games=2000, seed=1, batch_size=700)
+    assert report.player_count == 7
+    total = report.villager_win_rate + report.werewolf_win_rate + report.unfinished_rate
+    assert total == pytest.approx(1.0)
+    assert report.average_days > 0
+
+    again = analyze(roles, games=2000, seed=1, batch_size=700)
+    assert again.villager_win_rate == report.villager_win_rate
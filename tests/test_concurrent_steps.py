@@ -0,0 +1,77 @@
+import asyncio
+
+from src.Game import GameAction, GamePhase, GameStep
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(6)]
+
+
+class Announce(GameAction):
+    """让出若干次事件循环后抽一个随机数, 再发出一条公开和一条私密公告."""
+
+    def __init__(self, label: str, yields: int, draws: dict):
+        self.label = label
+        self.yields = yields
+        self.draws = draws
+
+    async def execute(self, context):
+        game = context.game
+        for _ in range(self.yields):
+            await asyncio.sleep(0)
+        self.draws[self.label] = game.rng.random()
+        game.announce(f"{self.label} 公开", list(game.all_player_names))
+        game.announce(f"{self.label} 私密", ["P0"])
+
+    def description(self) -> str:
+        return self.label
+
+
+def phase_of(*specs, draws):
+    phase = GamePhase("Test")
+    for name, yields, depends_on in specs:
+        phase.add_step(GameStep(name, [], Announce(name, yields, draws), depends_on=depends_on))
+    return phase
+
+
+def test_waves_follow_dependencies():
+    draws = {}
+    phase = phase_of(
+        ("a", 0, []), ("b", 0, ["a"]), ("c", 0, ["a"]), ("d", 0, ["b", "c"]), draws=draws
+    )
+    assert phase.waves() == [[0], [1, 2], [3]]
+    # 没有声明依赖时逐个执行
+    assert phase_of(("a", 0, []), ("b", 0, []), draws=draws).waves() == [[0], [1]]
+
+
+def run_wave(werewolf, slow: str):
+    draws = {}
+    specs = [("start", 0, [])] + [
+        (name, 5 if name == slow else 0, ["start"]) for name in ("b", "c", "d")
+    ]
+    phase = phase_of(*specs, draws=draws)
+
+    async def main():
+        game = werewolf(PLAYERS, seed=13)
+        await game.setup_game()
+        game.phases = [phase]
+        start = len(game.logger.events)
+        await game.run_phase(phase)
+        return [message for _, _, message in game.logger.events[start:]]
+
+    return asyncio.run(main()), draws
+
+
+def test_public_order_is_deterministic_and_private_is_immediate(werewolf):
+    messages, _ = run_wave(werewolf, slow="b")
+    public = [m for m in messages if m.endswith("公开")]
+    private = [m for m in messages if m.endswith("私密")]
+    assert public == ["start 公开", "b 公开", "c 公开", "d 公开"]
+    # 私密公告不等整批结束, 按实际完成顺序立即发出
+    assert private == ["start 私密", "c 私密", "d 私密", "b 私密"]
+    assert messages.index("b 私密") < messages.index("b 公开")
+
+
+def test_each_step_has_its_own_rng(werewolf):
+    _, slow_b = run_wave(werewolf, slow="b")
+    _, slow_d = run_wave(werewolf, slow="d")
+    assert slow_b == slow_d
+    assert len(set(slow_b.values())) == len(slow_b)
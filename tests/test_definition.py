@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from src.Game import (
+    DefinitionError,
+    GameAction,
+    _compile_definition,
+    load_game_definition,
+)
+
+
+class Noop(GameAction):
+    async def execute(self, context):
+        return None
+
+    def description(self) -> str:
+        return "noop"
+
+
+ACTIONS = {"noop": Noop}
+CONDITIONS = {"always": lambda game: True}
+PROMPTS = {"night": {"start": "天黑了"}}
+
+
+def definition(**overrides):
+    raw = {
+        "roles": {
+            "tables": [{"players": 3, "roles": {"wolf": 1, "villager": 2}}],
+            "default": {"wolf": {"per": 3}, "villager": "rest"},
+        },
+        "phases": [
+            {
+                "name": "Night",
+                "time_budget": 60,
+                "steps": [
+                    {"name": "start", "action": "noop", "prompt": "night.start"},
+                    {
+                        "name": "wolves",
+                        "action": "noop",
+                        "roles": ["wolf"],
+                        "condition": "always",
+                        "depends_on": ["start"],
+                    },
+                ],
+            }
+        ],
+    }
+    raw.update(overrides)
+    return raw
+
+
+def compile_errors(raw):
+    with pytest.raises(DefinitionError) as info:
+        _compile_definition(raw, "digest", ACTIONS, CONDITIONS, PROMPTS)
+    return str(info.value)
+
+
+def test_valid_definition_compiles():
+    compiled = _compile_definition(definition(), "digest", ACTIONS, CONDITIONS, PROMPTS)
+    assert [phase.name for phase in compiled.phases] == ["Night"]
+    assert compiled.role_tables[3] == {"wolf": 1, "villager": 2}
+
+
+@pytest.mark.parametrize(
+    "step, message",
+    [
+        ({"name": "x", "action": "missing"}, "未知动作 missing"),
+        ({"name": "x", "action": "noop", "roles": ["seer"]}, "角色 seer 未出现在角色配置中"),
+        ({"name": "x", "action": "noop", "condition": "never"}, "未知条件 never"),
+        ({"name": "x", "action": "noop", "prompt": "night.end"}, "提示词 night.end 不存在"),
+    ],
+)
+def test_step_errors(step, message):
+    raw = definition(phases=[{"name": "Night", "steps": [step]}])
+    assert message in compile_errors(raw)
+
+
+def test_phase_errors():
+    raw = definition(
+        phases=[
+            {"name": "Night", "time_budget": -1, "steps": []},
+            {"name": "Night", "steps": []},
+        ]
+    )
+    errors = compile_errors(raw)
+    assert "time_budget 无效" in errors
+    assert "阶段名称缺失或重复: Night" in errors
+
+
+def test_dependency_on_unknown_step():
+    step = {"name": "x", "action": "noop", "depends_on": ["nowhere"]}
+    compile_errors(definition(phases=[{"name": "Night", "steps": [step]}]))
+
+
+def test_role_errors_are_collected():
+    raw = definition(
+        roles={
+            "tables": [
+                {"players": 0, "roles": {}},
+                {"players": 4, "roles": {"wolf": 1, "villager": 2}},
+            ],
+            "default": {"wolf": "all", "villager": "rest", "seer": "rest"},
+        }
+    )
+    errors = compile_errors(raw)
+    assert "角色表的人数无效: 0" in errors
+    assert "4 人角色表的角色总数为 3" in errors
+    assert "默认角色规则无效: wolf=all" in errors
+    assert "最多只能有一个 rest" in errors
+
+
+def test_empty_definition():
+    assert "没有任何阶段" in compile_errors({})
+
+
+def test_unreadable_definition(tmp_path):
+    with pytest.raises(DefinitionError):
+        load_game_definition(None, ACTIONS)
+    (tmp_path / "definition.json").write_text("{", encoding="utf-8")
+    with pytest.raises(DefinitionError):
+        load_game_definition(tmp_path, ACTIONS)
+    (tmp_path / "definition.json").write_text(json.dumps(definition()), encoding="utf-8")
+    (tmp_path / "prompt.json").write_text(json.dumps(PROMPTS), encoding="utf-8")
+    assert load_game_definition(tmp_path, ACTIONS, CONDITIONS).phases
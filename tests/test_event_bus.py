@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from src.EventBus import Announcement, EventBus, GameEnded
+from src.Game import load_snapshot
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": name}
+    for i, name in enumerate(["A", "B", "C", "D", "E", "F"])
+]
+
+
+def blocked_subscriber(bus, overflow, maxsize=2):
+    """订阅一个在 release 之前一直阻塞的订阅者, 返回 (release, 已处理的事件)."""
+    release = threading.Event()
+    handled = []
+
+    def handler(event):
+        release.wait()
+        handled.append(event)
+
+    bus.subscribe("slow", handler, maxsize=maxsize, overflow=overflow)
+    return release, handled
+
+
+def test_drop_discards_new_events_but_keeps_game_ended():
+    bus = EventBus()
+    release, handled = blocked_subscriber(bus, "drop")
+    for i in range(10):
+        bus.publish(Announcement("g", f"公告 {i}"))
+    bus.publish(GameEnded("g", "好人"))
+    release.set()
+    bus.close()
+
+    stats = bus.stats()["slow"]
+    assert stats["dropped"] > 0
+    assert stats["handled"] + stats["dropped"] == 11
+    assert isinstance(handled[-1], GameEnded)
+
+
+def test_wait_keeps_every_event_in_order():
+    bus = EventBus()
+    release, handled = blocked_subscriber(bus, "wait")
+    for i in range(10):
+        bus.publish(Announcement("g", f"公告 {i}"))
+    release.set()
+    bus.close()
+
+    assert bus.stats()["slow"]["dropped"] == 0
+    assert [event.message for event in handled] == [f"公告 {i}" for i in range(10)]
+
+
+def test_throttle_waits_for_backlog_without_blocking_the_loop():
+    bus = EventBus()
+    release, handled = blocked_subscriber(bus, "wait", maxsize=4)
+    for i in range(8):
+        bus.publish(Announcement("g", f"公告 {i}"))
+    ticks = []
+
+    async def ticker():
+        # 等待积压期间, 事件循环上的其他协程继续运行
+        while not release.is_set():
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        task = asyncio.create_task(ticker())
+        await bus.throttle()
+        await task
+
+    asyncio.run(main())
+    assert ticks
+    assert len(bus.subscribers[0].queue) < 4
+    bus.close()
+    assert len(handled) == 8
+
+
+def test_closed_bus_ignores_events():
+    bus = EventBus()
+    handled = []
+    bus.subscribe("log", handled.append)
+    bus.close()
+    bus.publish(Announcement("g", "关闭之后"))
+    bus.close()
+    assert handled == []
+
+
+def test_notices_are_pushed_but_not_logged(werewolf, capsys):
+    pushed = []
+    game = werewolf(PLAYERS, seed=3, event_emitter=lambda m, v: pushed.append(m))
+    game.notify("A 正在思考...")
+    game.announce("公告")
+    game.bus.close()
+
+    assert pushed == ["A 正在思考...", "公告"]
+    assert "A 正在思考..." in capsys.readouterr().out
+    content = game.logger.events_path.read_text(encoding="utf-8")
+    assert "公告" in content and "正在思考" not in content
+
+
+def test_snapshot_is_written_after_its_events(werewolf):
+    game = werewolf(PLAYERS, seed=3)
+    game.announce("存档之前的公告")
+    game.save_snapshot()
+    game.bus.close()
+
+    offset = load_snapshot(game.snapshot_path)["history"]["offset"]
+    assert game.logger.events_path.stat().st_size == offset
@@ -0,0 +1,40 @@
+import asyncio
+
+AI_PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(6)]
+HUMAN_PLAYERS = [{"player_uuid": "h", "player_name": "H", "human": True}] + [
+    {"player_uuid": f"v{i}", "player_name": f"Q{i}"} for i in range(5)
+]
+
+
+def test_waiting_human_does_not_block_other_games(werewolf):
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        requests = []
+
+        def input_handler(name, input_type, prompt, choices, allow_skip):
+            future = loop.create_future()
+            requests.append((future, choices))
+            return future
+
+        human_game = werewolf(HUMAN_PLAYERS, input_handler=input_handler, seed=2)
+        human_task = asyncio.create_task(human_game.run_game())
+        while not requests:
+            await asyncio.sleep(0)
+
+        # 人类玩家的输入请求悬而未决时, 同一事件循环上的其他对局照常进行到结束
+        ai_game = werewolf(AI_PLAYERS, seed=3)
+        await ai_game.run_game()
+        assert ai_game.winner is not None
+        assert not human_task.done()
+
+        while not human_task.done():
+            while requests:
+                future, choices = requests.pop()
+                future.set_result(choices[0] if choices else "过")
+            await asyncio.sleep(0)
+        await human_task
+        return human_game
+
+    human_game = asyncio.run(main())
+    assert human_game.winner is not None
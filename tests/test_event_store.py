@@ -0,0 +1,49 @@
+from src.Logger import GameLogger
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": name} for i, name in enumerate("ABC")]
+
+
+def history(logger, name):
+    return [line.split("] ", 1)[1] for line in logger.get_history(name).splitlines()]
+
+
+def test_history_follows_visibility(tmp_path):
+    logger = GameLogger("test", PLAYERS, log_dir=tmp_path / "game")
+    logger.log_event("公开")
+    logger.log_event("只有 A", ["A"])
+    assert history(logger, "B") == ["公开"]
+    logger.log_event("B 和 C", ["B", "C"])
+    # 后加入的玩家也有自己的座位
+    logger.log_event("D 的身份", ["D"])
+
+    assert history(logger, "A") == ["公开", "只有 A"]
+    assert history(logger, "B") == ["公开", "B 和 C"]
+    assert history(logger, "C") == ["公开", "B 和 C"]
+    assert history(logger, "D") == ["公开", "D 的身份"]
+    logger.close()
+
+
+def test_offsets_match_the_file(tmp_path):
+    logger = GameLogger("test", PLAYERS, log_dir=tmp_path / "game")
+    logger.log_event("第一行\n第二行: 中文与换行")
+    # 位置已计入尚未落盘的记录
+    cursors = logger.get_cursors()
+    logger.write_pending()
+    assert cursors["offset"] == logger.events_path.stat().st_size
+    logger.log_event("存档之后", ["A"])
+    assert b"\r\n" not in logger.events_path.read_bytes()
+
+    # 截断到存档位置, 并从文件重新加载事件和座位
+    logger.restore_cursors(cursors)
+    assert logger.events_path.stat().st_size == cursors["offset"]
+    assert len(logger.events) == cursors["events"]
+    logger.log_event("恢复之后")
+    logger.close()
+
+    reloaded = GameLogger("test", [], log_dir=tmp_path / "game")
+    assert [message for _, _, message in reloaded.events] == [
+        "第一行\n第二行: 中文与换行",
+        "恢复之后",
+    ]
+    assert reloaded.seats == {"A": 0, "B": 1, "C": 2}
+    reloaded.close()
@@ -0,0 +1,99 @@
+import json
+import types
+
+import pytest
+
+import src.Player as Player
+from src.Export import export_decisions, iter_decisions
+from src.Game import find_latest_snapshot, load_snapshot
+from src.Logger import DECISIONS_FILE
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": name}
+    for i, name in enumerate(["A", "B", "C", "D", "E", "F"])
+]
+
+
+@pytest.fixture
+def model_game(werewolf, monkeypatch):
+    """真正走模型请求路径的狼人杀, 模型回复为第一个选项; 返回 (游戏类, 发出的消息)."""
+    sent = []
+
+    async def completion(**kwargs):
+        sent.append(kwargs["messages"])
+        prompt = kwargs["messages"][-1]["content"]
+        marker = "请从以下选项中选择: "
+        content = prompt.split(marker)[-1].split(", ")[0] if marker in prompt else "过"
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    monkeypatch.setenv("DEBUG_GAME", "0")
+    monkeypatch.setattr(Player, "acompletion", completion)
+    return werewolf, sent
+
+
+def dumps(messages):
+    return json.dumps(messages, ensure_ascii=False, sort_keys=True)
+
+
+def test_export_rebuilds_the_messages_that_were_sent(model_game):
+    werewolf, sent = model_game
+    game = werewolf(PLAYERS, seed=3)
+    game.run_blocking()
+    game_dir = game.logger.log_dir
+
+    # 决策文件只保存提示词增量, 不保存完整的历史
+    with open(game_dir / DECISIONS_FILE, encoding="utf-8") as f:
+        assert all("messages" not in json.loads(line) for line in f)
+
+    exported = list(iter_decisions(game_dir))
+    assert sent
+    assert sorted(dumps(r["messages"]) for r in exported) == sorted(map(dumps, sent))
+    assert {r["outcome"] for r in exported} == {"won", "lost"}
+
+
+def test_dedupe_and_filters(model_game, tmp_path):
+    werewolf, _ = model_game
+    game = werewolf(PLAYERS, seed=3)
+    game.run_blocking()
+    game_dir = game.logger.log_dir
+
+    stats = export_decisions(tmp_path / "all.jsonl.gz", [game_dir, game_dir])
+    assert stats["duplicates"] == stats["read"] // 2
+    assert stats["written"] == stats["read"] - stats["duplicates"]
+
+    stats = export_decisions(
+        tmp_path / "wolves.jsonl", [game_dir], roles={"werewolf"}, dedupe=False
+    )
+    with open(tmp_path / "wolves.jsonl", encoding="utf-8") as f:
+        roles = {json.loads(line)["role"] for line in f}
+    assert roles == {"werewolf"}
+    assert stats["written"] + stats["filtered"] == stats["read"]
+
+
+def test_resume_truncates_decisions_after_the_snapshot(model_game, tmp_path):
+    werewolf, _ = model_game
+    game = werewolf(PLAYERS, seed=3)
+    run_phase = game.run_phase
+
+    async def stopping(phase, start_step=0):
+        if game.day_number >= 1 and phase.name == "Day":
+            game.stop_game()
+            return
+        await run_phase(phase, start_step)
+
+    game.run_phase = stopping
+    game.run_blocking()
+    path = find_latest_snapshot("werewolf")
+    decisions_path = path.parent / DECISIONS_FILE
+    assert load_snapshot(path)["history"]["decisions"] == decisions_path.stat().st_size
+
+    # 模拟存档之后写入, 恢复时会重新进行的决策
+    with open(decisions_path, "a", encoding="utf-8") as f:
+        f.write('{"player": "A", "replayed": true}\n')
+    resumed = werewolf([], resume_from=path)
+    resumed.run_blocking()
+
+    assert "replayed" not in decisions_path.read_text(encoding="utf-8")
+    stats = export_decisions(tmp_path / "out.jsonl", [path.parent])
+    assert stats["duplicates"] == 0
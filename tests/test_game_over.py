@@ -0,0 +1,49 @@
+import asyncio
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(6)]
+
+
+def test_game_over_is_announced_once(werewolf):
+    game = werewolf(PLAYERS, seed=8)
+    calls = []
+    on_game_over = game.on_game_over
+
+    def counting(winner):
+        calls.append(winner)
+        on_game_over(winner)
+
+    game.on_game_over = counting
+    game.run_blocking()
+
+    assert calls == [game.winner]
+    assert game.winner in ("werewolf", "villager")
+    # 结束后再次判定不会产生新的公告
+    announced = len(game.logger.events)
+    for _ in range(3):
+        assert game.check_game_over()
+    assert len(game.logger.events) == announced
+
+
+def test_winner_follows_state_changes(werewolf):
+    game = werewolf(PLAYERS, seed=1)
+    asyncio.run(game.setup_game())
+    wolves = game.get_alive_players(["werewolf"])
+    villagers = [name for name in game.get_alive_players() if name not in wolves]
+    assert game.winner is None
+
+    evaluated = []
+    evaluate = game.evaluate_winner
+    game.evaluate_winner = lambda: evaluated.append(1) or evaluate()
+    for _ in range(3):
+        game.check_game_over()
+    # 状态未变化时不重新判定
+    assert evaluated == []
+
+    for name in villagers[:2]:
+        game.set_alive(name, False)
+    assert game.winner == "werewolf"
+    game.set_alive(villagers[0], True)
+    assert game.winner is None
+    for name in wolves:
+        game.set_alive(name, False)
+    assert game.winner == "villager"
@@ -0,0 +1,85 @@
+import asyncio
+import random
+
+import pytest
+
+from src.Player import Player
+
+CHOICES = ["A", "B", "C"]
+
+
+def human(input_handler, **policy):
+    return Player(
+        "A",
+        "Villager",
+        {"human": True},
+        {},
+        input_handler=input_handler,
+        rng=random.Random(0),
+        input_policy=policy,
+    )
+
+
+def test_legacy_sync_handler_runs_in_a_thread():
+    calls = []
+
+    def handler(name, input_type, prompt, choices, allow_skip):
+        calls.append((name, input_type, choices))
+        return "2"
+
+    player = human(handler)
+    assert asyncio.run(player.call_human_response("选择", CHOICES)) == "B"
+    assert calls == [("A", "choice", CHOICES)]
+
+
+def test_handler_receives_the_timeout():
+    received = {}
+
+    async def handler(*args, timeout=None):
+        received["timeout"] = timeout
+        return "skip"
+
+    player = human(handler, timeout=5)
+    assert asyncio.run(player.call_human_response("选择", CHOICES, True)) == "skip"
+    assert received == {"timeout": 5}
+
+
+def never_answers():
+    cancelled = []
+
+    async def handler(*args, timeout=None):
+        try:
+            await asyncio.get_running_loop().create_future()
+        except asyncio.CancelledError:
+            cancelled.append(args[0])
+            raise
+
+    return handler, cancelled
+
+
+@pytest.mark.parametrize(
+    "on_timeout, allow_skip, expected",
+    [
+        ("skip", True, {"skip"}),
+        ("skip", False, set(CHOICES)),
+        ("random", True, set(CHOICES)),
+    ],
+)
+def test_timeout_action(on_timeout, allow_skip, expected):
+    handler, cancelled = never_answers()
+    player = human(handler, timeout=0.01, on_timeout=on_timeout)
+    response = asyncio.run(player.call_human_response("选择", CHOICES, allow_skip))
+    assert response in expected
+    # 超时的请求被取消, 服务端据此清理待完成的输入
+    assert cancelled == ["A"]
+
+
+def test_unanswered_speech_is_silence():
+    handler, _ = never_answers()
+    player = human(handler, timeout=0.01, on_timeout="random")
+    assert asyncio.run(player.call_human_speak("发言")) == ""
+
+
+def test_unknown_timeout_action():
+    with pytest.raises(ValueError):
+        human(None, on_timeout="wait")
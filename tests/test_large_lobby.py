@@ -0,0 +1,67 @@
+import asyncio
+
+from src.Logger import GameLogger
+from src.Player import Player
+
+
+def players(count):
+    return [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(count)]
+
+
+def test_history_view_is_bounded(tmp_path):
+    logger = GameLogger("test", players(2), log_dir=tmp_path / "game")
+    for i in range(10):
+        logger.log_event(f"事件 {i}")
+    logger.log_event("只有 P1", ["P1"])
+
+    lines = logger.get_history("P0", limit=3).splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["事件 7", "事件 8", "事件 9"]
+    logger.log_event("事件 10")
+    assert logger.get_history("P0", limit=3).endswith("事件 10")
+    assert len(logger._views["P0"][1]) == 3
+    # 不限条数时返回全部可见事件
+    assert len(logger.get_history("P0").splitlines()) == 11
+    logger.close()
+
+
+def test_lobby_mode_follows_player_count(werewolf):
+    small = werewolf(players(8), seed=1)
+    asyncio.run(small.setup_game())
+    assert not small.large_lobby
+    assert all(p.history_limit is None for p in small.players.values())
+
+    large = werewolf(players(24), seed=1)
+    asyncio.run(large.setup_game())
+    assert large.large_lobby
+    assert large.max_speech_chars == 150
+    assert {p.history_limit for p in large.players.values()} == {120}
+
+
+def test_concurrent_votes_are_announced_in_voter_order(werewolf, monkeypatch):
+    in_flight = []
+    peak = [0]
+
+    async def choose(self, prompt, choices, allow_skip=False):
+        in_flight.append(self.name)
+        peak[0] = max(peak[0], len(in_flight))
+        # 后面的投票者先返回
+        for _ in range(30 - int(self.name[1:])):
+            await asyncio.sleep(0)
+        in_flight.remove(self.name)
+        return choices[0]
+
+    monkeypatch.setattr(Player, "choose", choose)
+    prompts = {"prompt": "{0} 投票", "action": "{0} 投给 {1}", "result_out": "{0} 出局"}
+
+    async def main():
+        game = werewolf(players(24), seed=1)
+        await game.setup_game()
+        voters = game.get_alive_players()
+        start = len(game.logger.events)
+        result = await game.process_vote(voters, voters[:3], prompts)
+        return voters, result, [m for _, _, m in game.logger.events[start:]]
+
+    voters, result, messages = asyncio.run(main())
+    assert peak[0] == len(voters)
+    assert result == voters[0]
+    assert messages[:-1] == [f"{v} 投给 {voters[0]}" for v in voters]
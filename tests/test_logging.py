@@ -0,0 +1,152 @@
+import logging
+import os
+import uuid
+
+import pytest
+
+import src.Logger as Logger
+
+
+@pytest.fixture
+def file_logger(tmp_path):
+    """写入临时文件的记录器, 测试结束后关闭其处理程序."""
+    name = f"test-{uuid.uuid4().hex}"
+    logfile = tmp_path / "test.log"
+    logger = Logger.get_logger(name, logfile=logfile)
+    yield logger, logfile
+    Logger._close_handlers(logger)
+    Logger._configured.pop(name, None)
+
+
+def lines(logfile):
+    return logfile.read_text(encoding="utf-8").splitlines()
+
+
+def test_records_are_written_in_order(file_logger):
+    logger, logfile = file_logger
+    assert isinstance(logger.handlers[0], Logger._QueueHandler)
+
+    for i in range(1000):
+        logger.info("line %d", i)
+    Logger._writer.drain()
+
+    written = lines(logfile)
+    assert len(written) == 1000
+    assert written[0].endswith("line 0")
+    assert written[-1].endswith("line 999")
+
+
+def test_mutable_args_are_logged_as_they_were(file_logger):
+    logger, logfile = file_logger
+    alive = ["A", "B"]
+    logger.info("alive: %s", alive)
+    alive.clear()
+    Logger._writer.drain()
+    assert lines(logfile)[-1].endswith("alive: ['A', 'B']")
+
+
+def test_synchronous_mode(file_logger, monkeypatch):
+    logger, logfile = file_logger
+    monkeypatch.setitem(Logger._settings, "async", False)
+    Logger.configure_logging()
+    try:
+        assert not any(isinstance(h, Logger._QueueHandler) for h in logger.handlers)
+        logger.info("sync")
+        assert lines(logfile)[-1].endswith("sync")
+    finally:
+        monkeypatch.setitem(Logger._settings, "async", True)
+        Logger.configure_logging()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="需要 fork")
+def test_writer_restarts_in_forked_child(file_logger):
+    logger, logfile = file_logger
+    logger.info("parent")
+    Logger._writer.drain()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            logger.info("child")
+            Logger._writer.drain()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    Logger._writer.drain()
+    written = lines(logfile)
+    assert any(line.endswith("child") for line in written)
+    assert any(line.endswith("parent") for line in written)
+
+
+def test_decorator_formats_fields(file_logger):
+    logger, logfile = file_logger
+
+    @logger.decorate.info("{func_name}: {data[gameId]} {0}")
+    def handle(data, extra=1):
+        return extra
+
+    @logger.decorate.info("固定消息")
+    def constant():
+        return "ok"
+
+    assert handle({"gameId": "g1"}) == 1
+    assert constant() == "ok"
+    Logger._writer.drain()
+    written = lines(logfile)
+    assert written[-2].endswith("handle: g1 {'gameId': 'g1'}")
+    assert written[-1].endswith("固定消息")
+
+
+def test_decorator_logs_arguments_at_call_time(file_logger):
+    logger, logfile = file_logger
+    data = {"players": ["A"]}
+
+    @logger.decorate.info("{data}")
+    def handle(data):
+        data["players"].append("B")
+
+    handle(data)
+    Logger._writer.drain()
+    assert lines(logfile)[-1].endswith("{'players': ['A']}")
+
+
+def test_disabled_level_skips_binding(file_logger):
+    logger, logfile = file_logger
+    logger.setLevel(logging.INFO)
+
+    @logger.decorate.debug("{missing}")
+    def handle(value):
+        return value
+
+    # 级别未启用时不绑定参数, 模板字段对不上也不会出错
+    assert handle(3) == 3
+    Logger._writer.drain()
+    assert lines(logfile) == []
+
+
+def test_games_get_separate_sessions(log_root):
+    first = Logger.GameLogger("werewolf", [])
+    second = Logger.GameLogger("werewolf", [])
+    assert first.log_dir != second.log_dir
+    assert first.log_dir.parent == second.log_dir.parent == log_root
+    assert first.system_logger is not second.system_logger
+
+    # 关闭一局不影响另一局的记录器
+    first.system_logger.info("first")
+    first.close()
+    first.close()
+    second.system_logger.info("second")
+    Logger._writer.drain()
+    assert first.system_logger.name not in logging.Logger.manager.loggerDict
+    assert second.system_logger.handlers
+    assert lines(first.log_dir / "System.log")[-1].endswith("first")
+    assert lines(second.log_dir / "System.log")[-1].endswith("second")
+    second.close()
+
+
+def test_finished_game_releases_its_logger(werewolf):
+    before = set(Logger._configured)
+    game = werewolf([{"player_uuid": f"u{i}", "player_name": str(i)} for i in range(6)], seed=3)
+    game.run_blocking()
+    assert game.logger.game_id == game.logger.log_dir.name
+    assert set(Logger._configured) == before
+    assert f"System-{game.logger.game_id}" not in logging.Logger.manager.loggerDict
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+
+from src.Archive import list_games
+from src.Logger import GameLogger
+from src.Retention import apply_retention, pack_finished, pack_game, scan_games
+
+PLAYERS = [{"player_uuid": "u0", "player_name": "A"}]
+DAY = 86400
+
+
+def make_game(log_root, game_id: str, age_days: float, ended: str = "result"):
+    """
+    写入一局日志, 并把文件时间改为 age_days 天前. 返回未关闭的 GameLogger.
+    ended: "result" 有结果文件, "ended" 只有结束标记 (被停止), "snapshot" 只有标记为
+    已结束的存档, None 未结束.
+    """
+    logger = GameLogger("test", PLAYERS, log_dir=log_root / game_id)
+    logger.log_event("x" * 1000)
+    logger.write_pending()
+    if ended == "result":
+        logger.write_result({"id": game_id, "winner": "A", "seats": []})
+    elif ended == "ended":
+        logger.write_ended(None)
+    elif ended == "snapshot":
+        with open(log_root / game_id / "snapshot.json", "w", encoding="utf-8") as f:
+            json.dump({"finished": True}, f)
+    age(log_root / game_id, age_days)
+    return logger
+
+
+def age(path, days: float):
+    stamp = time.time() - days * DAY
+    for item in path.iterdir():
+        os.utime(item, (stamp, stamp))
+
+
+def remaining(log_root):
+    return sorted(path.name for path in log_root.iterdir())
+
+
+def test_only_old_finished_games_expire(log_root):
+    for game_id, days, ended in (
+        ("20200101_old", 30, "result"),
+        ("20200102_unfinished", 30, None),
+        ("20200103_recent", 1, "result"),
+    ):
+        make_game(log_root, game_id, days, ended).close()
+
+    stats = apply_retention(max_age_days=7, log_root=log_root, abandon_after_days=0)
+
+    assert stats["games"] == 1
+    assert remaining(log_root) == ["20200102_unfinished", "20200103_recent"]
+
+
+def test_stopped_games_are_packed(log_root):
+    make_game(log_root, "20200101_stopped", 0, "ended").close()
+    make_game(log_root, "20200102_snapshot", 0, "snapshot").close()
+    make_game(log_root, "20200103_running", 0, None).close()
+
+    assert pack_finished(0, log_root) == 2
+    assert remaining(log_root) == [
+        "20200101_stopped.zip",
+        "20200102_snapshot.zip",
+        "20200103_running",
+    ]
+    # 没有结果的已压缩对局只按编号列出
+    assert [item["id"] for item in list_games(0, 10, log_root)["items"]] == [
+        "20200102_snapshot",
+        "20200101_stopped",
+    ]
+
+
+def test_abandoned_game_is_packed_and_expired(log_root):
+    make_game(log_root, "20200101_abandoned", 40, None).close()
+    make_game(log_root, "20200102_waiting", 10, None).close()
+
+    assert pack_finished(0, log_root, abandon_after_days=30) == 1
+    assert remaining(log_root) == ["20200101_abandoned.zip", "20200102_waiting"]
+
+    stats = apply_retention(max_age_days=7, log_root=log_root, abandon_after_days=30)
+    assert stats["games"] == 1
+    assert remaining(log_root) == ["20200102_waiting"]
+
+
+def test_legacy_directory_is_removed_but_not_packed(log_root):
+    legacy = log_root / "20200101_000000"
+    legacy.mkdir()
+    (legacy / "System.log").write_text("x" * 1000, encoding="utf-8")
+    age(legacy, 40)
+
+    assert pack_finished(0, log_root, abandon_after_days=30) == 0
+    assert [g["finished"] for g in scan_games(log_root)] == [False]
+    stats = apply_retention(max_bytes=1, log_root=log_root, abandon_after_days=30)
+    assert stats == {"games": 1, "bytes": 1000}
+    assert remaining(log_root) == []
+
+
+def test_size_limit_removes_oldest_first(log_root):
+    for i in range(4):
+        make_game(log_root, f"2020010{i}_game", age_days=0).close()
+    pack_game(log_root / "20200101_game")
+    sizes = {
+        path.name: sum(f.stat().st_size for f in path.iterdir()) if path.is_dir()
+        else path.stat().st_size
+        for path in log_root.iterdir()
+    }
+    limit = sizes["20200102_game"] + sizes["20200103_game"]
+
+    stats = apply_retention(max_bytes=limit, log_root=log_root)
+
+    assert stats == {
+        "games": 2,
+        "bytes": sizes["20200100_game"] + sizes["20200101_game.zip"],
+    }
+    assert remaining(log_root) == ["20200102_game", "20200103_game"]
+
+
+def test_open_games_are_kept(log_root):
+    open_logger = make_game(log_root, "20200101_open", age_days=30)
+    make_game(log_root, "20200102_closed", age_days=30).close()
+    try:
+        stats = apply_retention(max_age_days=7, log_root=log_root)
+    finally:
+        open_logger.close()
+
+    assert stats["games"] == 1
+    assert remaining(log_root) == ["20200101_open"]
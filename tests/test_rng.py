@@ -0,0 +1,48 @@
+import random
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(8)]
+
+
+def play(werewolf, seed):
+    """运行一局, 返回按顺序记录的公告."""
+    game = werewolf(PLAYERS, seed=seed)
+    announcements = []
+    announce = game.announce
+
+    def recording(message, visible_to=None, *args, **kwargs):
+        announcements.append((message, visible_to))
+        announce(message, visible_to, *args, **kwargs)
+
+    game.announce = recording
+    game.run_blocking()
+    return game, announcements
+
+
+def test_same_seed_replays_the_same_game(werewolf):
+    first, events = play(werewolf, 21)
+    second, replay = play(werewolf, 21)
+    assert events == replay
+    assert first.winner == second.winner
+    assert {n: p.role for n, p in first.players.items()} == {
+        n: p.role for n, p in second.players.items()
+    }
+    _, other = play(werewolf, 22)
+    assert other != events
+
+
+def test_games_do_not_touch_the_global_random_state(werewolf):
+    random.seed(0)
+    state = random.getstate()
+    play(werewolf, 5)
+    assert random.getstate() == state
+
+
+def test_snapshot_keeps_the_seed_and_stream(werewolf):
+    game = werewolf(PLAYERS, seed=9)
+    game.rng.random()
+    state = game.get_state()
+    expected = [game.rng.random() for _ in range(3)]
+
+    game.set_state(state)
+    assert game.seed == 9
+    assert [game.rng.random() for _ in range(3)] == expected
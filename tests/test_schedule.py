@@ -0,0 +1,54 @@
+import asyncio
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(6)]
+
+
+def night_steps(game):
+    night = game.phases[0]
+    return {night.steps[i].name for i in game.compile_schedule(night)}
+
+
+def started_game(werewolf):
+    game = werewolf(PLAYERS, seed=4)
+    asyncio.run(game.setup_game())
+    game._init_phases()
+    return game
+
+
+def test_steps_without_living_actors_are_skipped(werewolf):
+    game = started_game(werewolf)
+    # 6 人局没有守卫
+    assert night_steps(game) == {"NightStart", "Werewolf", "Seer", "Witch"}
+
+    seer = game.get_player_by_role("seer").name
+    game.set_alive(seer, False)
+    assert night_steps(game) == {"NightStart", "Werewolf", "Witch"}
+    game.set_alive(seer, True)
+    assert "Seer" in night_steps(game)
+
+
+def test_schedule_is_cached_until_the_alive_set_changes(werewolf):
+    game = started_game(werewolf)
+    night = game.phases[0]
+    schedule = game.compile_schedule(night)
+    game.mark_state_changed()
+    assert game.compile_schedule(night) is schedule
+
+    villager = game.get_player_by_role("villager").name
+    game.set_alive(villager, False)
+    assert game.compile_schedule(night) is not schedule
+    assert game.compile_schedule(night) == schedule
+
+
+def test_skipped_step_is_not_executed(werewolf):
+    game = started_game(werewolf)
+    game.set_alive(game.get_player_by_role("seer").name, False)
+    seer_step = next(step for step in game.phases[0].steps if step.name == "Seer")
+    executed = []
+
+    async def execute(context):
+        executed.append(context)
+
+    seer_step.action.execute = execute
+    asyncio.run(game.run_phase(game.phases[0]))
+    assert executed == []
@@ -0,0 +1,98 @@
+import pytest
+
+from src.Logger import GameLogger
+from src.Search import SearchIndex, get_search_index
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": name} for i, name in enumerate("ABC")]
+SEATS = [
+    {"name": "A", "role": "werewolf", "model": "m1"},
+    {"name": "B", "role": "seer", "model": "m2"},
+    {"name": "C", "role": "villager", "model": "m1"},
+]
+
+
+def write_game(directory, speeches):
+    """写入一局已结束的对局: speeches 为每天白天的 (发言者, 内容) 列表."""
+    logger = GameLogger("test", PLAYERS, log_dir=directory)
+    for day, lines in enumerate(speeches, start=1):
+        logger.begin_phase()
+        logger.log_event("天黑, 请闭眼.")
+        logger.log_event("你守护了 C", ["B"], actor="B")
+        logger.end_phase(day, "Night")
+        logger.begin_phase()
+        for speaker, text in lines:
+            logger.log_event(f"{speaker} 发言: {text}", actor=speaker)
+        logger.end_phase(day, "Day")
+    logger.write_result(
+        {
+            "id": directory.name,
+            "game_name": "werewolf",
+            "finished_at": f"2026-01-0{directory.name[-1]}T00:00:00",
+            "winner": "villager",
+            "player_count": 3,
+            "seats": SEATS,
+        }
+    )
+    logger.close()
+    return directory
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path / "search.db")
+    write_game(tmp_path / "logs" / "game1", [[("A", "我是预言家, 查验了 C")]])
+    write_game(
+        tmp_path / "logs" / "game2",
+        [[("B", "我才是预言家"), ("C", "我是平民")], [("A", "投 B 吧")]],
+    )
+    assert index.sync(tmp_path / "logs") == 2
+    return index
+
+
+def test_games_are_indexed_once(index, tmp_path):
+    assert index.sync(tmp_path / "logs") == 0
+    assert not index.index_game(tmp_path / "logs" / "game1")
+
+
+def test_search_ranks_and_highlights(index):
+    found = index.search("预言家")
+    assert found["total"] == 2
+    assert all("<mark>预言家</mark>" in item["text"] for item in found["items"])
+    assert index.search("预言家 查验")["total"] == 1
+
+
+def test_search_filters(index):
+    # 发言者取自事件的执行者, 而不是消息中出现的第一个玩家名
+    assert index.search("守护", speaker="C")["total"] == 0
+    guards = index.search("守护", speaker="B")
+    assert guards["total"] == 3
+    assert {item["role"] for item in guards["items"]} == {"seer"}
+
+    assert index.search(model="m1", phase="Day")["total"] == 3
+    assert index.search(role="werewolf", day=2)["items"][0]["text"] == "A 发言: 投 B 吧"
+    assert index.search("预言家", speaker="A")["items"][0]["game_id"] == "game1"
+
+
+def test_short_terms_fall_back_to_substring(index):
+    found = index.search("平民")
+    assert found["total"] == 1
+    assert found["items"][0]["speaker"] == "C"
+    assert index.search("投 B")["total"] == 1
+
+
+def test_games_by_seat(index):
+    assert index.games(role="seer")["total"] == 2
+    assert index.games(player="D")["total"] == 0
+    assert [g["id"] for g in index.games(model="m2")["items"]] == ["game2", "game1"]
+
+
+def test_finished_game_is_indexed(werewolf):
+    game = werewolf(
+        [{"player_uuid": f"u{i}", "player_name": n} for i, n in enumerate("ABCDEF")],
+        seed=2,
+    )
+    game.run_blocking()
+
+    votes = get_search_index().search("投票给", speaker="A")
+    assert votes["total"] >= 1
+    assert all(item["game_id"] == game.logger.game_id for item in votes["items"])
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(8)]
+
+
+def started_game(werewolf, seed=1):
+    game = werewolf(PLAYERS, seed=seed)
+    asyncio.run(game.setup_game())
+    game._init_phases()
+    return game
+
+
+def test_runtime_objects_have_no_dict(werewolf):
+    game = started_game(werewolf)
+    player = next(iter(game.players.values()))
+    step = game.phases[0].steps[0]
+    context = game._step_context(step)
+    for obj in (player, step, context):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_prompt_bundle_is_shared_and_read_only(werewolf):
+    first = started_game(werewolf, seed=1)
+    second = started_game(werewolf, seed=2)
+    assert first.prompts is second.prompts
+    assert all(p.prompts is first.prompts for p in second.players.values())
+    with pytest.raises(TypeError):
+        first.prompts["game"]["cancel"] = "x"
+
+    # 步骤参数在编译时冻结, 各局共享, 不能被某一局修改
+    step = next(s for s in first.phases[1].steps if s.params)
+    context = first._step_context(step)
+    assert context.extra_data is step.params
+    with pytest.raises(TypeError):
+        context.extra_data["max_rounds"] = 0
+
+
+def test_player_prompt_is_formatted_lazily(werewolf):
+    game = started_game(werewolf)
+    player = next(iter(game.players.values()))
+    assert player._prompt is None
+    prompt = player.prompt
+    assert player._prompt is prompt
@@ -0,0 +1,52 @@
+import json
+
+from src.Simulation import run_continuation, simulate
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": name}
+    for i, name in enumerate(["A", "B", "C", "D", "E", "F"])
+]
+
+
+def mid_game_state(werewolf):
+    """运行到第一天白天前停止, 返回此时的状态."""
+    game = werewolf(PLAYERS, seed=3, console=False)
+    run_phase = game.run_phase
+
+    async def stopping(phase, start_step=0):
+        if game.day_number >= 1 and phase.name == "Day":
+            game.stop_game()
+            return
+        await run_phase(phase, start_step)
+
+    game.run_phase = stopping
+    game.run_blocking()
+    return game.get_state()
+
+
+def test_fork_does_not_touch_the_state_or_files(werewolf, log_root):
+    state = mid_game_state(werewolf)
+    before = json.dumps(state, sort_keys=True)
+    files = sorted(log_root.rglob("*"))
+
+    winner, days = run_continuation(werewolf, state, seed=1, max_days=30)
+    assert winner in ("werewolf", "villager")
+    assert days >= state["day_number"]
+    assert json.dumps(state, sort_keys=True) == before
+    assert sorted(log_root.rglob("*")) == files
+
+
+def test_same_seed_same_outcome(werewolf):
+    state = mid_game_state(werewolf)
+    outcomes = [run_continuation(werewolf, state, seed, 30) for seed in (5, 5, 6)]
+    assert outcomes[0] == outcomes[1]
+
+
+def test_simulate_after_a_game_in_the_parent(werewolf):
+    # 父进程已经用过事件总线的线程池, fork 出的工作进程需要新的线程池, 否则会一直卡住
+    state = mid_game_state(werewolf)
+    result = simulate("werewolf", state, runs=8, workers=2)
+    assert result.runs == 8
+    assert sum(result.wins.values()) + result.unfinished == 8
+    again = simulate("werewolf", state, runs=8, workers=2)
+    assert again.wins == result.wins
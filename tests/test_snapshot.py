@@ -0,0 +1,76 @@
+import pytest
+
+from src.Game import find_latest_snapshot, load_snapshot
+
+PLAYERS = [
+    {"player_uuid": f"u{i}", "player_name": name}
+    for i, name in enumerate(["A", "B", "C", "D", "E", "F"])
+]
+
+
+def stop_on_day(game, day: int):
+    """在第 day 天的白天开始前停止游戏, 留下未结束的存档."""
+    run_phase = game.run_phase
+
+    async def stopping(phase, start_step=0):
+        if game.day_number >= day and phase.name == "Day":
+            game.stop_game()
+            return
+        await run_phase(phase, start_step)
+
+    game.run_phase = stopping
+
+
+def stopped_game(werewolf, day: int = 2):
+    game = werewolf(PLAYERS, seed=11)
+    stop_on_day(game, day)
+    game.run_blocking()
+    return game
+
+
+def test_snapshot_round_trip(werewolf):
+    game = stopped_game(werewolf)
+    path = find_latest_snapshot("werewolf")
+    assert path == game.snapshot_path
+
+    state = load_snapshot(path)
+    assert not state["finished"]
+    assert state["day_number"] == game.day_number
+    assert state["history"]["offset"] == game.logger.events_path.stat().st_size
+
+    # 存档之后写入的事件在恢复时被截断
+    game.logger.log_event("存档之后的记录")
+    game.logger.close()
+
+    resumed = werewolf([], resume_from=path)
+    resumed.restore_game(resumed._resume_state)
+    restored = resumed.get_state()
+    for key in ("day_number", "cursor", "players", "seed", "rng", "roles"):
+        assert restored[key] == state[key]
+    events = state["history"]["events"]
+    assert resumed.logger.events[:events] == game.logger.events[:events]
+    assert "存档之后的记录" not in resumed.logger.events_path.read_text(encoding="utf-8")
+
+
+def test_resume_runs_to_the_end(werewolf):
+    stopped_game(werewolf)
+    path = find_latest_snapshot("werewolf")
+
+    resumed = werewolf([], resume_from=path)
+    resumed.run_blocking()
+
+    assert resumed.check_game_over()
+    assert resumed.logger.log_dir == path.parent
+    assert load_snapshot(path)["finished"]
+    assert find_latest_snapshot("werewolf") is None
+
+
+def test_finished_snapshot_is_refused(werewolf):
+    game = stopped_game(werewolf, day=99)
+    assert game.check_game_over()
+    assert load_snapshot(game.snapshot_path)["finished"]
+
+    with pytest.raises(ValueError):
+        werewolf([], resume_from=game.snapshot_path)
+    with pytest.raises(ValueError):
+        game.restore_game(load_snapshot(game.snapshot_path))
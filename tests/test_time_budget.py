@@ -0,0 +1,58 @@
+import asyncio
+
+import src.Game as Game
+from src.Player import Player
+
+PLAYERS = [{"player_uuid": f"u{i}", "player_name": f"P{i}"} for i in range(6)]
+PROMPTS = {
+    "prompt": "{0} 请发言",
+    "speech": "{0}: {1}",
+    "timeout": "讨论结束",
+    "out_of_time": "时间到了",
+}
+
+
+def test_speech_cap_and_latency(werewolf):
+    game = werewolf(PLAYERS, seed=1)
+    # 未设预算或没有耗时记录时不限制
+    assert game.speech_cap("P0", 3, 200) == 200
+    game.record_latency("P0", 10.0)
+    game.record_latency("P0", 20.0)
+    assert game.projected_latency("P0") == 0.3 * 20.0 + 0.7 * 10.0
+    # 没有记录的玩家使用所有玩家的均值
+    game.record_latency("P1", 5.0)
+    assert game.projected_latency("P2") == (13.0 + 5.0) / 2
+
+    game._phase_deadline = Game.time.monotonic() + 130
+    assert game.speech_cap("P1", 2, 200) == 200
+    # 预计耗时 13s, 20 人分 130s 每人只有 6.5s: 上限减半, 且不低于 MIN_SPEECH_CHARS
+    assert abs(game.speech_cap("P0", 20, None) - Game.DEFAULT_SPEECH_CHARS / 2) <= 1
+    assert abs(game.speech_cap("P0", 20, 2000) - 1000) <= 1
+    assert game.speech_cap("P0", 1000, None) == Game.MIN_SPEECH_CHARS
+
+
+def test_discussion_stops_when_the_budget_runs_out(werewolf, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(Game.time, "monotonic", lambda: clock[0])
+    caps = []
+
+    async def speak(self, prompt, max_chars=None):
+        clock[0] += 10
+        caps.append(max_chars)
+        return "发言"
+
+    monkeypatch.setattr(Player, "speak", speak)
+
+    async def main():
+        game = werewolf(PLAYERS, seed=1)
+        await game.setup_game()
+        game._phase_deadline = clock[0] + 25
+        start = len(game.logger.events)
+        await game.process_discussion(game.get_alive_players(), PROMPTS, max_rounds=3)
+        return [message for _, _, message in game.logger.events[start:]]
+
+    messages = asyncio.run(main())
+    # 第一位发言后预计耗时为 10s: 剩余 15s 时仍可发言, 剩余 5s 时提前结束
+    assert len(caps) == 2
+    assert caps[0] is None and caps[1] < Game.DEFAULT_SPEECH_CHARS
+    assert messages[-1] == "时间到了"
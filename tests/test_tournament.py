@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import src.Tournament as Tournament_module
+from src.Tournament import (
+    DEFAULT_RATING,
+    ELO_K,
+    ProviderRateLimiter,
+    Tournament,
+    compute_leaderboard,
+)
+
+ENTRANTS = [
+    {"name": f"P{i}", "uuid": f"u{i}", "model": f"m{i % 2}"} for i in range(6)
+]
+
+
+def seat(model, team, role="Villager", decisions=0, decision_time=0.0):
+    return {
+        "model": model,
+        "team": team,
+        "role": role,
+        "decisions": decisions,
+        "decision_time": decision_time,
+    }
+
+
+def test_elo_moves_towards_the_winner():
+    results = [
+        {"winner": "good", "seats": [seat("a", "good"), seat("b", "wolf", "Werewolf")]},
+        # 未分胜负的对局只计入决策延迟
+        {"winner": None, "seats": [seat("a", "good", decisions=2, decision_time=1.0)]},
+    ]
+    board = {item["model"]: item for item in compute_leaderboard(results)}
+
+    assert board["a"]["rating"] == DEFAULT_RATING + ELO_K / 2
+    assert board["b"]["rating"] == DEFAULT_RATING - ELO_K / 2
+    assert board["a"]["games"] == 1 and board["a"]["win_rate"] == 1.0
+    assert board["b"]["roles"] == {"Werewolf": {"games": 1, "wins": 0, "win_rate": 0.0}}
+    assert board["a"]["avg_latency"] == 0.5
+    assert board["b"]["avg_latency"] is None
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    waits = []
+
+    async def record(delay, *args, **kwargs):
+        waits.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", record)
+    limiter = ProviderRateLimiter({"openai": 120})
+
+    async def main():
+        for _ in range(3):
+            await limiter("openai")
+        # 未配置限制的供应商不等待
+        await limiter("deepseek")
+
+    asyncio.run(main())
+    assert len(waits) == 2
+    assert waits[0] == pytest.approx(0.5, abs=0.05)
+    assert waits[1] == pytest.approx(1.0, abs=0.05)
+    assert limiter.waited == pytest.approx(1.5, abs=0.1)
+
+
+@pytest.mark.parametrize("roster_size", [0, -1])
+def test_invalid_roster_size(roster_size):
+    with pytest.raises(ValueError):
+        Tournament("t", "werewolf", ENTRANTS, 1, roster_size=roster_size)
+    with pytest.raises(ValueError):
+        Tournament("t", "werewolf", [], 1)
+
+
+def test_resume_runs_only_missing_games(werewolf, tmp_path, monkeypatch):
+    monkeypatch.setattr(Tournament_module, "TOURNAMENTS_DIR", tmp_path)
+    tournament = Tournament.create(entrants=ENTRANTS, games=4, concurrency=2)
+    tournament.run_blocking()
+    assert tournament.status == "finished"
+    assert len(tournament.results) == 4
+
+    interrupted = Tournament.load(tournament.id)
+    kept = interrupted.results[:2]
+    interrupted.results = list(kept)
+    interrupted.save()
+
+    resumed = Tournament.load(tournament.id)
+    resumed.run_blocking()
+    assert len(resumed.results) == 4
+    assert resumed.results[:2] == kept
+    assert {item["model"] for item in resumed.summary()["leaderboard"]} == {"m0", "m1"}